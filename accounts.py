@@ -0,0 +1,178 @@
+"""
+Twitter accounts for F1 Countdown Bot.
+
+Accounts are configured as ``[account:<name>]`` sections in config.ini. Each
+account reads its credentials from environment variables with its own prefix
+(``<PREFIX>_CONSUMER_KEY`` and so on) and can override the timezone used to
+compute "today". Without account sections the bot has a single ``default``
+account using the ``TWITTER_*`` variables.
+"""
+
+import configparser
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Protocol, Sequence
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_SECTION_PREFIX = 'account:'
+DEFAULT_ACCOUNT = 'default'
+DEFAULT_CREDENTIALS_PREFIX = 'TWITTER'
+DEFAULT_POST_TIMEOUT = 30.0
+TWITTER_API_HOSTS = ('https://api.twitter.com', 'https://upload.twitter.com')
+
+# Credential name -> environment variable suffix
+CREDENTIAL_VARS = {
+    'consumer_key': 'CONSUMER_KEY',
+    'consumer_secret': 'CONSUMER_SECRET',
+    'access_token': 'ACCESS_TOKEN',
+    'access_token_secret': 'ACCESS_TOKEN_SECRET',
+    'bearer_token': 'BEARER_TOKEN',
+}
+REQUIRED_CREDENTIALS = ['consumer_key', 'consumer_secret', 'access_token', 'access_token_secret']
+
+
+@dataclass(frozen=True)
+class TwitterAccount:
+    """One Twitter account the bot posts to."""
+
+    name: str
+    credentials_prefix: str
+    timezone: str
+    timeout: float = DEFAULT_POST_TIMEOUT
+    template: Optional[str] = None  # [template:<name>] or inline template text
+
+    def env_var(self, credential: str) -> str:
+        """Return the environment variable holding a credential."""
+        return f"{self.credentials_prefix}_{CREDENTIAL_VARS[credential]}"
+
+    def credentials(self, environ: Optional[Mapping[str, str]] = None) -> Dict[str, Optional[str]]:
+        """Read this account's credentials from the environment."""
+        environ = os.environ if environ is None else environ
+        return {name: environ.get(self.env_var(name)) for name in CREDENTIAL_VARS}
+
+    def missing_credentials(self, environ: Optional[Mapping[str, str]] = None) -> List[str]:
+        """Return the required environment variables that are not set."""
+        credentials = self.credentials(environ)
+        return [self.env_var(name) for name in REQUIRED_CREDENTIALS if not credentials[name]]
+
+
+class PostTarget(Protocol):
+    """What run_per_account posts to: an account or a profile."""
+
+    name: str
+    timeout: float
+
+
+@dataclass
+class AccountPostResult:
+    """Outcome of posting to one account (or profile)."""
+
+    account: str
+    success: bool
+    tweet_id: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    deferred: bool = False  # held back by a rate limit, delivered later
+
+
+def load_accounts(config: configparser.ConfigParser, default_timezone: str) -> List[TwitterAccount]:
+    """Load the configured accounts, or the single default account."""
+    default_timeout = config.getfloat('settings', 'post_timeout', fallback=DEFAULT_POST_TIMEOUT)
+    accounts = []
+    for section in config.sections():
+        if not section.startswith(ACCOUNT_SECTION_PREFIX):
+            continue
+        name = section[len(ACCOUNT_SECTION_PREFIX):].strip()
+        accounts.append(TwitterAccount(
+            name=name,
+            credentials_prefix=config.get(
+                section, 'credentials_prefix', fallback=f"TWITTER_{name.upper()}"
+            ),
+            timezone=config.get(section, 'timezone', fallback=default_timezone),
+            timeout=config.getfloat(section, 'timeout', fallback=default_timeout),
+            template=config.get(section, 'template', raw=True, fallback=None),
+        ))
+
+    if not accounts:
+        accounts.append(TwitterAccount(
+            name=DEFAULT_ACCOUNT,
+            credentials_prefix=DEFAULT_CREDENTIALS_PREFIX,
+            timezone=default_timezone,
+            timeout=default_timeout,
+        ))
+    return accounts
+
+
+def apply_request_timeout(client, timeout: float):
+    """Give every HTTP request made by a tweepy.Client a timeout."""
+    client.session.request = functools.partial(client.session.request, timeout=timeout)
+    return client
+
+
+def apply_api_base_url(client, base_url: str):
+    """Send a tweepy.Client's (or tweepy.API's) requests to another host (e.g. fake_services.py)."""
+    request = client.session.request
+    base_url = base_url.rstrip('/')
+
+    def redirected(method, url, *args, **kwargs):
+        for host in TWITTER_API_HOSTS:
+            if url.startswith(host):
+                url = base_url + url[len(host):]
+                break
+        return request(method, url, *args, **kwargs)
+
+    client.session.request = redirected
+    return client
+
+
+def run_per_account(accounts: Sequence[PostTarget],
+                    post: Callable[[PostTarget], Optional[str]],
+                    max_workers: int = 4) -> List[AccountPostResult]:
+    """Run ``post`` for every account (or profile) concurrently and collect the results.
+
+    ``post`` returns the tweet ID (None in debug mode) or raises. Each
+    account is isolated: an exception or a timeout only fails that account's
+    result. Results are returned in account order once every account has
+    finished or timed out.
+    """
+    if not accounts:
+        return []
+
+    def timed(account: PostTarget) -> AccountPostResult:
+        start = time.perf_counter()
+        try:
+            tweet_id = post(account)
+            return AccountPostResult(account.name, True, tweet_id=tweet_id,
+                                     elapsed=time.perf_counter() - start)
+        except Exception as e:
+            return AccountPostResult(account.name, False, error=str(e),
+                                     elapsed=time.perf_counter() - start)
+
+    workers = max(1, min(max_workers, len(accounts)))
+    # Accounts beyond the pool size queue behind the first batch
+    rounds = -(-len(accounts) // workers)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='post')
+    start = time.monotonic()
+    futures = [executor.submit(timed, account) for account in accounts]
+
+    results = []
+    try:
+        for account, future in zip(accounts, futures):
+            deadline = account.timeout * rounds
+            try:
+                results.append(future.result(timeout=max(0.0, start + deadline - time.monotonic())))
+            except FutureTimeoutError:
+                logger.warning(f"Posting to account '{account.name}' timed out after {deadline:.0f}s")
+                results.append(AccountPostResult(
+                    account.name, False, error=f"timed out after {deadline:.0f}s", elapsed=deadline
+                ))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
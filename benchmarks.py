@@ -0,0 +1,337 @@
+#!/usr/bin/env python3.13
+"""
+Benchmark suite for F1 Countdown Bot.
+
+Measures startup, schedule resolution, tweet composition and a full
+daily_tweet_generation() run against stubbed Twitter and Discord services,
+and writes the results to a JSON file so runs can be compared between commits:
+
+    python benchmarks.py --output bench_before.json
+    python benchmarks.py --output bench_after.json --compare bench_before.json
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+DEFAULT_OUTPUT = 'bench_results.json'
+STUB_CREDENTIALS = {
+    'TWITTER_CONSUMER_KEY': 'bench',
+    'TWITTER_CONSUMER_SECRET': 'bench',
+    'TWITTER_ACCESS_TOKEN': 'bench',
+    'TWITTER_ACCESS_TOKEN_SECRET': 'bench',
+}
+
+
+class StubTwitterClient:
+    """Stands in for tweepy.Client; create_tweet returns a fake ID."""
+
+    def __init__(self):
+        self.posted = 0
+
+    def create_tweet(self, text: str, media_ids=None):
+        """Pretend to post a tweet."""
+        self.posted += 1
+        return type('Response', (), {'data': {'id': str(self.posted)}})()
+
+
+class StubDiscordHandler(BaseHTTPRequestHandler):
+    """Accepts every webhook POST with 204 No Content."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def summarize(name: str, samples: List[float], unit: str = 's', **extra) -> dict:
+    """Summarize timing samples."""
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "unit": unit,
+        "n": len(samples),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+        **extra,
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> List[float]:
+    """Time ``func`` ``repeat`` times, discarding its output."""
+    samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def write_config(workdir: str) -> str:
+    """Write a minimal config.ini for the benchmark bot."""
+    config_path = os.path.join(workdir, 'config.ini')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write(
+            "[settings]\n"
+            f"cache_location = {os.path.join(workdir, 'cache')}\n"
+            "tweet_time = 15:00\n"
+            "timezone = Asia/Kolkata\n"
+        )
+    return config_path
+
+
+def synthetic_season(year: int):
+    """Build a 22-race season snapshot with sessions (the fake services' schedule)."""
+    from fake_services import synthetic_schedule
+    from season_snapshot import snapshot_from_events
+
+    return snapshot_from_events(year, synthetic_schedule(year))
+
+
+def bench_cold_import(repeat: int) -> dict:
+    """Cold import of f1_countdown_bot in a fresh interpreter."""
+    script = (
+        "import time; start = time.perf_counter(); import f1_countdown_bot; "
+        "print(time.perf_counter() - start)"
+    )
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+    samples = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, '-c', script], cwd=workdir, env=env,
+                capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(float(output.strip().splitlines()[-1]))
+    return summarize("cold_import", samples)
+
+
+def bench_init(bot_module, config_path: str, repeat: int) -> dict:
+    """F1CountdownBot.__init__ with the Twitter client stubbed."""
+    samples = measure(lambda: bot_module.F1CountdownBot(config_file=config_path), repeat)
+    return summarize("bot_init", samples)
+
+
+def bench_fastf1_schedule(bot, year: int, repeat: int) -> dict:
+    """_get_race_schedule against a warm FastF1 cache."""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            warm = bot._get_race_schedule(year)
+    except ImportError as e:
+        return {"name": "fastf1_get_race_schedule", "skipped": f"FastF1 not installed: {e}"}
+    if warm is None:
+        return {"name": "fastf1_get_race_schedule", "skipped": f"no schedule for {year} (offline?)"}
+    samples = measure(lambda: bot._get_race_schedule(year), repeat)
+    return summarize("fastf1_get_race_schedule", samples, year=year)
+
+
+def bench_season(bot, year: int, repeat: int) -> List[dict]:
+    """Next/last race resolution, progress and composition for every day of a season."""
+    days = [date(year, 1, 1) + timedelta(days=n) for n in range((date(year + 1, 1, 1) - date(year, 1, 1)).days)]
+    resolved = [(day, bot._find_next_and_last_races(year, day)) for day in days]
+
+    def find_all():
+        for day in days:
+            bot._find_next_and_last_races(year, day)
+
+    # Hourly-precision lookups, at tweet time each day
+    moments = [datetime(day.year, day.month, day.day, 15, tzinfo=timezone.utc) for day in days]
+
+    def find_sessions_all():
+        configured, bot.countdown_session = bot.countdown_session, 'sprint'
+        try:
+            for moment in moments:
+                bot._find_next_and_last_sessions(year, moment)
+        finally:
+            bot.countdown_session = configured
+
+    def progress_all():
+        for day, (next_race, last_race, _) in resolved:
+            if next_race is not None:
+                bot._calculate_progress(next_race, last_race, day)
+
+    percentages = [
+        (next_race, bot._calculate_progress(next_race, last_race, day))
+        for day, (next_race, last_race, _) in resolved if next_race is not None
+    ]
+
+    def compose_all():
+        for next_race, race_left in percentages:
+            bot._compose_tweet(next_race, race_left)
+
+    results = []
+    for name, func in [("find_next_and_last_races_season", find_all),
+                       ("find_next_and_last_sessions_season", find_sessions_all),
+                       ("calculate_progress_season", progress_all),
+                       ("compose_tweet_season", compose_all),
+                       ("countdown_for_dates_season", lambda: bot.countdown_for_dates(days))]:
+        samples = measure(func, repeat)
+        results.append(summarize(name, samples, dates=len(days),
+                                 per_date_us=statistics.median(samples) / len(days) * 1e6))
+    return results
+
+
+def bench_daily_run(bot, twitter: StubTwitterClient, repeat: int) -> dict:
+    """Full daily_tweet_generation() with stubbed Twitter and Discord."""
+    from outbox import OUTBOX_FILE, Outbox
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubDiscordHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    webhook = f"http://127.0.0.1:{server.server_port}/api/webhooks/bench"
+    # Webhooks are read from the bot's config snapshot, not the environment
+    bot._apply_config(dataclasses.replace(bot.config, error_webhook_url=webhook, success_webhook_url=webhook))
+
+    ledger_dir = os.path.join(bot.cache_location, 'ledger')
+    outbox_path = os.path.join(bot.cache_location, OUTBOX_FILE)
+    posted_before = twitter.posted
+    samples = []
+    try:
+        for _ in range(repeat):
+            # Start every run with an empty ledger and outbox so each one really posts
+            for name in os.listdir(ledger_dir) if os.path.isdir(ledger_dir) else []:
+                os.unlink(os.path.join(ledger_dir, name))
+            bot._ledgers.clear()
+            bot.close()
+            for path in (outbox_path, outbox_path + '-wal', outbox_path + '-shm'):
+                if os.path.exists(path):
+                    os.unlink(path)
+            bot._outbox = Outbox(bot.cache_location)
+            if bot._delivery is not None:
+                bot._delivery.outbox = bot._outbox
+            samples.extend(measure(bot.daily_tweet_generation, 1))
+        bot.notifications.flush()
+    finally:
+        bot.close()
+        server.shutdown()
+    posted = twitter.posted - posted_before
+    if posted != repeat:
+        raise RuntimeError(f"daily_tweet_generation benchmark posted {posted} tweet(s), expected {repeat}")
+    return summarize("daily_tweet_generation", samples)
+
+
+def compare(results: dict, baseline_path: str):
+    """Print median changes against an earlier results file."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['name']: r for r in json.load(f)['results'] if 'median' in r}
+
+    print(f"\n📊 Compared with {baseline_path} (median):")
+    for result in results['results']:
+        before = baseline.get(result['name'])
+        if 'median' not in result or before is None:
+            continue
+        change = (result['median'] - before['median']) / before['median'] * 100 if before['median'] else 0.0
+        marker = "🔺" if change > 10 else ("🔻" if change < -10 else "  ")
+        print(f"{marker} {result['name']:<36} {before['median'] * 1e3:10.3f} ms -> "
+              f"{result['median'] * 1e3:10.3f} ms ({change:+.1f}%)")
+
+
+def git_commit() -> Optional[str]:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="F1 Countdown Bot benchmark suite")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Results file (default {DEFAULT_OUTPUT})")
+    parser.add_argument('--compare', metavar='BASELINE', help="Earlier results file to compare against")
+    parser.add_argument('--repeat', type=int, default=20, help="Repetitions per benchmark")
+    parser.add_argument('--import-repeat', type=int, default=5, help="Cold import repetitions")
+    parser.add_argument('--year', type=int, default=datetime.now().year, help="Season to benchmark")
+    parser.add_argument('--fastf1-cache', help="Warm FastF1 cache directory for the FastF1 benchmark")
+    args = parser.parse_args()
+    # The benchmarks run in a temporary directory: resolve paths against the caller's
+    args.output = os.path.abspath(args.output)
+    if args.compare:
+        args.compare = os.path.abspath(args.compare)
+    if args.fastf1_cache:
+        args.fastf1_cache = os.path.abspath(args.fastf1_cache)
+
+    print("🏁 F1 Countdown Bot - Benchmarks")
+    print("=" * 50)
+    results = [bench_cold_import(args.import_repeat)]
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.chdir(workdir):
+        os.environ.update(STUB_CREDENTIALS)
+        config_path = write_config(workdir)
+
+        import f1_countdown_bot
+        from season_snapshot import write_snapshot
+
+        logging.disable(logging.INFO)
+        twitter = StubTwitterClient()
+        f1_countdown_bot.F1CountdownBot._create_twitter_client = lambda self, account: twitter
+
+        # The season benchmarks run from compiled snapshots, synthetic if needed
+        cache_dir = os.path.join(workdir, 'cache')
+        for year in (args.year, args.year + 1):
+            write_snapshot(cache_dir, synthetic_season(year))
+
+        results.append(bench_init(f1_countdown_bot, config_path, args.repeat))
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot = f1_countdown_bot.F1CountdownBot(config_file=config_path)
+
+        if args.fastf1_cache:
+            bot.cache_location = args.fastf1_cache
+            results.append(bench_fastf1_schedule(bot, args.year, args.repeat))
+            bot.cache_location = cache_dir
+        else:
+            results.append({"name": "fastf1_get_race_schedule", "skipped": "pass --fastf1-cache DIR"})
+
+        results.extend(bench_season(bot, args.year, args.repeat))
+        results.append(bench_daily_run(bot, twitter, args.repeat))
+
+    output = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+
+    for result in results:
+        if 'skipped' in result:
+            print(f"⏭️  {result['name']:<36} skipped: {result['skipped']}")
+        else:
+            print(f"✅ {result['name']:<36} median {result['median'] * 1e3:10.3f} ms "
+                  f"(min {result['min'] * 1e3:.3f}, p95 {result['p95'] * 1e3:.3f}, n={result['n']})")
+    print(f"\n📝 Results written to {args.output}")
+
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Configuration snapshot for F1 Countdown Bot.
+
+config.ini and the environment variables the bot uses (Twitter credentials,
+Discord webhooks, endpoint overrides) are read once and compiled into a
+frozen BotConfig. Everything is validated up front: a missing file or
+section, a bad number, an unknown timezone, template, account or profile
+raises ConfigError instead of exiting the process, so a host application
+(or the daemon reloading its config) decides what to do about it.
+
+A BotConfig is immutable, so it can be shared by any number of threads and
+bots without locking. Reloading means building a new snapshot and swapping
+it in; in --schedule mode the bot does that when config.ini changes (see
+``config_reload_seconds``), keeping the old snapshot if the new file is
+invalid. Environment variables are only re-read on reload, and .env is not.
+"""
+
+import configparser
+import os
+from dataclasses import dataclass, field
+from datetime import timedelta
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from accounts import ACCOUNT_SECTION_PREFIX, REQUIRED_CREDENTIALS, TwitterAccount, load_accounts
+from logging_setup import LoggingOptions, logging_options
+from profiles import Profile, has_profile_sections, load_profiles, validate_tweet_time
+from schedule_index import COUNTDOWN_SESSIONS
+from tweet_templates import TweetTemplate, load_templates, resolve_template
+
+# Point the bot at other endpoints, e.g. the local fakes in fake_services.py:
+# F1BOT_TWITTER_API_URL replaces https://api.twitter.com, and
+# F1BOT_SCHEDULE_URL (with a {year} placeholder) replaces FastF1 as the
+# schedule source.
+TWITTER_API_URL_ENV = 'F1BOT_TWITTER_API_URL'
+SCHEDULE_URL_ENV = 'F1BOT_SCHEDULE_URL'
+ERROR_WEBHOOK_ENV = 'DISCORD_WEBHOOK_URL'
+SUCCESS_WEBHOOK_ENV = 'DISCORD_SUCCESS_WEBHOOK_URL'
+
+
+class ConfigError(ValueError):
+    """config.ini or the environment is missing or invalid."""
+
+
+class CredentialsError(ConfigError):
+    """An account's Twitter credentials are not set."""
+
+
+@dataclass(frozen=True)
+class CardSettings:
+    """The [cards] section."""
+
+    enabled: bool = False
+    bucket_percent: int = 1
+    max_bytes: int = 50 * 1024 * 1024
+    font_file: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class OutboxSettings:
+    """The [outbox] section."""
+
+    max_attempts: int = 5
+    retry_delay_seconds: float = 30.0
+    deadline_hours: float = 6.0
+    wait_seconds: float = 120.0  # how long a run waits for its tweets to be delivered
+
+
+@dataclass(frozen=True)
+class HealthSettings:
+    """The [health] section."""
+
+    port: int = 0  # 0: no health endpoint
+    host: str = '127.0.0.1'
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    """A validated, immutable snapshot of config.ini and the bot's environment."""
+
+    path: str
+    mtime_ns: int  # config.ini modification time the snapshot was built from
+
+    timezone: str
+    cache_location: str
+    tweet_time: str
+    countdown_session: Optional[str]  # None: count days to race day
+    snapshot_max_age: timedelta
+    missing_season_recheck: timedelta
+    post_workers: int
+    retry_max_delay_minutes: float
+    retry_jitter: float
+    credential_cache_ttl: timedelta
+    notification_flush_timeout: Optional[float]
+    config_reload_seconds: float
+
+    metrics_file: str
+    prometheus_file: str
+    logging: LoggingOptions
+    cards: CardSettings
+    outbox: OutboxSettings
+    health: HealthSettings
+
+    templates: Mapping[str, TweetTemplate]
+    template: TweetTemplate
+    accounts: Tuple[TwitterAccount, ...]
+    profiles: Tuple[Profile, ...]
+    multi_profile: bool
+    multi_account: bool
+
+    error_webhook_url: Optional[str]
+    success_webhook_url: Optional[str]
+    twitter_api_url: Optional[str]
+    schedule_url: Optional[str]
+    # Account name -> credential name -> value, from the environment
+    credentials: Mapping[str, Mapping[str, Optional[str]]] = field(repr=False, default_factory=dict)
+
+    def account_credentials(self, account: TwitterAccount) -> Dict[str, Optional[str]]:
+        """Return an account's credentials (CredentialsError if any required one is missing)."""
+        credentials = dict(self.credentials.get(account.name) or {})
+        missing = [account.env_var(name) for name in REQUIRED_CREDENTIALS if not credentials.get(name)]
+        if missing:
+            raise CredentialsError(
+                f"missing credentials for account '{account.name}': {', '.join(missing)} "
+                f"(set them in your .env file or environment)"
+            )
+        return credentials
+
+
+def _number(config: configparser.ConfigParser, section: str, option: str, fallback: float,
+            minimum: float = 0.0) -> float:
+    """Read a number option, checking it is at least ``minimum``."""
+    try:
+        value = config.getfloat(section, option, fallback=fallback)
+    except ValueError:
+        raise ConfigError(f"[{section}] {option} must be a number") from None
+    if value < minimum:
+        raise ConfigError(f"[{section}] {option} must be at least {minimum:g}, got {value:g}")
+    return value
+
+
+def _whole_number(config: configparser.ConfigParser, section: str, option: str, fallback: int,
+                  minimum: int = 0) -> int:
+    """Read a whole-number option, checking it is at least ``minimum``."""
+    try:
+        value = config.getint(section, option, fallback=fallback)
+    except ValueError:
+        raise ConfigError(f"[{section}] {option} must be a whole number") from None
+    if value < minimum:
+        raise ConfigError(f"[{section}] {option} must be at least {minimum}, got {value}")
+    return value
+
+
+def _flag(config: configparser.ConfigParser, section: str, option: str, fallback: bool) -> bool:
+    """Read a yes/no option."""
+    try:
+        return config.getboolean(section, option, fallback=fallback)
+    except ValueError:
+        raise ConfigError(f"[{section}] {option} must be true or false") from None
+
+
+def _check_timezone(timezone: str, where: str):
+    """Fail on unknown timezones."""
+    try:
+        ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ConfigError(f"[{where}] timezone: unknown timezone {timezone!r}") from None
+
+
+def _read_file(path: str) -> Tuple[configparser.ConfigParser, int]:
+    """Parse config.ini, returning it and its modification time."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise ConfigError(f"Config file {path} not found. Please create it based on config.ini.template") from None
+
+    config = configparser.ConfigParser()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config.read_file(f)
+    except (OSError, UnicodeDecodeError, configparser.Error) as e:
+        raise ConfigError(f"Could not read config file {path}: {e}") from None
+
+    # Twitter credentials come from environment variables, so [settings] is
+    # the only required section
+    for section in ['settings']:
+        if not config.has_section(section):
+            raise ConfigError(f"Missing required section '{section}' in config file {path}")
+    return config, mtime_ns
+
+
+def load_config(path: str = 'config.ini', environ: Optional[Mapping[str, str]] = None) -> BotConfig:
+    """Read and validate config.ini and the environment (ConfigError on problems)."""
+    environ = os.environ if environ is None else environ
+    config, mtime_ns = _read_file(path)
+
+    try:
+        timezone = config.get('settings', 'timezone', fallback='Asia/Kolkata')
+        _check_timezone(timezone, 'settings')
+        tweet_time = validate_tweet_time(config.get('settings', 'tweet_time', fallback='15:00'), 'settings')
+        countdown_session = config.get('settings', 'countdown_session', fallback='').strip().lower() or None
+        if countdown_session is not None and countdown_session not in COUNTDOWN_SESSIONS:
+            raise ConfigError(f"[settings] countdown_session must be one of {', '.join(COUNTDOWN_SESSIONS)} "
+                              f"(or empty), got {countdown_session!r}")
+
+        templates = load_templates(config)
+        template = resolve_template(
+            templates, config.get('settings', 'template', raw=True, fallback='default'), 'settings'
+        )
+        accounts = load_accounts(config, timezone)
+        for account in accounts:
+            _check_timezone(account.timezone, f"account:{account.name}")
+        profiles = load_profiles(config, accounts, tweet_time, templates)
+        multi_profile = has_profile_sections(config)
+
+        flush_timeout = (
+            _number(config, 'settings', 'notification_flush_timeout', 0)
+            if config.has_option('settings', 'notification_flush_timeout') else None
+        )
+        cards = CardSettings(
+            enabled=_flag(config, 'cards', 'enabled', False),
+            bucket_percent=_whole_number(config, 'cards', 'bucket_percent', 1, minimum=1),
+            max_bytes=int(_number(config, 'cards', 'max_cache_mb', 50) * 1024 * 1024),
+            font_file=config.get('cards', 'font_file', fallback='') or None,
+        )
+
+        outbox = OutboxSettings(
+            max_attempts=_whole_number(config, 'outbox', 'max_attempts', 5, minimum=1),
+            retry_delay_seconds=_number(config, 'outbox', 'retry_delay_seconds', 30, minimum=1),
+            deadline_hours=_number(config, 'outbox', 'deadline_hours', 6),
+            wait_seconds=_number(config, 'outbox', 'wait_seconds', 120),
+        )
+        if outbox.deadline_hours <= 0:
+            raise ConfigError("[outbox] deadline_hours must be more than 0")
+
+        health = HealthSettings(
+            port=_whole_number(config, 'health', 'port', 0),
+            host=config.get('health', 'host', fallback='127.0.0.1').strip() or '127.0.0.1',
+        )
+        if health.port > 65535:
+            raise ConfigError(f"[health] port must be at most 65535, got {health.port}")
+
+        return BotConfig(
+            path=path,
+            mtime_ns=mtime_ns,
+            timezone=timezone,
+            cache_location=config.get('settings', 'cache_location', fallback='./cache/'),
+            tweet_time=tweet_time,
+            countdown_session=countdown_session,
+            snapshot_max_age=timedelta(hours=_number(config, 'settings', 'snapshot_max_age_hours', 168)),
+            missing_season_recheck=timedelta(
+                hours=_number(config, 'settings', 'missing_season_recheck_hours', 72)
+            ),
+            post_workers=_whole_number(config, 'settings', 'post_workers', 4, minimum=1),
+            retry_max_delay_minutes=_number(config, 'settings', 'retry_max_delay_minutes', 60),
+            retry_jitter=_number(config, 'settings', 'retry_jitter', 0.2),
+            credential_cache_ttl=timedelta(
+                hours=_number(config, 'settings', 'credential_cache_ttl_hours', 24)
+            ),
+            notification_flush_timeout=flush_timeout,
+            config_reload_seconds=_number(config, 'settings', 'config_reload_seconds', 30),
+            metrics_file=config.get('metrics', 'json_file', fallback=''),
+            prometheus_file=config.get('metrics', 'prometheus_file', fallback=''),
+            logging=logging_options(config),
+            cards=cards,
+            outbox=outbox,
+            health=health,
+            templates=MappingProxyType(dict(templates)),
+            template=template,
+            accounts=tuple(accounts),
+            profiles=tuple(profiles),
+            multi_profile=multi_profile,
+            multi_account=multi_profile or any(
+                section.startswith(ACCOUNT_SECTION_PREFIX) for section in config.sections()
+            ),
+            error_webhook_url=environ.get(ERROR_WEBHOOK_ENV) or None,
+            success_webhook_url=environ.get(SUCCESS_WEBHOOK_ENV) or None,
+            twitter_api_url=environ.get(TWITTER_API_URL_ENV) or None,
+            schedule_url=environ.get(SCHEDULE_URL_ENV) or None,
+            credentials=MappingProxyType({
+                account.name: MappingProxyType(account.credentials(environ)) for account in accounts
+            }),
+        )
+    except ConfigError:
+        raise
+    except ZoneInfoNotFoundError as e:  # a profile's timezone
+        raise ConfigError(f"unknown timezone {e}") from None
+    except (ValueError, configparser.Error) as e:
+        raise ConfigError(str(e)) from None
+
+
+def changed_fields(old: BotConfig, new: BotConfig) -> List[str]:
+    """Return the names of the settings that differ between two snapshots."""
+    return [
+        name for name in BotConfig.__dataclass_fields__
+        if name not in ('path', 'mtime_ns') and getattr(old, name) != getattr(new, name)
+    ]
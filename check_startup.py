@@ -0,0 +1,114 @@
+#!/usr/bin/env python3.13
+"""
+Startup budget check for F1 Countdown Bot.
+Run this after changing imports to make sure cron and debug runs stay fast.
+
+Exits with status 1 if importing the bot takes longer than the budget, or if a
+heavy dependency is imported by a code path that should not need it.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+# Modules that must never be loaded just by importing the bot
+HEAVY_MODULES = ['pandas', 'numpy', 'fastf1', 'tweepy', 'requests', 'PIL']
+
+# Modules that a debug run must never load (it never talks to Twitter)
+DEBUG_FORBIDDEN_MODULES = ['tweepy']
+
+DEFAULT_BUDGET_MS = 300
+
+PROBE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import f1_countdown_bot
+import_ms = (time.perf_counter() - start) * 1000
+after_import = sorted(m for m in {heavy!r} if m in sys.modules)
+start = time.perf_counter()
+bot = f1_countdown_bot.F1CountdownBot(config_file={config!r}, debug_mode=True)
+init_ms = (time.perf_counter() - start) * 1000
+after_init = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{
+    "import_ms": import_ms,
+    "init_ms": init_ms,
+    "loaded_after_import": after_import,
+    "loaded_after_debug_init": after_init,
+}}))
+"""
+
+
+def run_probe(workdir: str) -> dict:
+    """Measure startup in a fresh interpreter so nothing is pre-imported."""
+    config_path = os.path.join(workdir, 'config.ini')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        f.write(
+            "[settings]\n"
+            f"cache_location = {os.path.join(workdir, 'cache')}\n"
+            "tweet_time = 15:00\n"
+            "timezone = Asia/Kolkata\n"
+        )
+
+    script = PROBE_SCRIPT.format(heavy=HEAVY_MODULES, config=config_path)
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=workdir, env=env, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--budget-ms', type=float,
+        default=float(os.getenv('F1BOT_STARTUP_BUDGET_MS', DEFAULT_BUDGET_MS)),
+        help=f"Maximum import + debug init time in ms (default {DEFAULT_BUDGET_MS})"
+    )
+    parser.add_argument('--runs', type=int, default=3, help="Probe runs; the best one is used")
+    parser.add_argument('--json', action='store_true', help="Print the measurement as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        samples = [run_probe(workdir) for _ in range(max(1, args.runs))]
+
+    best = min(samples, key=lambda s: s['import_ms'] + s['init_ms'])
+    total_ms = best['import_ms'] + best['init_ms']
+
+    failures = []
+    if best['loaded_after_import']:
+        failures.append(f"heavy modules loaded at import: {', '.join(best['loaded_after_import'])}")
+    leaked = [m for m in DEBUG_FORBIDDEN_MODULES if m in best['loaded_after_debug_init']]
+    if leaked:
+        failures.append(f"debug run loaded: {', '.join(leaked)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"startup took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if args.json:
+        print(json.dumps({**best, "total_ms": total_ms, "budget_ms": args.budget_ms,
+                          "failures": failures}))
+    else:
+        print("⏱️  F1 Countdown Bot - Startup Budget")
+        print("=" * 50)
+        print(f"Import:     {best['import_ms']:.1f} ms")
+        print(f"Debug init: {best['init_ms']:.1f} ms")
+        print(f"Total:      {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print("✅ Startup within budget")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
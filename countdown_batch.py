@@ -0,0 +1,131 @@
+"""
+Vectorized countdown computation for F1 Countdown Bot.
+
+Computes the next race, race-left percentage and progress bar fill for many
+dates at once with NumPy date arithmetic and searchsorted. The results match
+F1CountdownBot._find_next_and_last_races and _calculate_progress exactly,
+including the edge cases (race day, no last race, total_days <= 0).
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from season_snapshot import SeasonSnapshot
+
+
+@dataclass(frozen=True)
+class CountdownArrays:
+    """Per-date countdown values; index -1 in next_race/last_race means None."""
+
+    dates: np.ndarray            # datetime64[D]
+    years: np.ndarray            # int64, the "current year" of each date
+    next_race: np.ndarray        # int64 position into events, -1 if none
+    last_race: np.ndarray        # int64 position into events, -1 if none
+    race_left: np.ndarray        # float64 percentage of time left
+    filled_chars: np.ndarray     # int64 filled progress bar cells
+
+
+def to_datetime64(dates) -> np.ndarray:
+    """Convert dates, ISO strings or datetime64 values to a datetime64[D] array."""
+    return np.asarray(dates, dtype='datetime64[D]').reshape(-1)
+
+
+def batch_countdown(seasons: Sequence[SeasonSnapshot], dates,
+                    bar_width: int = 15) -> CountdownArrays:
+    """Compute countdown values for every date against the given seasons.
+
+    Each date only sees its own season and the following one, exactly like
+    the single-date path, which starts from datetime.now().year.
+    """
+    days = to_datetime64(dates)
+    years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+
+    seasons = sorted((s for s in seasons if s.events), key=lambda s: s.year)
+    event_days = np.array(
+        [event.date.isoformat() for season in seasons for event in season.events],
+        dtype='datetime64[D]'
+    )
+    event_seasons = np.array(
+        [season.year for season in seasons for _ in season.events], dtype=np.int64
+    )
+    order = np.argsort(event_days, kind='stable')
+    event_days = event_days[order]
+    event_seasons = event_seasons[order]
+    available = np.array([season.year for season in seasons], dtype=np.int64)
+    n_events = len(event_days)
+
+    position = np.searchsorted(event_days, days, side='left')
+    has_current = np.isin(years, available)
+
+    # Next race: must exist and belong to the current or the following season
+    clipped = np.minimum(position, max(n_events - 1, 0))
+    next_season = event_seasons[clipped] if n_events else np.zeros_like(years)
+    has_next = has_current & (position < n_events) & (next_season <= years + 1)
+
+    # Last race: the race before, but only from the current season onwards
+    previous = np.maximum(position - 1, 0)
+    prev_season = event_seasons[previous] if n_events else np.zeros_like(years)
+    has_last = has_next & (position > 0) & (prev_season >= years)
+
+    next_idx = np.where(has_next, position, -1).astype(np.int64)
+    last_idx = np.where(has_last, position - 1, -1).astype(np.int64)
+
+    # Same arithmetic as _calculate_progress, element-wise
+    day_numbers = days.astype(np.int64)
+    event_numbers = event_days.astype(np.int64)
+    if n_events:
+        next_numbers = event_numbers[np.maximum(next_idx, 0)]
+        last_numbers = event_numbers[np.maximum(last_idx, 0)]
+    else:
+        next_numbers = last_numbers = np.zeros_like(day_numbers)
+    total_days = next_numbers - last_numbers
+    days_remaining = next_numbers - day_numbers
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.clip((days_remaining / total_days) * 100, 0.0, 100.0)
+    race_left = np.where(days_remaining > total_days, 0.0, ratio)
+    race_left = np.where((total_days <= 0) | (days_remaining <= 0), 100.0, race_left)
+    race_left = np.where(has_last, race_left, 0.0)
+    race_left = np.where(has_next, race_left, np.nan)
+
+    # Same arithmetic as _generate_progress_bar
+    progress_made = 100 - np.nan_to_num(race_left)
+    filled = ((progress_made / 100) * bar_width).astype(np.int64)
+
+    return CountdownArrays(
+        dates=days,
+        years=years,
+        next_race=next_idx,
+        last_race=last_idx,
+        race_left=race_left,
+        filled_chars=filled,
+    )
+
+
+def sorted_events(seasons: Sequence[SeasonSnapshot]) -> list:
+    """Return events in the same order batch_countdown indexes them."""
+    seasons = sorted((s for s in seasons if s.events), key=lambda s: s.year)
+    events = [event for season in seasons for event in season.events]
+    return sorted(events, key=lambda event: event.date)
+
+
+@dataclass(frozen=True)
+class CountdownBatch:
+    """The bot's output for many dates; None where there is no next race."""
+
+    dates: np.ndarray
+    next_race: List[Optional[str]]
+    race_left: np.ndarray
+    progress_bar: List[Optional[str]]
+    tweet: List[str]
+
+    def __len__(self) -> int:
+        return len(self.tweet)
+
+
+def season_years(dates) -> List[int]:
+    """Return every season a batch over these dates may need."""
+    years = np.unique(to_datetime64(dates).astype('datetime64[Y]').astype(np.int64) + 1970)
+    return sorted(set(years.tolist()) | set((years + 1).tolist()))
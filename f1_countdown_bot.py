@@ -6,152 +6,369 @@ Version 3.4
 Automated script to post daily F1 race countdown tweets at 3:00 PM IST.
 """
 
+from __future__ import annotations
+
 import os
 import sys
+import time
 import logging
-import configparser
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-
-import pandas as pd
-import pytz
-import tweepy
-import fastf1 as ff1
-import requests
+import threading
+import functools
+import sqlite3
+from datetime import date, datetime, timedelta, tzinfo
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo
+
 from dotenv import load_dotenv
 
+from accounts import (
+    AccountPostResult, TwitterAccount, apply_api_base_url, apply_request_timeout, run_per_account
+)
+from bot_config import ERROR_WEBHOOK_ENV, BotConfig, ConfigError, changed_fields, load_config
+from identity_cache import IdentityCache, credentials_fingerprint
+from image_cards import Card, CardCache, CardKey, card_key, pillow_available, template_fingerprint
+from logging_setup import configure_logging, install_queue_handler, set_run_id
+from notifications import get_dispatcher
+from outbox import DEFERRED, EXPIRED, SENT, DeliveryDeferred, DeliveryWorker, Outbox, OutboxItem, RetryPolicy
+from post_ledger import PostKey, PostLedger
+from profiles import Profile
+from rate_limits import ME_ENDPOINT, TWEET_ENDPOINT, RateLimitTracker
+from schedule_index import COUNTDOWN_SESSIONS, ScheduleIndex
+from retry_state import RetryStateStore, backoff_delay_minutes
+from run_metrics import RunMetrics, status_code_of
+from scheduler import JobScheduler
+from tweet_templates import TweetTemplate
+from season_snapshot import (
+    NON_RACE_FORMATS, RaceEvent, SeasonSnapshot, Session, diff_snapshots, load_missing, load_snapshot, record_missing,
+    snapshot_from_events, snapshot_from_schedule, validate_snapshot, write_snapshot
+)
+
+# pandas, fastf1, tweepy and requests are imported lazily by the code paths
+# that need them, so cron and debug runs only pay for what they actually use.
+# Run check_startup.py to verify the import budget.
+if TYPE_CHECKING:
+    from health import HealthServer, HealthStatus
+    import pandas as pd
+    import tweepy
+
+    from countdown_batch import CountdownBatch
+
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('f1_countdown_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+SCHEDULE_REQUEST_TIMEOUT = 30
 
 logger = logging.getLogger(__name__)
 
+
+class TwitterSetupError(RuntimeError):
+    """The Twitter API client could not be set up."""
+
+
 class F1CountdownBot:
     """F1 Race Countdown Bot for automated Twitter posting."""
 
-    def __init__(self, config_file: str = 'config.ini', debug_mode: bool = False):
-        """Initialize the F1 Countdown Bot."""
-        self.debug_mode = debug_mode
-        self.config = self._load_config(config_file, debug_mode)
+    def __init__(self, config_file: str = 'config.ini', debug_mode: bool = False,
+                 refresh_snapshot: bool = False, respect_backoff: bool = False,
+                 config: Optional[BotConfig] = None, clock: Optional[Callable[[], datetime]] = None):
+        """Initialize the F1 Countdown Bot.
 
-        # Only setup Twitter API if not in debug mode
-        if not self.debug_mode:
-            self.twitter_api = self._setup_twitter_api()
-        else:
-            self.twitter_api = None
-            print("🔧 DEBUG MODE: Twitter authentication skipped")
+        ``config`` is an already loaded configuration snapshot (it can be
+        shared by several bots); otherwise ``config_file`` is loaded. Raises
+        ConfigError if the configuration is invalid.
 
-        self.timezone = pytz.timezone(
-            self.config.get('settings', 'timezone', fallback='Asia/Kolkata')
-        )
-        self.cache_location = self.config.get('settings', 'cache_location', fallback='./cache/')
-        self.tweet_time = self.config.get('settings', 'tweet_time', fallback='15:00')
+        ``clock`` returns the current (timezone-aware) time the bot works
+        with instead of the system clock, e.g. to replay past dates (see
+        replay.py).
 
-        # Initialize FastF1 cache
-        self._setup_fastf1_cache()
+        With respect_backoff, a bot created inside the retry backoff window of
+        an earlier failed run skips Twitter setup and daily_tweet_generation()
+        returns immediately (used by cron mode).
+        """
+        self.debug_mode = debug_mode
+        self.refresh_snapshot = refresh_snapshot
+        self.respect_backoff = respect_backoff
+        self._clock = clock
+
+        # Logging goes through a queue and a writer thread; records logged
+        # before [logging] is read are buffered, not lost
+        install_queue_handler()
+
+        # Phase timings and counters, exported at the end of each run
+        self.metrics = RunMetrics()
+        set_run_id(self.metrics.run_id)
+        with self.metrics.phase('config_load'):
+            if config is None:
+                config = load_config(config_file)
+                logger.info("Configuration loaded successfully (Twitter credentials from environment variables)")
+
+        # Discord webhooks are delivered by a background worker
+        self.notifications = get_dispatcher()
+        self._twitter_clients: Dict[str, tweepy.Client] = {}
+        self._twitter_clients_lock = threading.Lock()
+        self._client_creation_locks: Dict[str, threading.Lock] = {}
+        self._media_apis: Dict[str, tweepy.API] = {}
+
+        # Per-account ledgers of posted tweets, guarding against duplicates
+        self._ledgers: Dict[str, PostLedger] = {}
+
+        # Composed tweets go to a durable outbox; a background worker delivers them
+        self._outbox: Optional[Outbox] = None
+        self._delivery: Optional[DeliveryWorker] = None
+
+        # FastF1 is imported and its cache enabled on first schedule fetch
+        self._ff1 = None
+
+        # Schedule index for the current season (plus the next one once needed),
+        # built once and reused for every lookup in this process
+        self._schedule_index: Optional[ScheduleIndex] = None
+
+        # Job scheduler, only set while run() is active (--schedule mode)
+        self._scheduler: Optional[JobScheduler] = None
+        self._run_profile_names: Optional[List[str]] = None
+        self._rejected_config_mtime_ns: Optional[int] = None
+
+        # State published to the [health] endpoint, only while run() serves it
+        self._health: Optional[HealthStatus] = None
+        self._health_server: Optional[HealthServer] = None
+
+        # Everything read from the configuration snapshot
+        self.config: Optional[BotConfig] = None
+        self._apply_config(config)
+
+        backoff_until = self._retry_state.backoff_until(self._now())
+        self.backoff_until = (
+            backoff_until.astimezone(self.timezone) if respect_backoff and backoff_until else None
+        )
 
-        # Fibonacci retry state
-        self._fibonacci_index = 0
-        self._last_successful_fetch = None
+        # Only setup Twitter API if not in debug mode. With several accounts,
+        # each client is created by its own posting worker.
+        if self.debug_mode:
+            self.twitter_api = None
+            print("🔧 DEBUG MODE: Twitter authentication skipped")
+        elif self.backoff_until is not None:
+            self.twitter_api = None
+        elif self.multi_account:
+            self.twitter_api = None
+        else:
+            with self.metrics.phase('twitter_setup'):
+                self.twitter_api = self._setup_twitter_api()
 
         mode_info = " (DEBUG MODE)" if self.debug_mode else ""
         logger.info(f"F1 Countdown Bot initialized successfully{mode_info}")
 
-    def _load_config(self, config_file: str, debug_mode: bool = False) -> configparser.ConfigParser:
-        """Load configuration from file."""
-        if not os.path.exists(config_file):
-            logger.error(
-                f"Config file {config_file} not found. Please create it based on config.ini.template"
+    def _apply_config(self, config: BotConfig):
+        """Switch to a configuration snapshot (at startup, or between runs on reload)."""
+        old = self.config
+        if old is None or old.logging != config.logging:
+            configure_logging(config.logging)
+        self.config = config
+
+        self.metrics_file = config.metrics_file
+        self.prometheus_file = config.prometheus_file
+        self.timezone = ZoneInfo(config.timezone)
+        self.cache_location = config.cache_location
+        self.tweet_time = config.tweet_time
+        self.countdown_session = config.countdown_session
+        self.snapshot_max_age = config.snapshot_max_age
+        self.missing_season_recheck = config.missing_season_recheck
+
+        # Tweet templates, parsed and validated once
+        self.templates = config.templates
+        self.template = config.template
+
+        # Image cards attached to countdown tweets (optional, needs Pillow)
+        self.card_bucket_percent = config.cards.bucket_percent
+        self.cards = self._setup_cards()
+
+        # Accounts from [account:<name>] sections, or the single TWITTER_* account.
+        # Profiles from [profile:<name>] sections, or one per account. All
+        # profiles share one schedule index.
+        self.accounts = list(config.accounts)
+        self.profiles = list(config.profiles)
+        self.multi_profile = config.multi_profile
+
+        # Named accounts and profiles are each posted by their own worker
+        self.multi_account = config.multi_account
+        self.post_workers = config.post_workers
+
+        if config.notification_flush_timeout is not None:
+            self.notifications.flush_timeout = config.notification_flush_timeout
+
+        # Verified Twitter identities, so get_me() is not called on every run
+        self.identity_cache = IdentityCache(config.cache_location, config.credential_cache_ttl)
+
+        # Fibonacci retry state, persisted across runs
+        self.retry_max_delay_minutes = config.retry_max_delay_minutes
+        self.retry_jitter = config.retry_jitter
+        if old is None or old.cache_location != config.cache_location:
+            self._retry_store = RetryStateStore(config.cache_location)
+            self._retry_state = self._retry_store.load()
+            self._fibonacci_index = self._retry_state.fibonacci_index
+            self._last_successful_fetch = (
+                datetime.fromisoformat(self._retry_state.last_successful_fetch)
+                if self._retry_state.last_successful_fetch else None
             )
-            sys.exit(1)
-
-        config = configparser.ConfigParser()
-        config.read(config_file)
-
-        # Validate required sections - Twitter section is now optional as we use env vars
-        required_sections = ['settings']
-
-        for section in required_sections:
-            if not config.has_section(section):
-                logger.error(
-                    f"Missing required section '{section}' in config file"
-                )
-                sys.exit(1)
-
-        logger.info(
-            "Configuration loaded successfully (Twitter credentials from environment variables)"
-        )
-        return config
+            self._ledgers = {}
+            self._outbox = Outbox(config.cache_location)
+            self.rate_limits = RateLimitTracker(config.cache_location)
+        if self._delivery is not None:
+            self._configure_delivery()
+
+        if old is None:
+            return
+        # Clients, schedules and caches built from settings that changed are rebuilt on next use
+        if (old.accounts, old.credentials, old.twitter_api_url, old.multi_account) != \
+                (config.accounts, config.credentials, config.twitter_api_url, config.multi_account):
+            with self._twitter_clients_lock:
+                self._twitter_clients.clear()
+                self._client_creation_locks.clear()
+                self._media_apis.clear()
+            self.twitter_api = None
+        if (old.schedule_url, old.cache_location) != (config.schedule_url, config.cache_location):
+            self._schedule_index = None
+            self._ff1 = None
 
     def _setup_twitter_api(self) -> tweepy.Client:
-        """Set up Twitter API v2 connection using environment variables."""
-        try:
-            # Get Twitter API credentials from environment variables
-            consumer_key = os.getenv('TWITTER_CONSUMER_KEY')
-            consumer_secret = os.getenv('TWITTER_CONSUMER_SECRET')
-            access_token = os.getenv('TWITTER_ACCESS_TOKEN')
-            access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
-            bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
-
-            # Check if all required environment variables are set
-            if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
-                missing_vars = []
-                if not consumer_key:
-                    missing_vars.append('TWITTER_CONSUMER_KEY')
-                if not consumer_secret:
-                    missing_vars.append('TWITTER_CONSUMER_SECRET')
-                if not access_token:
-                    missing_vars.append('TWITTER_ACCESS_TOKEN')
-                if not access_token_secret:
-                    missing_vars.append('TWITTER_ACCESS_TOKEN_SECRET')
-
-                logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
-                logger.error("Please set these variables in your .env file or environment")
-                sys.exit(1)
+        """Set up Twitter API v2 connection using environment variables.
 
-            # Use Twitter API v2 Client
-            client = tweepy.Client(
-                bearer_token=bearer_token,
-                consumer_key=consumer_key,
-                consumer_secret=consumer_secret,
-                access_token=access_token,
-                access_token_secret=access_token_secret,
-                wait_on_rate_limit=True
+        Raises CredentialsError if credentials are missing, and
+        TwitterSetupError if the client can't be created.
+        """
+        try:
+            return self._create_twitter_client(self.accounts[0])
+        except ConfigError as e:
+            logger.critical(f"Failed to authenticate with Twitter API: {e}")
+            raise
+        except Exception as e:
+            logger.critical(f"Failed to authenticate with Twitter API: {e}")
+            raise TwitterSetupError(f"failed to set up the Twitter API client: {e}") from e
+
+    def _create_twitter_client(self, account: TwitterAccount) -> tweepy.Client:
+        """Create a Twitter API v2 client from an account's environment variables."""
+        import tweepy
+
+        # CredentialsError if any required environment variable is not set
+        credentials = self.config.account_credentials(account)
+
+        # Use Twitter API v2 Client. It never sleeps on a rate limit: the
+        # budgets its responses report are tracked, and posts deferred instead.
+        client = tweepy.Client(**credentials, wait_on_rate_limit=False)
+        self.rate_limits.attach(client, account.name)
+        if self.multi_account:
+            apply_request_timeout(client, account.timeout)
+        if self.config.twitter_api_url:
+            apply_api_base_url(client, self.config.twitter_api_url)
+
+        # Verify credentials by getting user info, unless a recent verification
+        # of the same credentials is cached
+        fingerprint = credentials_fingerprint(credentials)
+        identity = self.identity_cache.get(account.name, fingerprint)
+        self.metrics.incr('credential_cache_hit' if identity is not None else 'credential_cache_miss')
+        if identity is not None:
+            logger.info(
+                f"Twitter API v2 credentials for @{identity.username} verified at "
+                f"{identity.verified_at} (cached, skipping get_me)"
             )
-
-            # Verify credentials by getting user info
-            try:
-                me = client.get_me()
-                logger.info(
-                    f"Twitter API v2 authenticated successfully as @{me.data.username} using environment variables"
-                )
-            except Exception as e:
-                logger.warning(f"Could not verify Twitter credentials: {e}")
-                logger.info("Twitter API v2 client created (credentials not verified)")
-
+            return client
+        if self.rate_limits.exhausted_until(account.name, ME_ENDPOINT, self._now().timestamp()) is not None:
+            logger.info("Twitter API v2 client created (get_me rate limited, credentials not verified)")
             return client
 
+        try:
+            me = client.get_me()
+            self.metrics.http_status('twitter', 200)
+            logger.info(
+                f"Twitter API v2 authenticated successfully as @{me.data.username} using environment variables"
+            )
+            self.identity_cache.store(account.name, me.data.username, me.data.id, fingerprint)
         except Exception as e:
-            logger.critical(f"Failed to authenticate with Twitter API: {e}")
-            sys.exit(1)
+            self.metrics.http_status('twitter', status_code_of(e))
+            logger.warning(f"Could not verify Twitter credentials: {e}")
+            logger.info("Twitter API v2 client created (credentials not verified)")
+
+        return client
+
+    def _handle_auth_error(self, account: TwitterAccount, error: Exception):
+        """Drop the cached verification if a request failed with an auth error."""
+        import tweepy
+
+        if isinstance(error, tweepy.Unauthorized):
+            logger.warning(f"Twitter rejected credentials for '{account.name}', clearing cached verification")
+            self.identity_cache.invalidate(account.name)
+
+    def _twitter_client(self, account: TwitterAccount) -> tweepy.Client:
+        """Return the (cached) Twitter client for an account."""
+        with self._twitter_clients_lock:
+            client = self._twitter_clients.get(account.name)
+            if client is not None:
+                return client
+            creation_lock = self._client_creation_locks.setdefault(account.name, threading.Lock())
+
+        # Profiles sharing an account wait for one client instead of each creating one
+        with creation_lock:
+            with self._twitter_clients_lock:
+                client = self._twitter_clients.get(account.name)
+            if client is None:
+                with self.metrics.phase('twitter_setup'):
+                    client = self._create_twitter_client(account)
+                with self._twitter_clients_lock:
+                    self._twitter_clients[account.name] = client
+        return client
+
+    def _media_api(self, account: TwitterAccount) -> tweepy.API:
+        """Return the (cached) Twitter API v1.1 client used to upload an account's media."""
+        import tweepy
+
+        with self._twitter_clients_lock:
+            api = self._media_apis.get(account.name)
+            if api is None:
+                credentials = self.config.account_credentials(account)
+                api = tweepy.API(
+                    tweepy.OAuth1UserHandler(
+                        credentials['consumer_key'], credentials['consumer_secret'],
+                        credentials['access_token'], credentials['access_token_secret']
+                    ),
+                    timeout=account.timeout
+                )
+                self.rate_limits.attach(api, account.name)
+                if self.config.twitter_api_url:
+                    apply_api_base_url(api, self.config.twitter_api_url)
+                self._media_apis[account.name] = api
+        return api
+
+    def _setup_cards(self) -> Optional[CardCache]:
+        """Create the image card cache if cards are enabled and Pillow is installed."""
+        cards = self.config.cards
+        if not cards.enabled:
+            return None
+        if not pillow_available():
+            logger.warning("Image cards are enabled but Pillow is not installed, posting text-only tweets")
+            return None
+        return CardCache(self.cache_location, max_bytes=cards.max_bytes, font_file=cards.font_file)
 
     def _setup_fastf1_cache(self):
-        """Set up FastF1 cache directory."""
-        if not os.path.exists(self.cache_location):
-            os.makedirs(self.cache_location)
-            logger.info(f"Created cache directory: {self.cache_location}")
+        """Import FastF1 and set up its cache directory (once per process)."""
+        if self._ff1 is not None:
+            return self._ff1
+
+        with self.metrics.phase('fastf1_cache_setup'):
+            import fastf1 as ff1
 
-        ff1.Cache.enable_cache(self.cache_location)
-        logger.info(f"FastF1 cache enabled at: {self.cache_location}")
+            if not os.path.exists(self.cache_location):
+                os.makedirs(self.cache_location)
+                logger.info(f"Created cache directory: {self.cache_location}")
+
+            ff1.Cache.enable_cache(self.cache_location)
+            logger.info(f"FastF1 cache enabled at: {self.cache_location}")
+            self._ff1 = ff1
+        return ff1
+
+    def _now(self, tz: Optional[tzinfo] = None) -> datetime:
+        """Return the current time in ``tz`` (default: the bot's timezone), from the injected clock if any."""
+        if self._clock is None:
+            return datetime.now(tz or self.timezone)
+        return self._clock().astimezone(tz or self.timezone)
 
     def _fibonacci(self, n: int) -> int:
         """Generate Fibonacci number for retry delays."""
@@ -165,13 +382,16 @@ class F1CountdownBot:
     def _get_race_schedule(self, year: int) -> Optional[pd.DataFrame]:
         """Fetch F1 race schedule for a given year."""
         try:
+            import pandas as pd
+
+            ff1 = self._setup_fastf1_cache()
             schedule_df = ff1.get_event_schedule(year)
             if schedule_df.empty:
                 logger.warning(f"No F1 schedule available for year {year}")
                 return None
 
-            # Filter for Grand Prix events (EventFormat = 'conventional')
-            races_df = schedule_df[schedule_df['EventFormat'] == 'conventional'].copy()
+            # Every race weekend, conventional or sprint; drop pre-season testing
+            races_df = schedule_df[~schedule_df['EventFormat'].isin(NON_RACE_FORMATS)].copy()
 
             if races_df.empty:
                 logger.warning(f"No Grand Prix races found for year {year}")
@@ -188,61 +408,286 @@ class F1CountdownBot:
             logger.error(f"Failed to fetch F1 schedule for year {year}: {e}")
             return None
 
+    def _load_season(self, year: int) -> Optional[SeasonSnapshot]:
+        """Load a season from its snapshot, rebuilding it from FastF1 when stale."""
+        with self.metrics.phase('schedule_fetch'):
+            return self._load_season_snapshot(year)
+
+    def _load_season_snapshot(self, year: int) -> Optional[SeasonSnapshot]:
+        """Return the season snapshot for a year, rebuilding it when stale or missing."""
+        snapshot = load_snapshot(self.cache_location, year)
+        now = self._now()
+
+        if snapshot is not None and not self.refresh_snapshot:
+            if not snapshot.is_stale(self.snapshot_max_age, now):
+                self.metrics.incr('snapshot_hit')
+                logger.info(f"Using season snapshot for {year} ({len(snapshot.events)} races)")
+                return snapshot
+            self.metrics.incr('snapshot_stale')
+            logger.info(f"Season snapshot for {year} is stale, rebuilding from FastF1")
+        else:
+            self.metrics.incr('snapshot_miss')
+            if self._recently_missing(year, now):
+                return None
+
+        fetched = self._fetch_season(year)
+        if fetched is None:
+            if snapshot is not None:
+                logger.warning(f"Could not rebuild season snapshot for {year}, using stale snapshot")
+            else:
+                self._record_missing(year, now)
+            return snapshot
+
+        snapshot = fetched
+        try:
+            write_snapshot(self.cache_location, snapshot)
+            logger.info(f"Season snapshot for {year} written ({len(snapshot.events)} races)")
+        except OSError as e:
+            logger.warning(f"Could not write season snapshot for {year}: {e}")
+        return snapshot
+
+    def _recently_missing(self, year: int, now: datetime) -> bool:
+        """Return True if a future season was found unpublished within the recheck interval."""
+        if self.refresh_snapshot or year <= now.year:
+            return False
+        checked_at = load_missing(self.cache_location, year)
+        if checked_at is None or now - checked_at >= self.missing_season_recheck:
+            return False
+
+        self.metrics.incr('missing_season_hit')
+        logger.info(
+            f"Season {year} was not available at {checked_at.isoformat()}, "
+            f"next check after {(checked_at + self.missing_season_recheck).isoformat()}"
+        )
+        return True
+
+    def _record_missing(self, year: int, now: datetime):
+        """Remember that a future season is not published yet."""
+        if year <= now.year:
+            return
+        try:
+            record_missing(self.cache_location, year, now)
+        except OSError as e:
+            logger.warning(f"Could not record missing season {year}: {e}")
+
+    def _fetch_season(self, year: int) -> Optional[SeasonSnapshot]:
+        """Build a fresh season snapshot from FastF1 (or F1BOT_SCHEDULE_URL)."""
+        schedule_url = self.config.schedule_url
+        if schedule_url:
+            return self._get_race_schedule_from_url(schedule_url.format(year=year), year)
+
+        races_df = self._get_race_schedule(year)
+        return snapshot_from_schedule(year, races_df) if races_df is not None else None
+
+    def _get_race_schedule_from_url(self, url: str, year: int) -> Optional[SeasonSnapshot]:
+        """Fetch a season schedule as JSON rows shaped like FastF1's event schedule."""
+        try:
+            import requests
+
+            logger.info(f"[API REQUEST] GET {url} (Fetching F1 schedule for {year})")
+            response = requests.get(url, timeout=SCHEDULE_REQUEST_TIMEOUT)
+            self.metrics.http_status('schedule', response.status_code)
+            response.raise_for_status()
+
+            snapshot = snapshot_from_events(year, response.json()['events'])
+            if not snapshot.events:
+                logger.warning(f"No Grand Prix races found for year {year}")
+                return None
+
+            logger.info(f"Successfully fetched {len(snapshot.events)} races for year {year}")
+            return snapshot
+
+        except Exception as e:
+            logger.error(f"Failed to fetch F1 schedule for year {year}: {e}")
+            return None
+
+    def warm_cache(self) -> bool:
+        """Prefetch the current and next season ahead of the posting run.
+
+        Fetches both schedules (filling the FastF1 cache), validates them,
+        writes the season snapshots, rebuilds the schedule index and prints
+        what changed. Returns False if the current season has no usable
+        snapshot afterwards.
+        """
+        current_year = self._now().year
+        print(f"\n🔥 WARMING SCHEDULE CACHE for {current_year} and {current_year + 1}")
+        print("-" * 60)
+
+        usable = {}
+        for year in (current_year, current_year + 1):
+            old = load_snapshot(self.cache_location, year)
+            usable[year] = old
+            with self.metrics.phase('schedule_fetch'):
+                fresh = self._fetch_season(year)
+
+            if fresh is None:
+                kept = " (keeping existing snapshot)" if old is not None else ""
+                if old is None:
+                    self._record_missing(year, self._now())
+                if year == current_year:
+                    print(f"❌ {year}: could not fetch schedule{kept}")
+                else:
+                    print(f"⏳ {year}: schedule not available yet{kept}")
+                continue
+
+            problems = validate_snapshot(fresh)
+            if problems:
+                kept = "keeping existing snapshot" if old is not None else "no snapshot written"
+                print(f"❌ {year}: schedule failed validation, {kept}:")
+                for problem in problems:
+                    print(f"   - {problem}")
+                logger.error(f"Season {year} failed validation: {'; '.join(problems)}")
+                continue
+
+            try:
+                write_snapshot(self.cache_location, fresh)
+            except OSError as e:
+                print(f"❌ {year}: could not write snapshot: {e}")
+                continue
+            usable[year] = fresh
+
+            diff = diff_snapshots(old, fresh)
+            if old is None:
+                print(f"✅ {year}: {len(fresh.events)} races (new snapshot)")
+            elif not diff:
+                print(f"✅ {year}: {len(fresh.events)} races, no changes")
+            else:
+                print(f"✅ {year}: {len(fresh.events)} races, {len(diff.added)} added, "
+                      f"{len(diff.removed)} removed, {len(diff.moved)} moved")
+            for event in diff.added if old is not None else ():
+                print(f"   + {event.name} ({event.date})")
+            for event in diff.removed:
+                print(f"   - {event.name} ({event.date})")
+            for before, after in diff.moved:
+                print(f"   ~ {after.name}: {before.date} -> {after.date}")
+            if diff and old is not None:
+                logger.info(f"Season {year} schedule changed: {len(diff.added)} added, "
+                            f"{len(diff.removed)} removed, {len(diff.moved)} moved")
+
+        # Rebuild the index from the warmed snapshots
+        self._schedule_index = None
+        self._get_schedule_index(current_year)
+        return usable[current_year] is not None and bool(usable[current_year].events)
+
+    def _get_schedule_index(self, current_year: int) -> Optional[ScheduleIndex]:
+        """Return the schedule index starting at current_year, building it if needed."""
+        index = self._schedule_index
+        if index is not None and index.years[0] == current_year:
+            return index
+
+        season = self._load_season(current_year)
+        if season is None or not season.events:
+            return None
+
+        self._schedule_index = ScheduleIndex([season])
+        return self._schedule_index
+
     def _find_next_and_last_races(
-        self, current_year: int
-    ) -> Tuple[Optional[pd.Series], Optional[pd.Series], int]:
+        self, current_year: int, today: Optional[date] = None
+    ) -> Tuple[Optional[RaceEvent], Optional[RaceEvent], int]:
         """Find next upcoming race and last completed race."""
-        today = datetime.now(self.timezone).date()
+        today = today or self._now().date()
 
-        # Try current year first
-        races_df = self._get_race_schedule(current_year)
-        if races_df is None:
+        index = self._get_schedule_index(current_year)
+        if index is None:
             return None, None, current_year
 
-        # Convert EventDate to date for comparison
-        races_df['EventDate_date'] = races_df['EventDate'].dt.date
+        next_race, last_race = index.next_and_last(today)
 
-        # Find upcoming races (today or later)
-        upcoming_races = races_df[races_df['EventDate_date'] >= today]
+        if next_race is None and current_year + 1 not in index.years:
+            # No upcoming races in current year, extend the index with next year
+            logger.info(f"No upcoming races in {current_year}, checking {current_year + 1}")
+            next_season = self._load_season(current_year + 1)
+            if next_season is not None and next_season.events:
+                index = self._schedule_index = index.with_season(next_season)
+                next_race, last_race = index.next_and_last(today)
 
-        if not upcoming_races.empty:
-            # Found upcoming race in current year
-            next_race = upcoming_races.iloc[0]
+        if next_race is None:
+            return None, None, current_year + 1
 
-            # Find last completed race
-            completed_races = races_df[races_df['EventDate_date'] < today]
-            last_race = completed_races.iloc[-1] if not completed_races.empty else None
+        return next_race, last_race, index.season_of(next_race)
 
-            return next_race, last_race, current_year
+    def _find_next_and_last_sessions(
+        self, current_year: int, now: Optional[datetime] = None
+    ) -> Tuple[Optional[Session], Optional[Session], int]:
+        """Find the next and last countdown_session (e.g. the next sprint) around ``now``."""
+        now = now or self._now()
+        names = COUNTDOWN_SESSIONS[self.countdown_session]
 
-        # No upcoming races in current year, try next year
-        logger.info(f"No upcoming races in {current_year}, checking {current_year + 1}")
-        next_year_races = self._get_race_schedule(current_year + 1)
+        index = self._get_schedule_index(current_year)
+        if index is None:
+            return None, None, current_year
 
-        if next_year_races is None:
-            return None, None, current_year + 1
+        next_session, last_session = index.next_and_last_session(names, now)
 
-        # Convert EventDate to date for comparison
-        next_year_races['EventDate_date'] = next_year_races['EventDate'].dt.date
+        if next_session is None and current_year + 1 not in index.years:
+            logger.info(f"No upcoming {self.countdown_session} sessions in {current_year}, "
+                        f"checking {current_year + 1}")
+            next_season = self._load_season(current_year + 1)
+            if next_season is not None and next_season.events:
+                index = self._schedule_index = index.with_season(next_season)
+                next_session, last_session = index.next_and_last_session(names, now)
 
-        # First race of next year
-        next_race = next_year_races.iloc[0]
+        if next_session is None:
+            return None, None, current_year + 1
 
-        # Last race of current year
-        last_race = races_df.iloc[-1] if not races_df.empty else None
+        return next_session, last_session, index.season_of(next_session.event)
+
+    def _find_countdown_targets(
+        self, now: datetime
+    ) -> Tuple[Optional[Union[RaceEvent, Session]], Optional[Union[RaceEvent, Session]]]:
+        """Find what the countdown runs between: race days, or sessions with countdown_session.
+
+        Without an upcoming session (e.g. no more sprints this season, or a
+        snapshot without session times) it falls back to the race-day countdown.
+        """
+        if self.countdown_session is not None:
+            next_session, last_session, _ = self._find_next_and_last_sessions(now.year, now)
+            if next_session is not None:
+                return next_session, last_session
+        next_race, last_race, _ = self._find_next_and_last_races(now.year, now.date())
+        if next_race is not None and self.countdown_session is not None:
+            logger.warning(f"No upcoming {self.countdown_session} session found, counting down to race day")
+        return next_race, last_race
+
+    def _countdown_progress(self, next_race: Union[RaceEvent, Session],
+                            last_race: Optional[Union[RaceEvent, Session]], now: datetime) -> float:
+        """Calculate the race-left percentage, by hour between sessions or by day between races."""
+        if isinstance(next_race, Session):
+            return self._calculate_session_progress(next_race, last_race, now)
+        return self._calculate_progress(next_race, last_race, now.date())
+
+    def _calculate_session_progress(self, next_session: Session, last_session: Optional[Session],
+                                    now: Optional[datetime] = None) -> float:
+        """Calculate the percentage of hours left until a session, from the previous one."""
+        now = now or self._now()
+
+        if last_session is None:
+            return 0.0
+
+        hour = timedelta(hours=1)
+        total_hours = (next_session.start - last_session.start) // hour
+        # Started hours count as remaining, so 100% is reached when the session starts
+        hours_remaining = -((now - next_session.start) // hour)
 
-        return next_race, last_race, current_year + 1
+        # Same edge cases as _calculate_progress
+        if total_hours <= 0 or hours_remaining <= 0:
+            return 100.0
+        if hours_remaining > total_hours:
+            return 0.0
+        return max(0.0, min(100.0, (hours_remaining / total_hours) * 100))
 
-    def _calculate_progress(self, next_race: pd.Series, last_race: Optional[pd.Series]) -> float:
+    def _calculate_progress(self, next_race: RaceEvent, last_race: Optional[RaceEvent],
+                            today: Optional[date] = None) -> float:
         """Calculate race progress percentage based on days remaining."""
-        today = datetime.now(self.timezone).date()
+        today = today or self._now().date()
 
         if last_race is None:
             # If no last race, assume 0% progress (100% race left)
             return 0.0
 
-        next_race_date = next_race['EventDate'].date()
-        last_race_date = last_race['EventDate'].date()
+        next_race_date = next_race.date
+        last_race_date = last_race.date
 
         # Calculate total days between races
         total_days = (next_race_date - last_race_date).days
@@ -267,49 +712,135 @@ class F1CountdownBot:
         return max(0.0, min(100.0, race_left_percentage))
 
     def _generate_progress_bar(self, race_left_percentage: float) -> str:
-        """Generate ASCII progress bar."""
-        total_chars = 15
-        # Calculate progress made (elapsed time since last race)
-        progress_made_percentage = 100 - race_left_percentage
-        filled_chars = int((progress_made_percentage / 100) * total_chars)
-        empty_chars = total_chars - filled_chars
-
-        # Use ▓ for filled (progress made/time elapsed) and ░ for empty (time remaining)
-        progress_bar = '▓' * filled_chars + '░' * empty_chars
-
-        return progress_bar
-
-    def _compose_tweet(self, next_race: pd.Series, race_left_percentage: float) -> str:
-        """Compose tweet content."""
-        race_name = next_race['EventName']
-        progress_bar = self._generate_progress_bar(race_left_percentage)
+        """Generate ASCII progress bar (from the default template's bar table)."""
+        # Filled cells show progress made (time elapsed since the last race)
+        return self.template.progress_bar(100 - race_left_percentage)
+
+    def _compose_tweet(self, next_race: Union[RaceEvent, Session], race_left_percentage: float,
+                       template: Optional[TweetTemplate] = None) -> str:
+        """Compose tweet content (with a profile's template, if given)."""
+        template = template or self.template
+        race_name = template.fit_race_name(next_race.name)
+        if race_name != next_race.name:
+            logger.warning(f"Race name '{next_race.name}' shortened to fit template '{template.name}'")
+
+        # Progress made matches the progress bar visual
+        return template.render(race_name, 100 - race_left_percentage)
+
+    def _countdown_card(self, next_race: Union[RaceEvent, Session], race_left_percentage: float,
+                        template: Optional[TweetTemplate] = None) -> Optional[Card]:
+        """Return the image card for a countdown tweet, if cards are enabled (not rendered yet)."""
+        if self.cards is None:
+            return None
+        template = template or self.template
+        key = card_key(next_race.name, 100 - race_left_percentage, template, self.card_bucket_percent)
+        return Card(key, template)
 
-        # Calculate progress made percentage to match the progress bar visual
-        progress_made_percentage = 100 - race_left_percentage
+    def _card_path(self, card: Card) -> Optional[str]:
+        """Return the cached card file, rendering it if needed (None if rendering failed)."""
+        try:
+            with self.metrics.phase('card_render'):
+                path, cached = self.cards.get_or_render(card)
+        except Exception as e:
+            logger.warning(f"Could not render image card, posting text only: {e}")
+            return None
+        self.metrics.incr('card_cache_hit' if cached else 'card_cache_miss')
+        return path
 
-        tweet = f"""F1 Race Countdown: {race_name}
-{progress_bar} {progress_made_percentage:.2f}%
-#F1 #Formula1 #Countdown"""
+    def _card_media_ids(self, account: TwitterAccount, card: Optional[Card]) -> Optional[List[str]]:
+        """Upload a card for an account, or reuse its media ID (None posts text only)."""
+        if card is None:
+            return None
+        media_id = self.cards.media_id(card.key, account.name)
+        if media_id is not None:
+            self.metrics.incr('card_media_reused')
+            return [media_id]
+        path = self._card_path(card)
+        if path is None:
+            return None
 
-        return tweet
+        logger.info(
+            f"[API REQUEST] POST https://upload.twitter.com/1.1/media/upload.json "
+            f"(Uploading image card for account '{account.name}')"
+        )
+        try:
+            with self.metrics.phase('media_upload'):
+                media = self._media_api(account).media_upload(path)
+        except Exception as e:
+            self.metrics.http_status('twitter', status_code_of(e))
+            logger.warning(f"Could not upload image card for account '{account.name}', posting text only: {e}")
+            return None
+        self.metrics.http_status('twitter', 200)
+        self.metrics.incr('card_media_uploaded')
+        self.cards.record_media_id(card.key, account.name, media.media_id_string)
+        return [media.media_id_string]
+
+    def countdown_for_dates(self, dates) -> CountdownBatch:
+        """Compute the bot's output for many dates at once (vectorized).
+
+        Gives, for each date, the same next race, race-left percentage,
+        progress bar and tweet that daily_tweet_generation would produce on
+        that day (counting days to race day; countdown_session is ignored).
+        """
+        from countdown_batch import CountdownBatch, batch_countdown, season_years, sorted_events
+
+        template = self.template
+        years = season_years(dates)
+        seasons = [season for season in map(self._load_season, years) if season is not None]
+        arrays = batch_countdown(seasons, dates, bar_width=template.bar_width)
+        events = sorted_events(seasons)
+        race_names = [template.fit_race_name(event.name) for event in events]
+
+        next_races: List[Optional[str]] = []
+        progress_bars: List[Optional[str]] = []
+        tweets: List[str] = []
+        for position, year, race_left, filled in zip(
+            arrays.next_race.tolist(), arrays.years.tolist(),
+            arrays.race_left.tolist(), arrays.filled_chars.tolist()
+        ):
+            if position < 0:
+                next_races.append(None)
+                progress_bars.append(None)
+                tweets.append(template.render_waiting(year))
+                continue
+            next_races.append(events[position].name)
+            progress_bars.append(template.bars[filled])
+            tweets.append(template.render_filled(race_names[position], 100 - race_left, filled))
+
+        return CountdownBatch(
+            dates=arrays.dates,
+            next_race=next_races,
+            race_left=arrays.race_left,
+            progress_bar=progress_bars,
+            tweet=tweets,
+        )
 
-    def _compose_waiting_tweet(self, year: int) -> str:
+    def _compose_waiting_tweet(self, year: int, template: Optional[TweetTemplate] = None) -> str:
         """Compose tweet for waiting for next season's calendar."""
-        return f"The {year} F1 season has concluded! Waiting for the {year + 1} calendar to be announced. #F1"
+        return (template or self.template).render_waiting(year)
 
-    def _post_tweet(self, tweet_content: str, race_info: dict = None) -> bool:
-        """Post tweet to Twitter using Twitter API v2."""
+    def _post_tweet(self, tweet_content: str, race_info: dict = None, card: Optional[Card] = None) -> str:
+        """Post tweet (with its image card, if any) to Twitter through the outbox.
+
+        Returns the run outcome: 'posted' once the tweet is delivered,
+        'deferred' if an exhausted rate limit holds it back, else 'failed'.
+        A deferred tweet, or one still being retried when the wait ends,
+        stays in the outbox and is delivered later.
+        """
         if self.debug_mode:
             print("[DEBUG] Would post tweet (not actually posting in debug mode):")
             print(tweet_content)
-            return True
+            if card is not None:
+                print(f"[DEBUG] Image card: {self._card_path(card)}")
+            return 'posted'
+        account = self.accounts[0]
         try:
-            logger.info("[API REQUEST] POST https://api.twitter.com/2/tweets (Posting tweet via Twitter API v2)")
-            response = self.twitter_api.create_tweet(text=tweet_content)
-            logger.info(f"Tweet posted successfully. Tweet ID: {response.data['id']}")
-            if race_info:
-                self._send_success_notification(tweet_content, race_info)
-            return True
+            item = self._enqueue_tweet(account, tweet_content, race_info or {},
+                                       self._now(ZoneInfo(account.timezone)).date(), card)
+            if item.status == SENT:
+                print(f"⏭️  Already posted today (Tweet ID: {item.tweet_id}), not posting again")
+                return 'posted'
+            item = self._await_delivery([item])[item.id]
         except Exception as e:
             logger.error(f"Failed to post tweet: {e}")
             self._send_discord_notification(
@@ -317,17 +848,238 @@ class F1CountdownBot:
                 message=f"Failed to post tweet: {e}",
                 error_type="TWEET_POST_ERROR"
             )
+            return 'failed'
+
+        if item.status == SENT:
+            return 'posted'
+        if item.finished:
+            # Failed and expired tweets are reported by the delivery worker
+            return 'failed'
+        print(f"⏳ Tweet {self._delivery_error(item)}")
+        logger.warning(f"Tweet {self._delivery_error(item)}")
+        self._send_discord_notification(
+            title="Tweet Deferred" if item.status == DEFERRED else "Tweet Delayed",
+            message=self._delivery_error(item),
+            error_type="TWEET_POST_DELAYED"
+        )
+        return 'deferred' if item.status == DEFERRED else 'failed'
+
+    def _print_debug_post(self, account: TwitterAccount, tweet_content: str, card: Optional[Card] = None):
+        """Show the tweet a debug run would post to an account."""
+        # One print call, so concurrent profiles don't interleave their output
+        card_line = f"\n[DEBUG] Image card: {self._card_path(card)}" if card is not None else ""
+        print(f"[DEBUG] Would post tweet to '{account.name}' (not actually posting in debug mode):\n"
+              f"{tweet_content}{card_line}")
+
+    def _enqueue_tweet(self, account: TwitterAccount, tweet_content: str, race_info: dict,
+                       local_date: date, card: Optional[Card] = None,
+                       timezone: Optional[str] = None) -> OutboxItem:
+        """Write a composed tweet to the outbox.
+
+        It must be delivered within [outbox] deadline_hours, and before its
+        local day (in ``timezone``, default the account's) ends: a countdown
+        is never posted on the wrong day.
+        """
+        now = self._now(ZoneInfo(timezone or account.timezone))
+        next_day = local_date + timedelta(days=1)
+        deadline = min(
+            now + timedelta(hours=self.config.outbox.deadline_hours),
+            datetime(next_day.year, next_day.month, next_day.day, tzinfo=now.tzinfo)
+        )
+        card_info = None if card is None else {
+            "race_name": card.key.race_name, "bucket": card.key.bucket, "template": card.key.template
+        }
+        with self.metrics.phase('enqueue'):
+            item = self._outbox.enqueue(
+                account.name, local_date.isoformat(), tweet_content,
+                {"race_info": race_info, "card": card_info}, deadline.timestamp(), now.timestamp()
+            )
+        self.metrics.incr('outbox_enqueued')
+        return item
+
+    def _await_delivery(self, items: Sequence[OutboxItem],
+                        finished_at: Optional[Dict[int, float]] = None) -> Dict[int, OutboxItem]:
+        """Have the delivery worker send the items and wait for them ([outbox] wait_seconds at most).
+
+        ``finished_at`` receives when each item finished (see DeliveryWorker.wait).
+        """
+        return self._delivery_worker().wait(
+            [item.id for item in items], self.config.outbox.wait_seconds, finished_at
+        )
+
+    def _delivery_worker(self) -> DeliveryWorker:
+        """Return the outbox delivery worker, started and looking for due tweets."""
+        if self._delivery is None:
+            self._delivery = DeliveryWorker(
+                self._outbox, self._deliver_outbox_item, self._is_transient_error, self._report_undelivered,
+                clock=lambda: self._now().timestamp()
+            )
+            self._configure_delivery()
+        self._delivery.start()
+        return self._delivery
+
+    def close(self):
+        """Stop the outbox delivery worker, letting a delivery in progress finish.
+
+        Tweets still queued stay in the outbox for the next run.
+        """
+        if self._delivery is not None:
+            self._delivery.stop()
+
+    def _configure_delivery(self):
+        """Apply the current configuration to the delivery worker."""
+        settings = self.config.outbox
+        self._delivery.outbox = self._outbox
+        self._delivery.threads = self.post_workers
+        self._delivery.policy = RetryPolicy(
+            max_attempts=settings.max_attempts,
+            retry_delay=settings.retry_delay_seconds,
+            max_delay=self.retry_max_delay_minutes * 60,
+        )
+
+    def _deliver_outbox_item(self, item: OutboxItem) -> str:
+        """Post an outbox item (delivery worker), returning its tweet ID (raises on failure)."""
+        account = next((account for account in self.accounts if account.name == item.account), None)
+        if account is None:
+            raise ConfigError(f"account '{item.account}' is no longer configured")
+        if self.multi_account:
+            client = self._twitter_client(account)
+        else:
+            if self.twitter_api is None:
+                # Not set up by a backed-off run, or dropped by a config reload
+                self.twitter_api = self._setup_twitter_api()
+            client = self.twitter_api
+
+        # Don't spend a request on an exhausted budget: defer until it resets
+        self._check_rate_limit(account, self._now().timestamp())
+        try:
+            with self.metrics.phase(f"deliver:{account.name}"):
+                tweet_id, posted = self._create_tweet_once(
+                    account, client, item.text, date.fromisoformat(item.local_date), self._outbox_card(item)
+                )
+        except Exception as e:
+            self._handle_auth_error(account, e)
+            if status_code_of(e) == 429:
+                # The response hook recorded when the limit resets
+                self._check_rate_limit(account, self._now().timestamp(), e)
+            raise
+        if posted:
+            logger.info(f"Tweet posted successfully for account '{account.name}'. Tweet ID: {tweet_id}")
+            race_info = item.info.get("race_info")
+            if race_info:
+                self._send_success_notification(item.text, race_info)
+        return tweet_id
+
+    def _check_rate_limit(self, account: TwitterAccount, now: float, error: Optional[Exception] = None):
+        """Raise DeliveryDeferred if the account's tweet budget is exhausted."""
+        until = self.rate_limits.exhausted_until(account.name, TWEET_ENDPOINT, now)
+        if until is None:
+            return
+        self.metrics.incr('rate_limit_deferred')
+        reset = datetime.fromtimestamp(until, ZoneInfo(account.timezone))
+        raise DeliveryDeferred(
+            f"rate limit of {TWEET_ENDPOINT} for '{account.name}' exhausted until {reset:%H:%M:%S %Z}", until
+        ) from error
+
+    def _outbox_card(self, item: OutboxItem) -> Optional[Card]:
+        """Return the image card of an outbox item (None if it has none, or its template is gone)."""
+        card_info = item.info.get("card")
+        if card_info is None or self.cards is None:
+            return None
+        key = CardKey(**card_info)
+        templates = [self.template, *self.templates.values(),
+                     *(profile.template for profile in self.profiles if profile.template is not None)]
+        template = next((t for t in templates if template_fingerprint(t) == key.template), None)
+        if template is None:
+            logger.warning(f"Template of the image card for '{item.account}' is no longer configured, "
+                           f"posting text only")
+            return None
+        return Card(key, template)
+
+    def _is_transient_error(self, error: Exception) -> bool:
+        """Return True if a failed post is worth retrying (network errors, HTTP 429 and 5xx)."""
+        if isinstance(error, (ConfigError, TwitterSetupError)):
             return False
+        status = status_code_of(error)
+        return status is None or status == 429 or status >= 500
+
+    def _delivery_error(self, item: OutboxItem) -> str:
+        """Describe why an outbox item has not been delivered."""
+        if item.status == EXPIRED:
+            return f"expired undelivered after {item.attempts} attempt(s): {item.last_error}"
+        if item.finished:
+            return f"failed after {item.attempts} attempt(s): {item.last_error}"
+        timezone = ZoneInfo(self._account_timezone(item.account))
+        deadline = datetime.fromtimestamp(item.deadline, timezone)
+        if item.status == DEFERRED:
+            return f"deferred until {datetime.fromtimestamp(item.next_attempt_at, timezone):%H:%M %Z} ({item.last_error})"
+        if item.last_error is None:
+            return f"queued, to be delivered by {deadline:%H:%M %Z}"
+        return f"not delivered yet ({item.last_error}), retrying until {deadline:%H:%M %Z}"
+
+    def _account_timezone(self, name: str) -> str:
+        """Return the timezone of a configured account (the bot's, for unknown ones)."""
+        account = next((account for account in self.accounts if account.name == name), None)
+        return account.timezone if account is not None else self.config.timezone
+
+    def _report_undelivered(self, item: OutboxItem):
+        """Alert about a tweet the delivery worker gave up on (delivery worker)."""
+        self._send_discord_notification(
+            title="Tweet Failed",
+            message=f"Tweet for `{item.account}` on {item.local_date} {self._delivery_error(item)}",
+            error_type="TWEET_POST_ERROR"
+        )
+
+    def _ledger(self, account: TwitterAccount) -> PostLedger:
+        """Return the post ledger for an account."""
+        with self._twitter_clients_lock:
+            ledger = self._ledgers.get(account.name)
+            if ledger is None:
+                ledger = self._ledgers[account.name] = PostLedger(self.cache_location, account.name)
+            return ledger
+
+    def _create_tweet_once(self, account: TwitterAccount, client: tweepy.Client, tweet_content: str,
+                           local_date: Optional[date] = None, card: Optional[Card] = None) -> Tuple[str, bool]:
+        """Post a tweet unless the ledger shows it was already posted today.
+
+        Returns the tweet ID and whether it was posted by this call. The
+        ledger lock is held across the API call, so an overlapping run waits
+        and then sees this post instead of duplicating it.
+        """
+        local_date = local_date or self._now(ZoneInfo(account.timezone)).date()
+        key = PostKey.for_tweet(account.name, local_date, tweet_content)
+
+        with self._ledger(account).locked() as ledger:
+            existing = ledger.get(key)
+            if existing is not None:
+                self.metrics.incr('duplicate_post_skipped')
+                logger.info(
+                    f"Tweet already posted for account '{account.name}' on {key.local_date} "
+                    f"(Tweet ID: {existing['tweet_id']}), skipping"
+                )
+                return existing['tweet_id'], False
+
+            media_ids = self._card_media_ids(account, card)
+            logger.info(
+                f"[API REQUEST] POST https://api.twitter.com/2/tweets (Posting tweet for account '{account.name}')"
+            )
+            try:
+                response = client.create_tweet(text=tweet_content, media_ids=media_ids)
+            except Exception as e:
+                self.metrics.http_status('twitter', status_code_of(e))
+                raise
+            self.metrics.http_status('twitter', 201)
+            tweet_id = response.data['id']
+            ledger.record(key, tweet_id)
+            return tweet_id, True
 
     def _send_discord_notification(self, title: str, message: str, error_type: str = "ERROR") -> bool:
-        """Send error notification to Discord webhook."""
-        webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+        """Queue an error notification for the Discord webhook."""
+        webhook_url = self.config.error_webhook_url
         if not webhook_url:
             logger.warning("Discord webhook URL not set. Skipping Discord notification.")
             return False
         try:
-            logger.info(f"[API REQUEST] POST {webhook_url} (Sending error notification to Discord)")
-            import requests
             payload = {
                 "content": f"@here {title}",
                 "embeds": [
@@ -337,32 +1089,25 @@ class F1CountdownBot:
                         "color": 15158332 if error_type == "ERROR" else 5763719,
                         "fields": [
                             {"name": "Type", "value": error_type, "inline": True},
-                            {"name": "Timestamp", "value": datetime.now().strftime('%Y-%m-%d %H:%M:%S'), "inline": True}
+                            {"name": "Timestamp", "value": self._now().strftime('%Y-%m-%d %H:%M:%S'), "inline": True}
                         ],
                         "footer": {"text": "F1 Countdown Bot Notification"}
                     }
                 ]
             }
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            if response.status_code == 204:
-                logger.info("Discord error notification sent successfully.")
-                return True
-            else:
-                logger.error(f"Failed to send Discord notification: {response.status_code} {response.text}")
-                return False
+            # Delivered in the background so the posting path never waits on Discord
+            return self.notifications.send(webhook_url, payload, "error notification", self.metrics)
         except Exception as e:
             logger.error(f"Exception sending Discord notification: {e}")
             return False
 
     def _send_success_notification(self, tweet_content: str, race_info: dict = None) -> bool:
-        """Send success notification to Discord webhook."""
-        webhook_url = os.getenv("DISCORD_SUCCESS_WEBHOOK_URL")
+        """Queue a success notification for the Discord webhook."""
+        webhook_url = self.config.success_webhook_url
         if not webhook_url:
             logger.info("Discord success webhook URL not set. Skipping success notification.")
             return False
         try:
-            logger.info(f"[API REQUEST] POST {webhook_url} (Sending success notification to Discord)")
-            import requests
             payload = {
                 "content": "✅ Tweet posted successfully!",
                 "embeds": [
@@ -374,37 +1119,65 @@ class F1CountdownBot:
                             {"name": "Next Race", "value": race_info.get("next_race", "N/A"), "inline": True},
                             {"name": "Progress Made", "value": f"{race_info.get('progress_made', 0):.2f}%", "inline": True},
                             {"name": "Race Left", "value": f"{race_info.get('race_left', 0):.2f}%", "inline": True},
-                            {"name": "Timestamp", "value": datetime.now().strftime('%Y-%m-%d %H:%M:%S'), "inline": True}
+                            {"name": "Timestamp", "value": self._now().strftime('%Y-%m-%d %H:%M:%S'), "inline": True}
                         ],
                         "footer": {"text": "F1 Countdown Bot Notification"}
                     }
                 ]
             }
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            if response.status_code == 204:
-                logger.info("Discord success notification sent successfully.")
-                return True
-            else:
-                logger.error(f"Failed to send Discord success notification: {response.status_code} {response.text}")
-                return False
+            if race_info.get("account"):
+                payload["embeds"][0]["fields"].append(
+                    {"name": "Account", "value": race_info["account"], "inline": True}
+                )
+            return self.notifications.send(webhook_url, payload, "success notification", self.metrics)
         except Exception as e:
             logger.error(f"Exception sending Discord success notification: {e}")
             return False
 
-    def daily_tweet_generation(self):
-        """Main function to generate and post daily tweet."""
+    def daily_tweet_generation(self, profiles: Optional[Sequence[Profile]] = None):
+        """Main function to generate and post daily tweet (for all or the given profiles)."""
+        # Each run after the first (--schedule mode) gets fresh metrics
+        if self.metrics.exported:
+            self.metrics = RunMetrics()
+            set_run_id(self.metrics.run_id)
+        self._publish_health(run_in_progress={
+            "run_id": self.metrics.run_id, "started_at": self._now().isoformat(timespec='seconds')
+        })
+        try:
+            self._daily_tweet_generation(profiles)
+        finally:
+            self._finish_run()
+
+    def _daily_tweet_generation(self, profiles: Optional[Sequence[Profile]] = None):
+        """Generate and post the daily tweet, recording the outcome in self.metrics."""
+        if self.backoff_until is not None:
+            self.metrics.outcome = 'backoff'
+
+            logger.info(
+                f"Inside retry backoff window until {self.backoff_until.isoformat()} "
+                f"(Fibonacci index: {self._fibonacci_index}), skipping this run"
+            )
+            print(f"⏸️  Backing off after earlier failure until {self.backoff_until.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+            return
+
         logger.info("Starting daily tweet generation")
 
         # Print start message
-        current_time = datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S %Z')
+        current_time = self._now().strftime('%Y-%m-%d %H:%M:%S %Z')
         print(f"\n🚀 DAILY TWEET GENERATION STARTED at {current_time}")
         print("-" * 60)
 
         try:
-            current_year = datetime.now(self.timezone).year
+            if self.multi_account:
+                self._post_to_all_accounts(profiles)
+                return
+
+            now = self._now()
+            current_year = now.year
 
-            # Find next race and last race
-            next_race, last_race, _ = self._find_next_and_last_races(current_year)
+            # Find next race (or session) and last race
+            with self.metrics.phase('race_resolution'):
+                next_race, last_race = self._find_countdown_targets(now)
 
             if next_race is None:
                 # No race data available
@@ -413,49 +1186,58 @@ class F1CountdownBot:
                 print(f"No upcoming races found for {current_year}")
                 print("Posting waiting tweet for next season...")
 
-                waiting_tweet = self._compose_waiting_tweet(current_year)
-                self._post_tweet(waiting_tweet, {
-                    "next_race": f"Waiting for {current_year + 1} season",
-                    "progress_made": 0,
-                    "race_left": 0
-                })
+                with self.metrics.phase('compose'):
+                    waiting_tweet = self._compose_waiting_tweet(current_year)
+                with self.metrics.phase('post'):
+                    self._post_tweet(waiting_tweet, {
+                        "next_race": f"Waiting for {current_year + 1} season",
+                        "progress_made": 0,
+                        "race_left": 0
+                    })
+                self.metrics.outcome = 'waiting'
 
                 # Reset Fibonacci index on successful data fetch (even if no races)
-                self._fibonacci_index = 0
-                self._last_successful_fetch = datetime.now(self.timezone)
+                self._record_success()
                 return
 
             # Calculate progress
-            race_left_percentage = self._calculate_progress(next_race, last_race)
+            with self.metrics.phase('race_resolution'):
+                race_left_percentage = self._countdown_progress(next_race, last_race, now)
 
             # Print debug information
             print(f"\n🏁 F1 COUNTDOWN DEBUG INFO:")
-            print(f"Next Race: {next_race['EventName']}")
-            print(f"Next Race Date: {next_race['EventDate'].date()}")
+            print(f"Next Race: {next_race.name}")
+            print(f"Next Race Date: {next_race.date}")
+            if isinstance(next_race, Session):
+                print(f"Next Session Start: {next_race.start.astimezone(self.timezone):%Y-%m-%d %H:%M %Z}")
             if last_race is not None:
-                print(f"Last Race: {last_race['EventName']}")
-                print(f"Last Race Date: {last_race['EventDate'].date()}")
+                print(f"Last Race: {last_race.name}")
+                print(f"Last Race Date: {last_race.date}")
             else:
                 print("Last Race: None (start of season)")
             print(f"Progress: {100 - race_left_percentage:.2f}%")
             print(f"Race Left: {race_left_percentage:.2f}%")
 
             # Compose and post tweet
-            tweet_content = self._compose_tweet(next_race, race_left_percentage)
-
-            if self._post_tweet(tweet_content, {
-                "next_race": next_race['EventName'],
-                "progress_made": 100 - race_left_percentage,
-                "race_left": race_left_percentage
-            }):
+            with self.metrics.phase('compose'):
+                tweet_content = self._compose_tweet(next_race, race_left_percentage)
+            card = self._countdown_card(next_race, race_left_percentage)
+
+            with self.metrics.phase('post'):
+                self.metrics.outcome = self._post_tweet(tweet_content, {
+                    "next_race": next_race.name,
+                    "progress_made": 100 - race_left_percentage,
+                    "race_left": race_left_percentage
+                }, card)
+            if self.metrics.outcome == 'posted':
                 # Reset Fibonacci index on successful operation
-                self._fibonacci_index = 0
-                self._last_successful_fetch = datetime.now(self.timezone)
+                self._record_success()
 
-                logger.info(f"Race: {next_race['EventName']}, Progress: {100 - race_left_percentage:.2f}%, "
+                logger.info(f"Race: {next_race.name}, Progress: {100 - race_left_percentage:.2f}%, "
                           f"Race Left: {race_left_percentage:.2f}%")
 
         except Exception as e:
+            self.metrics.outcome = 'failed'
             logger.error(f"Error in daily tweet generation: {e}")
             print(f"❌ Error in daily tweet generation: {e}")
 
@@ -466,95 +1248,531 @@ class F1CountdownBot:
                 error_type="TWEET_GENERATION_ERROR"
             )
 
-            self._handle_fetch_failure()
+            self._handle_fetch_failure(profiles)
+
+    def print_outbox_status(self, limit: int = 10):
+        """Print the outbox's item counts, its most recent tweets and the known rate-limit budgets."""
+        counts = self._outbox.counts()
+        print(f"📬 Outbox {self._outbox.path}: "
+              + (", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "empty"))
+        for item in self._outbox.recent(limit):
+            detail = item.tweet_id if item.status == SENT else self._delivery_error(item)
+            print(f"  {item.local_date} {item.account:<12} {item.status:<8} {detail}")
+        now = self._now().timestamp()
+        for account in self.accounts:
+            for endpoint, windows in sorted(self.rate_limits.budgets(account.name).items()):
+                budget = ", ".join(
+                    f"{window} {limit.remaining}/{'?' if limit.limit is None else limit.limit} until "
+                    f"{datetime.fromtimestamp(limit.reset, ZoneInfo(account.timezone)):%H:%M %Z}"
+                    for window, limit in sorted(windows.items()) if limit.reset > now
+                )
+                if budget:
+                    print(f"  ⏱️  {account.name} {endpoint}: {budget}")
+
+    def profiles_named(self, names: Sequence[str]) -> List[Profile]:
+        """Return the profiles with the given names (ValueError for unknown names)."""
+        by_name = {profile.name: profile for profile in self.profiles}
+        unknown = [name for name in names if name not in by_name]
+        if unknown:
+            raise ValueError(f"unknown profile(s): {', '.join(unknown)} (configured: {', '.join(by_name)})")
+        return [by_name[name] for name in names]
+
+    def _resolve_countdown(self, now: datetime) -> Tuple[Optional[Union[RaceEvent, Session]],
+                                                          Optional[Union[RaceEvent, Session]], Optional[float]]:
+        """Find the countdown targets for a local time and the race-left percentage (None without a next race)."""
+        next_race, last_race = self._find_countdown_targets(now)
+        if next_race is None:
+            return None, last_race, None
+        return next_race, last_race, self._countdown_progress(next_race, last_race, now)
+
+    def _compose_countdown(self, now: datetime, next_race: Optional[Union[RaceEvent, Session]],
+                           race_left_percentage: Optional[float],
+                           template: Optional[TweetTemplate] = None) -> Tuple[str, dict, Optional[Card]]:
+        """Compose the tweet, its race info and its image card for a resolved countdown."""
+        if next_race is None:
+            return self._compose_waiting_tweet(now.year, template), {
+                "next_race": f"Waiting for {now.year + 1} season",
+                "progress_made": 0,
+                "race_left": 0
+            }, None
+
+        return self._compose_tweet(next_race, race_left_percentage, template), {
+            "next_race": next_race.name,
+            "progress_made": 100 - race_left_percentage,
+            "race_left": race_left_percentage
+        }, self._countdown_card(next_race, race_left_percentage, template)
+
+    def _post_to_all_accounts(self, profiles: Optional[Sequence[Profile]] = None) -> List[AccountPostResult]:
+        """Compose each profile's tweet and post all profiles concurrently."""
+        profiles = self.profiles if profiles is None else profiles
+
+        # The schedule index is shared, so resolving is cheap after the first
+        # profile: each one only evaluates its own "today" against it
+        resolved = {}
+        with self.metrics.phase('race_resolution'):
+            for profile in profiles:
+                now = self._now(ZoneInfo(profile.timezone))
+                resolved[profile.name] = (now, self._resolve_countdown(now))
+
+        tweets = {}
+        with self.metrics.phase('compose'):
+            for profile in profiles:
+                now, (next_race, _, race_left_percentage) = resolved[profile.name]
+                tweet_content, race_info, card = self._compose_countdown(
+                    now, next_race, race_left_percentage, profile.template
+                )
+                if profile.name != profile.account.name:
+                    race_info["account"] = f"{profile.name} (@{profile.account.name})"
+                tweets[profile.name] = (tweet_content, race_info, now.date(), card)
+
+        if self.debug_mode:
+            def post(profile: Profile) -> Optional[str]:
+                tweet_content, _, _, card = tweets[profile.name]
+                self._print_debug_post(profile.account, tweet_content, card)
+                return None
 
-    def _handle_fetch_failure(self):
-        """Handle data fetch failure with Fibonacci retry."""
+            with self.metrics.phase('post'):
+                results = run_per_account(profiles, post, self.post_workers)
+        else:
+            results = self._deliver_to_all_accounts(profiles, tweets)
+
+        print(f"\n📣 POSTED TO {len(results)} {'PROFILES' if self.multi_profile else 'ACCOUNTS'}:")
+        for result in results:
+            status = "✅" if result.success else "⏳" if result.deferred else "❌"
+            detail = result.error if not result.success else (result.tweet_id or "not posted (debug)")
+            print(f"  {status} {result.account}: {detail} ({result.elapsed:.2f}s)")
+
+        failed = [result for result in results if not result.success and not result.deferred]
+        if failed:
+            self.metrics.outcome = 'failed'
+        elif any(result.deferred for result in results):
+            # Rate limited: the outbox posts them once the limit resets
+            self.metrics.outcome = 'deferred'
+        else:
+            self.metrics.outcome = 'posted'
+        if failed:
+            logger.error(
+                "Failed to post tweet for accounts: "
+                + ", ".join(f"{result.account} ({result.error})" for result in failed)
+            )
+        elif self.metrics.outcome == 'posted':
+            # Reset Fibonacci index on successful operation
+            self._record_success()
+
+        return results
+
+    def _deliver_to_all_accounts(self, profiles: Sequence[Profile],
+                                 tweets: Dict[str, tuple]) -> List[AccountPostResult]:
+        """Queue each profile's tweet in the outbox and wait for the delivery worker to send them."""
+        started = time.monotonic()
+        items = {}
+        for profile in profiles:
+            tweet_content, race_info, today, card = tweets[profile.name]
+            items[profile.name] = self._enqueue_tweet(
+                profile.account, tweet_content, {"account": profile.account.name, **race_info}, today, card,
+                profile.timezone
+            )
+
+        # Each account's time is its own item's, not the slowest one's
+        finished_at: Dict[int, float] = {}
+        with self.metrics.phase('post'):
+            delivered = self._await_delivery(list(items.values()), finished_at)
+        ended = time.monotonic()
+
+        results = []
+        delayed = []
+        for profile in profiles:
+            item = delivered.get(items[profile.name].id, items[profile.name])
+            elapsed = finished_at.get(item.id, ended) - started
+            if item.status == SENT:
+                results.append(AccountPostResult(profile.name, True, tweet_id=item.tweet_id, elapsed=elapsed))
+                continue
+            results.append(AccountPostResult(profile.name, False, error=self._delivery_error(item),
+                                             elapsed=elapsed, deferred=item.status == DEFERRED))
+            if not item.finished:
+                delayed.append(results[-1])
+
+        # Tweets that failed or expired are reported by the delivery worker
+        if delayed:
+            self._send_discord_notification(
+                title="Tweet Deferred" if all(result.deferred for result in delayed) else "Tweet Delayed",
+                message="\n".join(f"`{result.account}`: {result.error}" for result in delayed),
+                error_type="TWEET_POST_DELAYED"
+            )
+        return results
+
+    def _record_success(self):
+        """Reset the Fibonacci retry state after a successful run."""
+        self._fibonacci_index = 0
+        self._last_successful_fetch = self._now()
+        self._retry_state.fibonacci_index = 0
+        self._retry_state.next_attempt_at = None
+        self._retry_state.last_successful_fetch = self._last_successful_fetch.isoformat()
+        self._save_retry_state()
+
+    def _save_retry_state(self):
+        """Persist the retry state for the next invocation."""
+        try:
+            self._retry_store.save(self._retry_state)
+        except OSError as e:
+            logger.warning(f"Could not save retry state: {e}")
+
+    def _handle_fetch_failure(self, profiles: Optional[Sequence[Profile]] = None):
+        """Handle data fetch failure with Fibonacci retry (of the given profiles)."""
         self._fibonacci_index += 1
-        retry_delay_minutes = self._fibonacci(self._fibonacci_index)
+        self.metrics.incr('retries')
+        retry_delay_minutes = backoff_delay_minutes(
+            self._fibonacci(self._fibonacci_index), self.retry_max_delay_minutes, self.retry_jitter
+        )
 
-        logger.warning(f"Data fetch failed. Retrying in {retry_delay_minutes} minutes "
+        logger.warning(f"Data fetch failed. Retrying in {retry_delay_minutes:.1f} minutes "
                       f"(Fibonacci index: {self._fibonacci_index})")
 
         # Print retry information
-        retry_time = datetime.now(self.timezone) + timedelta(minutes=retry_delay_minutes)
-        print(f"⏰ Data fetch failed. Retrying in {retry_delay_minutes} minutes at {retry_time.strftime('%H:%M')}")
+        retry_time = self._now() + timedelta(minutes=retry_delay_minutes)
+        print(f"⏰ Data fetch failed. Retrying in {retry_delay_minutes:.1f} minutes at {retry_time.strftime('%H:%M')}")
         print(f"   Fibonacci retry sequence: attempt #{self._fibonacci_index}")
 
-        # SCHEDULING DISABLED FOR PYTHONANYWHERE CRON - Uncomment below for self-managed scheduling
-        # Schedule retry
-        # schedule.every().day.at(retry_time.strftime('%H:%M')).do(self.daily_tweet_generation).tag('retry')
+        # Runs started before retry_time (e.g. the next cron invocation) back off
+        self._retry_state.fibonacci_index = self._fibonacci_index
+        self._retry_state.next_attempt_at = retry_time.isoformat()
+        self._save_retry_state()
+
+        # In --schedule mode, run the retry as a real job (replacing any pending retry)
+        if self._scheduler is not None:
+            tag = self._retry_tag(profiles)
+            self._scheduler.cancel(tag)
+            self._scheduler.schedule_at(
+                retry_time.timestamp(), functools.partial(self.daily_tweet_generation, profiles),
+                name=f"retry #{self._fibonacci_index}", tag=tag
+            )
 
-        # Clear previous retry jobs to avoid accumulation
-        # schedule.clear('retry')
-        # schedule.every().day.at(retry_time.strftime('%H:%M')).do(self.daily_tweet_generation).tag('retry')
+    def _retry_tag(self, profiles: Optional[Sequence[Profile]] = None) -> str:
+        """Scheduler tag for the retry job of a set of profiles."""
+        if profiles is None:
+            return 'retry'
+        return 'retry:' + ','.join(profile.name for profile in profiles)
 
-    def run(self):
-        """Main execution loop."""
-        logger.info("F1 Countdown Bot starting...")
+    def _finish_run(self):
+        """Export this run's metrics."""
+        # Wait (bounded) for this run's notifications so their timings are included
+        self.notifications.flush()
+        metrics = self.metrics
+        metrics.export(self.metrics_file, self.prometheus_file)
+
+        totals = metrics.phase_totals()
+        logger.info(
+            f"Run {metrics.run_id} finished ({metrics.outcome}): "
+            + ", ".join(f"{name} {total['wall_seconds'] * 1e3:.1f} ms" for name, total in totals.items())
+        )
+        self._publish_health(run_in_progress=None, last_run={
+            "run_id": metrics.run_id,
+            "outcome": metrics.outcome,
+            "finished_at": self._now().isoformat(timespec='seconds'),
+        })
+
+    def _start_health_server(self):
+        """Serve the [health] endpoint (--schedule mode), replacing a running one."""
+        self._stop_health_server()
+        settings = self.config.health
+        if not settings.port:
+            return
+        from health import HealthServer, HealthStatus
+
+        if self._health is None:
+            self._health = HealthStatus()
+        try:
+            self._health_server = HealthServer(self._health, settings.host, settings.port).start()
+        except OSError as e:
+            logger.error(f"Could not start the health endpoint on {settings.host}:{settings.port}: {e}")
+            return
+        self._publish_health()
+        print(f"🩺 Health endpoint: {self._health_server.url}/status")
+
+    def _stop_health_server(self):
+        """Stop serving the health endpoint, if it runs."""
+        if self._health_server is not None:
+            self._health_server.stop()
+            self._health_server = None
+
+    def _publish_health(self, **fields):
+        """Publish the bot's current state to the health endpoint (no-op without one).
+
+        Everything a probe reads is computed here, when the state changes,
+        never per request.
+        """
+        if self._health is None:
+            return
+        job = self._scheduler.next_job(include_quiet=False) if self._scheduler is not None else None
+        now = self._now()
+        seasons = self._schedule_index.seasons if self._schedule_index is not None else ()
+        try:
+            outbox = self._outbox.counts()
+        except sqlite3.Error as e:
+            outbox = {"error": str(e)}
+        self._health.publish(
+            last_successful_fetch=(
+                self._last_successful_fetch.isoformat(timespec='seconds') if self._last_successful_fetch else None
+            ),
+            fibonacci_index=self._fibonacci_index,
+            backoff_until=self._retry_state.next_attempt_at,
+            next_run={
+                "name": job.name,
+                "at": datetime.fromtimestamp(job.when, self.timezone).isoformat(timespec='seconds'),
+            } if job is not None else None,
+            cache={
+                "location": self.cache_location,
+                "snapshot_max_age_hours": self.snapshot_max_age.total_seconds() / 3600,
+                "seasons": {
+                    str(season.year): {
+                        "built_at": season.built_at.isoformat(timespec='seconds'),
+                        "races": len(season.events),
+                        "stale": season.is_stale(self.snapshot_max_age, now),
+                    }
+                    for season in seasons
+                },
+            },
+            outbox=outbox,
+            **fields
+        )
+
+    def _next_tweet_time(self, now: Optional[datetime] = None,
+                         profile: Optional[Profile] = None) -> datetime:
+        """Return the next occurrence of tweet_time in the configured (or profile's) timezone."""
+        tz = ZoneInfo(profile.timezone) if profile is not None else self.timezone
+        tweet_time = profile.tweet_time if profile is not None else self.tweet_time
+        now = (now or self._now(tz)).astimezone(tz)
+        hour, minute = (int(part) for part in tweet_time.split(':'))
+        candidate = datetime(now.year, now.month, now.day, hour, minute, tzinfo=tz)
+        if candidate <= now:
+            tomorrow = now.date() + timedelta(days=1)
+            candidate = datetime(tomorrow.year, tomorrow.month, tomorrow.day, hour, minute, tzinfo=tz)
+        return candidate
+
+    def _schedule_daily_tweet(self, profile: Optional[Profile] = None):
+        """Schedule the next daily tweet job (of one profile, in multi-profile mode)."""
+        next_run = self._next_tweet_time(profile=profile)
+        name = 'daily tweet' if profile is None else f"daily tweet ({profile.name})"
+        # The job looks its profile up by name, so a config reload applies to it
+        self._scheduler.schedule_at(
+            next_run.timestamp(),
+            functools.partial(self._scheduled_daily_tweet, profile.name if profile is not None else None),
+            name=name, tag='daily' if profile is None else f"daily:{profile.name}"
+        )
+        logger.info(f"Next {name} scheduled at {next_run.strftime('%Y-%m-%d %H:%M %Z')}")
+        print(f"⏰ Next {name}: {next_run.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        self._publish_health()
+
+    def _schedule_daily_tweets(self):
+        """Schedule the next daily tweet of every profile run() serves."""
+        if not self.multi_profile:
+            self._schedule_daily_tweet()
+            return
+        names = self._run_profile_names
+        for profile in self.profiles:
+            if names is None or profile.name in names:
+                self._schedule_daily_tweet(profile)
+
+    def _scheduled_daily_tweet(self, profile_name: Optional[str] = None):
+        """Daily job: post the tweet, then schedule tomorrow's run."""
+        profile = None
+        if profile_name is not None:
+            profile = next((p for p in self.profiles if p.name == profile_name), None)
+            if profile is None:
+                logger.warning(f"Profile '{profile_name}' is no longer configured, not posting for it")
+                return
+        profiles = [profile] if profile is not None else None
+        try:
+            # A pending retry is superseded by the regular run
+            self._scheduler.cancel(self._retry_tag(profiles))
+            self.daily_tweet_generation(profiles)
+        finally:
+            self._schedule_daily_tweet(profile)
+
+    def reload_config(self) -> bool:
+        """Reload config.ini if it changed since the current snapshot was loaded.
+
+        Returns True if a new snapshot was applied. An invalid file is
+        reported once (per modification) and the current snapshot is kept.
+        """
+        path = self.config.path
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self.config.mtime_ns or mtime_ns == self._rejected_config_mtime_ns:
+            return False
 
-        # SCHEDULING DISABLED FOR PYTHONANYWHERE CRON - Uncomment below for self-managed scheduling
-        # Schedule daily tweet
-        # schedule.every().day.at(self.tweet_time).do(self.daily_tweet_generation).tag('daily')
+        try:
+            config = load_config(path)
+        except ConfigError as e:
+            self._rejected_config_mtime_ns = mtime_ns
+            logger.error(f"Not reloading {path}, keeping the current configuration: {e}")
+            self._send_discord_notification(
+                title="Config Reload Failed",
+                message=f"`{path}` is invalid, the bot keeps running with its previous configuration:\n\n`{e}`",
+                error_type="CONFIG_ERROR"
+            )
+            return False
+
+        old = self.config
+        changed = changed_fields(old, config)
+        self._rejected_config_mtime_ns = None
+        self._apply_config(config)
+        logger.info(f"Reloaded {path}" + (f" (changed: {', '.join(changed)})" if changed else " (no changes)"))
+
+        if self._scheduler is not None and {'tweet_time', 'timezone', 'profiles', 'multi_profile'} & set(changed):
+            self._scheduler.cancel('daily')
+            for profile in old.profiles:
+                self._scheduler.cancel(f"daily:{profile.name}")
+            self._schedule_daily_tweets()
+        if self._scheduler is not None and 'health' in changed:
+            self._start_health_server()
+        self._publish_health()
+        return True
+
+    def _schedule_config_check(self):
+        """Schedule the next check of config.ini for changes (--schedule mode)."""
+        if self.config.config_reload_seconds <= 0:
+            return
+        self._scheduler.schedule_at(
+            time.time() + self.config.config_reload_seconds, self._check_config,
+            name='config reload check', tag='config', quiet=True
+        )
+
+    def _check_config(self):
+        """Scheduler job: reload config.ini if it changed, then check again later."""
+        try:
+            self.reload_config()
+        finally:
+            self._schedule_config_check()
+
+    def _stop_scheduler(self, signum, _frame):
+        """Signal handler: stop the scheduler loop."""
+        logger.info(f"Received signal {signum}, shutting down")
+        print("\n👋 Shutting down...")
+        self._scheduler.stop()
 
-        # logger.info(f"Scheduled daily tweet at {self.tweet_time} {self.timezone}")
+    def run(self, profiles: Optional[Sequence[Profile]] = None):
+        """Main execution loop: post daily at tweet_time until SIGTERM/SIGINT.
+
+        In multi-profile mode each profile (or each of ``profiles``) posts at
+        its own tweet_time in its own timezone.
+        """
+        import signal
+
+        logger.info("F1 Countdown Bot starting...")
 
         # Print startup information
         print("\n🏁 F1 COUNTDOWN BOT STARTING")
         print("="*50)
-        print(f"Daily tweet time: {self.tweet_time} {self.timezone}")
+        if self.multi_profile:
+            for profile in profiles or self.profiles:
+                print(f"Profile {profile.name}: {profile.tweet_time} {profile.timezone} -> @{profile.account.name}")
+        else:
+            print(f"Daily tweet time: {self.tweet_time} {self.timezone}")
         print(f"Cache location: {self.cache_location}")
-        print(f"Current time: {datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        print(f"Current time: {self._now().strftime('%Y-%m-%d %H:%M:%S %Z')}")
         print("="*50)
-        print("Note: Scheduling disabled - using external cron job")
-        print("Running once and exiting...")
-
-        # Run once instead of continuously for cron job execution
-        self.daily_tweet_generation()
-
-        # CONTINUOUS LOOP DISABLED FOR PYTHONANYWHERE CRON - Uncomment below for self-managed scheduling
-        # print("Bot is running... Press Ctrl+C to stop")
-        # print("Checking for scheduled tweets every minute...")
-
-        # Run continuously
-        # while True:
-        #     try:
-        #         schedule.run_pending()
-        #         time.sleep(60)  # Check every minute
-        #     except KeyboardInterrupt:
-        #         logger.info("Bot stopped by user")
-        #         print("\n👋 Bot stopped by user")
-        #         break
-        #     except Exception as e:
-        #         logger.error(f"Unexpected error in main loop: {e}")
-        #         print(f"❌ Unexpected error: {e}")
-        #         time.sleep(60)  # Continue after error
+
+        # The bot instance, schedule index, Twitter client and HTTP sessions
+        # stay warm between runs
+        self._scheduler = JobScheduler()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._stop_scheduler)
+
+        self._run_profile_names = [profile.name for profile in profiles] if profiles else None
+        self._schedule_daily_tweets()
+
+        # Pick up edits to config.ini without a restart
+        self._schedule_config_check()
+
+        # Deliver tweets left in the outbox by earlier runs; the worker keeps
+        # retrying failed ones as they come due
+        self._delivery_worker()
+
+        # Resume a retry left pending by an earlier process. The retry state
+        # doesn't record which profiles failed, so with profiles their next
+        # regular runs take over instead.
+        pending_retry = self._retry_state.backoff_until(self._now())
+        if pending_retry is not None and not self.multi_profile:
+            self._scheduler.schedule_at(
+                pending_retry.timestamp(), self.daily_tweet_generation,
+                name=f"retry #{self._fibonacci_index}", tag='retry'
+            )
+            print(f"⏰ Resuming pending retry at {pending_retry.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+
+        # Optional liveness/status endpoint for monitoring
+        self._start_health_server()
+
+        print("Bot is running... Press Ctrl+C to stop")
+
+        try:
+            self._scheduler.run_forever()
+        finally:
+            if self._health is not None:
+                self._health.set_alive(False)
+            self.close()
+            self.notifications.flush()
+            self._stop_health_server()
+            self._scheduler = None
+            logger.info("Bot stopped")
+            print("👋 Bot stopped")
 
 
 def main():
     """Main entry point."""
+    # --refresh-snapshot can be combined with any mode to force a schedule rebuild
+    refresh_snapshot = '--refresh-snapshot' in sys.argv
+    # --profile NAME (repeatable) limits posting to some [profile:NAME] sections
+    profile_names = [sys.argv[i + 1] for i, arg in enumerate(sys.argv[:-1]) if arg == '--profile']
+    bot = None
     try:
         if len(sys.argv) > 1 and sys.argv[1] == '--test':
             # Test mode: run once immediately
             print("🧪 Running in TEST MODE (single tweet generation)")
-            bot = F1CountdownBot()
-            bot.daily_tweet_generation()
+            bot = F1CountdownBot(refresh_snapshot=refresh_snapshot)
+            bot.daily_tweet_generation(bot.profiles_named(profile_names) if profile_names else None)
         elif len(sys.argv) > 1 and sys.argv[1] == '--debug':
             # Debug mode: run once immediately with extra output, skip Twitter auth
             print("🔍 Running in DEBUG MODE (single tweet generation with extra output)")
+            bot = F1CountdownBot(debug_mode=True, refresh_snapshot=refresh_snapshot)
+            bot.daily_tweet_generation(bot.profiles_named(profile_names) if profile_names else None)
+        elif len(sys.argv) > 1 and sys.argv[1] == '--preview':
+            # Preview mode: print the countdown for every day of a season
+            year = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else datetime.now().year
+            bot = F1CountdownBot(debug_mode=True, refresh_snapshot=refresh_snapshot)
+            start = date(year, 1, 1)
+            days = [start + timedelta(days=n) for n in range((date(year + 1, 1, 1) - start).days)]
+            batch = bot.countdown_for_dates(days)
+            for day, tweet in zip(days, batch.tweet):
+                print(f"{day}  " + tweet.replace('\n', ' | '))
+        elif len(sys.argv) > 1 and sys.argv[1] == '--warm-cache':
+            # Warm-cache mode: prefetch schedules ahead of the posting run
+            print("🔥 Running in WARM CACHE MODE (prefetch current and next season)")
+            bot = F1CountdownBot(debug_mode=True)
+            if not bot.warm_cache():
+                sys.exit(1)
+        elif len(sys.argv) > 1 and sys.argv[1] == '--outbox-status':
+            # Outbox mode: show queued, sent and failed tweets
             bot = F1CountdownBot(debug_mode=True)
-            bot.daily_tweet_generation()
+            bot.print_outbox_status()
         elif len(sys.argv) > 1 and sys.argv[1] == '--schedule':
-            # Schedule mode: run continuously with self-managed scheduling (for migration)
+            # Schedule mode: run continuously with self-managed scheduling
             print("🚀 Running in SCHEDULE MODE (continuous operation with self-managed scheduling)")
-            bot = F1CountdownBot()
-            # Note: You'll need to uncomment the scheduling code in run() method for this to work
-            bot.run()
+            bot = F1CountdownBot(refresh_snapshot=refresh_snapshot)
+            bot.run(bot.profiles_named(profile_names) if profile_names else None)
         else:
-            # Default mode: run once for cron job execution
+            # Default mode: run once for cron job execution, honouring retry backoff
             print("🚀 Running in CRON MODE (single tweet generation for external scheduling)")
-            bot = F1CountdownBot()
-            bot.daily_tweet_generation()
+            bot = F1CountdownBot(refresh_snapshot=refresh_snapshot, respect_backoff=True)
+            bot.daily_tweet_generation(bot.profiles_named(profile_names) if profile_names else None)
+
+    except ConfigError as e:
+        # Invalid config.ini or missing credentials: nothing to alert about, fix and rerun
+        logger.error(f"Configuration error: {e}")
+        print(f"❌ Configuration error: {e}")
+        sys.exit(1)
 
     except Exception as e:
         # Handle any unhandled exceptions
@@ -563,8 +1781,12 @@ def main():
 
         # Try to send Discord notification (if possible)
         try:
-            # Create a temporary bot instance just for sending the notification
-            discord_webhook_url = os.getenv('DISCORD_WEBHOOK_URL')
+            # Use the bot's (possibly reloaded) configuration; the environment
+            # only if the crash came before the bot had one
+            if bot is not None and bot.config is not None:
+                discord_webhook_url = bot.config.error_webhook_url
+            else:
+                discord_webhook_url = os.getenv(ERROR_WEBHOOK_ENV)
             if discord_webhook_url:
                 current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
 
@@ -594,17 +1816,27 @@ def main():
                     "embeds": [embed]
                 }
 
-                response = requests.post(discord_webhook_url, json=payload, timeout=10)
-                if response.status_code == 204:
-                    print("📢 Discord notification sent for critical error")
+                dispatcher = get_dispatcher()
+                failed_before = dispatcher.failed
+                dispatcher.send(discord_webhook_url, payload, "critical error notification")
+                if not dispatcher.flush():
+                    print("❌ Failed to send Discord notification: timed out")
+                elif dispatcher.failed > failed_before:
+                    print("❌ Failed to send Discord notification: rejected by the webhook")
                 else:
-                    print(f"❌ Failed to send Discord notification: {response.status_code}")
+                    print("📢 Discord notification sent for critical error")
         except Exception as discord_error:
             print(f"❌ Could not send Discord notification: {discord_error}")
 
         # Exit with error code
         sys.exit(1)
 
+    finally:
+        # Let a post in progress finish and be recorded before the
+        # interpreter exits and kills the delivery threads mid-post
+        if bot is not None:
+            bot.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3.13
+"""
+Local fake HTTP services for F1 Countdown Bot.
+
+Serves stand-ins for the three services the bot talks to, on one local port:
+
+- schedule: ``GET /schedule/<year>.json``, rows shaped like FastF1's event
+  schedule (a synthetic 22-race season, a few of them sprint weekends)
+- twitter:  ``GET /2/users/me``, ``POST /2/tweets`` and
+  ``POST /1.1/media/upload.json``
+- discord:  ``POST /api/webhooks/...``
+
+Each service can be given latency, jitter, an error rate (HTTP 503) and a
+rate-limit rate (HTTP 429 with Twitter's ``x-rate-limit-reset`` header or
+Discord's ``retry_after``). Point the bot at the fakes with the variables
+printed on startup:
+
+    python fake_services.py --latency-ms 50 --rate-limit-rate 0.05
+    python fake_services.py --service twitter:latency_ms=300,error_rate=0.1
+
+load_test.py runs the bot against these fakes under load.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import statistics
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+SERVICES = ('schedule', 'twitter', 'discord')
+DEFAULT_PORT = 8765
+
+SCHEDULE_PATH = re.compile(r'^/schedule/(\d{4})\.json$')
+# A race every other Sunday from the first Sunday of March ends by December 26
+ROUNDS = 22
+SPRINT_ROUNDS = {2, 6, 11, 19, 21}
+
+
+@dataclass
+class Behavior:
+    """How one fake service responds."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+
+
+@dataclass
+class RequestRecord:
+    """One request served by the fakes."""
+
+    service: str
+    method: str
+    path: str
+    status: int
+    duration: float
+
+
+def parse_behavior(spec: str, base: Behavior) -> Tuple[str, Behavior]:
+    """Parse ``service:field=value,...`` into a service name and its behavior."""
+    service, _, settings = spec.partition(':')
+    if service not in SERVICES:
+        raise ValueError(f"unknown service '{service}' (expected one of {', '.join(SERVICES)})")
+    values = {f.name: getattr(base, f.name) for f in fields(Behavior)}
+    for setting in filter(None, settings.split(',')):
+        name, _, value = setting.partition('=')
+        if name not in values:
+            raise ValueError(f"unknown setting '{name}' for service '{service}'")
+        values[name] = float(value)
+    return service, Behavior(**values)
+
+
+# (session, days before race day, UTC start) of each weekend format
+WEEKEND_SESSIONS = {
+    'conventional': (('Practice 1', 2, '11:30'), ('Practice 2', 2, '15:00'), ('Practice 3', 1, '10:30'),
+                     ('Qualifying', 1, '14:00'), ('Race', 0, '13:00')),
+    'sprint_qualifying': (('Practice 1', 2, '10:30'), ('Sprint Qualifying', 2, '14:30'),
+                          ('Sprint', 1, '10:00'), ('Qualifying', 1, '14:00'), ('Race', 0, '13:00')),
+}
+
+
+def synthetic_schedule(year: int) -> List[dict]:
+    """Return a 22-round season: a race every other Sunday from March to December."""
+    first = date(year, 3, 1)
+    first += timedelta(days=(6 - first.weekday()) % 7)
+    events = []
+    for n in range(ROUNDS):
+        race_day = first + timedelta(weeks=2 * n)
+        event_format = 'sprint_qualifying' if n + 1 in SPRINT_ROUNDS else 'conventional'
+        event = {
+            "RoundNumber": n + 1,
+            "EventName": f"Grand Prix {n + 1}",
+            "EventDate": race_day.isoformat(),
+            "EventFormat": event_format,
+        }
+        for slot, (session, days_before, start) in enumerate(WEEKEND_SESSIONS[event_format], 1):
+            event[f"Session{slot}"] = session
+            event[f"Session{slot}DateUtc"] = f"{race_day - timedelta(days=days_before)}T{start}:00"
+        events.append(event)
+    return events
+
+
+def percentiles(samples: List[float]) -> dict:
+    """Summarize samples as count, p50/p90/p95/p99 and max."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+class FakeServices:
+    """The fake schedule, Twitter and Discord endpoints on one HTTP server."""
+
+    def __init__(self, behaviors: Optional[Dict[str, Behavior]] = None,
+                 host: str = '127.0.0.1', port: int = 0,
+                 published_through: Optional[int] = None, seed: Optional[int] = None):
+        """Create the server; call start() (or use as a context manager) to serve."""
+        self.behaviors = {service: Behavior() for service in SERVICES}
+        self.behaviors.update(behaviors or {})
+        self.published_through = published_through
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tweet_ids = itertools.count(1)
+        self._media_ids = itertools.count(1000)
+        self._records: List[RequestRecord] = []
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the fakes."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the bot at the fakes."""
+        return {
+            'F1BOT_TWITTER_API_URL': self.url,
+            'F1BOT_SCHEDULE_URL': f"{self.url}/schedule/{{year}}.json",
+            'DISCORD_WEBHOOK_URL': f"{self.url}/api/webhooks/1/errors",
+            'DISCORD_SUCCESS_WEBHOOK_URL': f"{self.url}/api/webhooks/2/success",
+        }
+
+    def start(self) -> 'FakeServices':
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-services', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeServices':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def records(self) -> List[RequestRecord]:
+        """Return every request served so far."""
+        with self._lock:
+            return list(self._records)
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-service request counts, status codes and server-side latency."""
+        stats = {}
+        for service in SERVICES + ('unknown',):
+            records = [r for r in self.records() if r.service == service]
+            if not records:
+                continue
+            stats[service] = {
+                "requests": len(records),
+                "status": dict(sorted(Counter(str(r.status) for r in records).items())),
+                "latency": percentiles([r.duration for r in records]),
+            }
+        return stats
+
+    def _roll(self, behavior: Behavior) -> Tuple[float, Optional[str]]:
+        """Pick this request's delay and injected failure ('rate_limit', 'error' or None)."""
+        with self._lock:
+            delay = behavior.latency_ms + self._rng.uniform(-behavior.jitter_ms, behavior.jitter_ms)
+            roll = self._rng.random()
+        if roll < behavior.rate_limit_rate:
+            failure = 'rate_limit'
+        elif roll < behavior.rate_limit_rate + behavior.error_rate:
+            failure = 'error'
+        else:
+            failure = None
+        return max(delay, 0.0) / 1000, failure
+
+    def handle(self, method: str, path: str, body: bytes) -> Tuple[str, int, dict, Optional[dict]]:
+        """Route a request; returns (service, status, headers, JSON body)."""
+        path = path.split('?', 1)[0]
+        schedule = SCHEDULE_PATH.match(path)
+        if method == 'GET' and schedule:
+            service = 'schedule'
+        elif path.startswith(('/2/', '/1.1/')):
+            service = 'twitter'
+        elif method == 'POST' and path.startswith('/api/webhooks/'):
+            service = 'discord'
+        else:
+            return 'unknown', 404, {}, {"error": "not found"}
+
+        behavior = self.behaviors[service]
+        delay, failure = self._roll(behavior)
+        time.sleep(delay)
+
+        if failure == 'rate_limit':
+            if service == 'twitter':
+                reset = int(time.time() + behavior.retry_after)
+                return service, 429, {'x-rate-limit-limit': '100', 'x-rate-limit-remaining': '0',
+                                      'x-rate-limit-reset': str(reset)}, {"title": "Too Many Requests"}
+            return service, 429, {'Retry-After': str(behavior.retry_after)}, {
+                "message": "You are being rate limited.", "retry_after": behavior.retry_after
+            }
+        if failure == 'error':
+            return service, 503, {}, {"title": "Service Unavailable"}
+
+        if service == 'schedule':
+            year = int(schedule.group(1))
+            published = self.published_through is None or year <= self.published_through
+            return service, 200, {}, {"year": year, "events": synthetic_schedule(year) if published else []}
+
+        if service == 'discord':
+            return service, 204, {}, None
+
+        if method == 'GET' and path == '/2/users/me':
+            return service, 200, {}, {"data": {"id": "1", "name": "Fake F1 Bot", "username": "fake_f1_bot"}}
+        if method == 'POST' and path == '/2/tweets':
+            text = json.loads(body or b'{}').get('text', '')
+            with self._lock:
+                tweet_id = str(next(self._tweet_ids))
+            return service, 201, {}, {"data": {"id": tweet_id, "text": text}}
+        if method == 'POST' and path == '/1.1/media/upload.json':
+            with self._lock:
+                media_id = next(self._media_ids)
+            return service, 200, {}, {"media_id": media_id, "media_id_string": str(media_id),
+                                      "size": len(body), "expires_after_secs": 86400}
+        return service, 404, {}, {"title": "Not Found"}
+
+    def record(self, record: RequestRecord):
+        """Store a served request."""
+        with self._lock:
+            self._records.append(record)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Hands every request to the FakeServices instance."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _serve(self, method: str):
+        start = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+        service, status, headers, payload = self.server.services.handle(method, self.path, body)
+
+        data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+        self.server.services.record(
+            RequestRecord(service, method, self.path, status, time.perf_counter() - start)
+        )
+
+    def do_GET(self):
+        self._serve('GET')
+
+    def do_POST(self):
+        self._serve('POST')
+
+    def log_message(self, *args):
+        pass
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser):
+    """Add the fault-injection options shared with load_test.py."""
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Added latency for every service")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="+/- random latency jitter")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of requests failing with 429")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Seconds advertised on 429 responses")
+    parser.add_argument('--service', action='append', default=[], metavar='NAME:FIELD=VALUE,...',
+                        help="Per-service override, e.g. twitter:latency_ms=300,error_rate=0.1")
+    parser.add_argument('--published-through', type=int,
+                        help="Serve empty schedules for seasons after this year")
+    parser.add_argument('--seed', type=int, help="Random seed for reproducible fault injection")
+
+
+def behaviors_from_args(args: argparse.Namespace) -> Dict[str, Behavior]:
+    """Build per-service behaviors from the parsed options."""
+    base = Behavior(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, args.retry_after)
+    behaviors = {service: Behavior(**vars(base)) for service in SERVICES}
+    for spec in args.service:
+        service, behavior = parse_behavior(spec, behaviors.get(spec.partition(':')[0], base))
+        behaviors[service] = behavior
+    return behaviors
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Local fake services for F1 Countdown Bot")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        behaviors = behaviors_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    services = FakeServices(behaviors, host=args.host, port=args.port,
+                            published_through=args.published_through, seed=args.seed)
+    print(f"🧪 Fake services listening on {services.url}")
+    print("Point the bot at them with:")
+    for name, value in services.env().items():
+        print(f"  export {name}='{value}'")
+
+    services.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        services.stop()
+        print(json.dumps(services.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Health and status endpoint for F1 Countdown Bot's --schedule mode.
+
+An optional HTTP server (``[health] port``) on a daemon thread answers:
+
+    GET /healthz   liveness: 200 while the scheduler runs, 503 once it is stopping
+    GET /status    the bot's state as JSON: last successful fetch, Fibonacci
+                   retry index, next scheduled run, last run, cache freshness
+
+The bot publishes its state into a HealthStatus when it changes (a run
+starts or finishes, a job is scheduled, the config is reloaded). Publishing
+serializes the responses once; a request only sends the prebuilt bytes, so
+frequent probes never touch the schedule, the outbox or the posting path.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATH = '/healthz'
+STATUS_PATH = '/status'
+
+
+def _encode(document: dict) -> bytes:
+    return json.dumps(document, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+
+
+class HealthStatus:
+    """The bot's published state, with its HTTP responses prebuilt."""
+
+    def __init__(self):
+        """Start out alive, with nothing published yet."""
+        self._lock = threading.Lock()
+        self._fields: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        self._alive = True
+        # Path -> (HTTP status, body), replaced as a whole so readers need no lock
+        self._responses: Dict[str, Tuple[int, bytes]] = {}
+        self._build()
+
+    def publish(self, **fields):
+        """Merge new values into the state and rebuild the responses."""
+        with self._lock:
+            self._fields.update(fields)
+            self._build()
+
+    def set_alive(self, alive: bool):
+        """Report the bot as running (200) or stopping (503)."""
+        with self._lock:
+            self._alive = alive
+            self._build()
+
+    def _build(self):
+        status = "ok" if self._alive else "stopping"
+        code = 200 if self._alive else 503
+        self._fields["updated_at"] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self._responses = {
+            LIVENESS_PATH: (code, _encode({"status": status, "pid": self._fields["pid"]})),
+            STATUS_PATH: (code, _encode({"status": status, **self._fields})),
+        }
+
+    def response(self, path: str) -> Optional[Tuple[int, bytes]]:
+        """Return the (status, body) for a request path, None if unknown."""
+        return self._responses.get(path.split('?', 1)[0])
+
+
+class HealthServer:
+    """Serves a HealthStatus over HTTP on a background thread."""
+
+    def __init__(self, status: HealthStatus, host: str = '127.0.0.1', port: int = 0):
+        """Bind the server (OSError if the port is taken); call start() to serve."""
+        self.status = status
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.status = status
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the endpoint."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'HealthServer':
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='health', daemon=True)
+        self._thread.start()
+        logger.info(f"Health endpoint listening on {self.url}{STATUS_PATH}")
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Sends the prebuilt response for the path."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        response = self.server.status.response(self.path)
+        status, body = response if response is not None else (404, _encode({"error": "not found"}))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,110 @@
+"""
+Cached Twitter credential verification for F1 Countdown Bot.
+
+Verifying credentials with ``get_me()`` costs a network round trip and user
+lookup rate limit on every run. The verified identity is cached per account
+together with a fingerprint of the credentials, and reused until the TTL
+expires, the credentials change, or a post fails with an auth error.
+Only a SHA-256 fingerprint is stored, never the credentials themselves.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Mapping, Optional
+
+from state_files import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_CACHE_FILE = 'twitter_identity.json'
+
+
+@dataclass(frozen=True)
+class VerifiedIdentity:
+    """A Twitter identity confirmed by get_me()."""
+
+    username: str
+    user_id: str
+    fingerprint: str
+    verified_at: str  # ISO timestamp (UTC)
+
+    def verified_datetime(self) -> datetime:
+        """Return when the identity was verified."""
+        return datetime.fromisoformat(self.verified_at)
+
+
+def credentials_fingerprint(credentials: Mapping[str, Optional[str]]) -> str:
+    """Return a stable fingerprint of a set of credentials."""
+    digest = hashlib.sha256()
+    for name in sorted(credentials):
+        digest.update(f"{name}={credentials[name] or ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class IdentityCache:
+    """Per-account verified identities stored in the cache directory."""
+
+    def __init__(self, cache_dir: str, ttl: timedelta):
+        """Create a cache stored at <cache_dir>/twitter_identity.json."""
+        self.path = os.path.join(cache_dir, IDENTITY_CACHE_FILE)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def get(self, account: str, fingerprint: str,
+            now: Optional[datetime] = None) -> Optional[VerifiedIdentity]:
+        """Return the cached identity if it matches the credentials and is fresh."""
+        data = read_json(self.path)
+        if not isinstance(data, dict):
+            return None
+        entry = data.get(account)
+        if not entry:
+            return None
+        try:
+            identity = VerifiedIdentity(**entry)
+            # A naive timestamp can't be compared with now (TypeError): a miss
+            age = (now or datetime.now(timezone.utc)) - identity.verified_datetime()
+        except (TypeError, ValueError):
+            return None
+
+        if identity.fingerprint != fingerprint:
+            logger.info(f"Twitter credentials for '{account}' changed, re-verifying")
+            return None
+        if age > self.ttl:
+            logger.info(f"Cached Twitter verification for '{account}' expired, re-verifying")
+            return None
+        return identity
+
+    def store(self, account: str, username: str, user_id: str, fingerprint: str) -> VerifiedIdentity:
+        """Record a freshly verified identity."""
+        identity = VerifiedIdentity(
+            username=username,
+            user_id=str(user_id),
+            fingerprint=fingerprint,
+            verified_at=datetime.now(timezone.utc).isoformat(),
+        )
+        self._update(account, asdict(identity))
+        return identity
+
+    def invalidate(self, account: str):
+        """Forget an account's identity so the next run re-verifies it."""
+        self._update(account, None)
+
+    def _update(self, account: str, entry: Optional[dict]):
+        """Replace one account's entry."""
+        with self._lock:
+            data = read_json(self.path)
+            if not isinstance(data, dict):
+                data = {}
+            if entry is None:
+                if data.pop(account, None) is None:
+                    return
+            else:
+                data[account] = entry
+            try:
+                atomic_write_json(self.path, data)
+            except OSError as e:
+                logger.warning(f"Could not write Twitter identity cache: {e}")
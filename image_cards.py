@@ -0,0 +1,250 @@
+"""
+Countdown image cards for F1 Countdown Bot.
+
+A card is a PNG showing the race name, a progress bar and the percentage,
+attached to the countdown tweet. Cards are enabled in the ``[cards]`` section
+of config.ini and need Pillow (``pip install Pillow``); without it the bot
+logs a warning and posts text-only tweets.
+
+Rendering and uploading a card costs far more than composing the text, so
+both are cached:
+
+- Cards are keyed by (race name, progress bucket, template fingerprint) and
+  stored in ``<cache_location>/cards/``. The percentage on a card is the
+  progress rounded down to ``bucket_percent``, so every run that falls in
+  the same bucket reuses the same file. A card is only rendered when a
+  tweet is actually posted with it. The directory is kept under
+  ``max_cache_mb`` by evicting the least recently used cards (a cache hit
+  touches the file's mtime); cards used in the last minute are kept, so a
+  card is never evicted between rendering and uploading it.
+- The media ID of an uploaded card is remembered per account in
+  ``cards/media.json`` and reused for an identical card until shortly
+  before Twitter expires it (24 hours after upload).
+"""
+
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from state_files import atomic_write_bytes, atomic_write_json, read_json
+from tweet_templates import TweetTemplate
+
+logger = logging.getLogger(__name__)
+
+CARD_DIR = 'cards'
+MEDIA_INDEX_FILE = 'media.json'
+
+# Bump when the card layout changes, so cached cards are re-rendered
+CARD_RENDERER_VERSION = 1
+
+CARD_SIZE = (1200, 675)
+BACKGROUND = (21, 21, 30)
+ACCENT = (225, 6, 0)
+TEXT_COLOR = (255, 255, 255)
+MUTED_COLOR = (150, 150, 165)
+EMPTY_CELL = (56, 56, 72)
+
+# Cards used this recently are never evicted
+EVICTION_GRACE_SECONDS = 60
+
+# Twitter media IDs expire 24 hours after upload; stop reusing them a bit earlier
+MEDIA_ID_TTL = timedelta(hours=23)
+
+
+@dataclass(frozen=True)
+class CardKey:
+    """What a card shows, and so what it is cached under."""
+
+    race_name: str
+    bucket: int        # progress made, rounded down to the bucket size (percent)
+    template: str      # fingerprint of the template fields the card uses
+
+    @property
+    def digest(self) -> str:
+        """Return the cache file name stem for this card."""
+        text = f"{CARD_RENDERER_VERSION}\n{self.race_name}\n{self.bucket}\n{self.template}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class Card:
+    """A countdown card to attach to a tweet (rendered on first use)."""
+
+    key: CardKey
+    template: TweetTemplate
+
+
+def template_fingerprint(template: TweetTemplate) -> str:
+    """Fingerprint the template fields drawn on a card."""
+    text = f"{template.name}\n{template.bar_width}\n{template.hashtags}"
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def card_key(race_name: str, progress_made: float, template: TweetTemplate,
+             bucket_percent: int = 1) -> CardKey:
+    """Build the cache key for a countdown card."""
+    bucket = int(max(0.0, min(100.0, progress_made)) // bucket_percent) * bucket_percent
+    return CardKey(race_name, bucket, template_fingerprint(template))
+
+
+def pillow_available() -> bool:
+    """Return True if Pillow is installed (without importing it)."""
+    return importlib.util.find_spec('PIL') is not None
+
+
+def _font(size: int, font_file: Optional[str]):
+    """Load the configured TrueType font, or Pillow's built-in one."""
+    from PIL import ImageFont
+
+    if font_file:
+        return ImageFont.truetype(font_file, size)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has a single fixed-size default font
+        return ImageFont.load_default()
+
+
+def render_card(key: CardKey, template: TweetTemplate, font_file: Optional[str] = None) -> bytes:
+    """Render a card as PNG bytes (requires Pillow)."""
+    from PIL import Image, ImageDraw
+
+    width, height = CARD_SIZE
+    margin = 80
+    image = Image.new('RGB', CARD_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    draw.rectangle((0, 0, width, 16), fill=ACCENT)
+    draw.text((margin, 90), "F1 RACE COUNTDOWN", font=_font(36, font_file), fill=MUTED_COLOR)
+    # Long race names get a smaller font rather than running off the card
+    size = 64
+    name_font = _font(size, font_file)
+    while size > 32 and draw.textlength(key.race_name, font=name_font) > width - 2 * margin:
+        size -= 4
+        name_font = _font(size, font_file)
+    draw.text((margin, 150), key.race_name, font=name_font, fill=TEXT_COLOR)
+    draw.text((margin, 250), f"{key.bucket}%", font=_font(140, font_file), fill=ACCENT)
+
+    # One cell per progress bar cell of the template
+    top, bottom, gap = 450, 520, 8
+    cell = (width - 2 * margin - gap * (template.bar_width - 1)) / template.bar_width
+    filled = template.filled_cells(key.bucket)
+    for n in range(template.bar_width):
+        left = margin + n * (cell + gap)
+        draw.rectangle((left, top, left + cell, bottom), fill=ACCENT if n < filled else EMPTY_CELL)
+
+    draw.text((margin, height - 110), template.hashtags, font=_font(32, font_file), fill=MUTED_COLOR)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class CardCache:
+    """Rendered cards on disk with LRU eviction, plus uploaded media IDs."""
+
+    def __init__(self, cache_dir: str, max_bytes: int, font_file: Optional[str] = None):
+        """Create a cache stored in <cache_dir>/cards/."""
+        self.directory = os.path.join(cache_dir, CARD_DIR)
+        self.media_index = os.path.join(self.directory, MEDIA_INDEX_FILE)
+        self.max_bytes = max_bytes
+        self.font_file = font_file
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+
+    def path(self, key: CardKey) -> str:
+        """Return the file path of a card."""
+        return os.path.join(self.directory, f"{key.digest}.png")
+
+    def get_or_render(self, card: Card) -> Tuple[str, bool]:
+        """Return the card's path and whether it was already cached, rendering it if needed."""
+        path = self.path(card.key)
+        with self._render_lock:
+            try:
+                os.utime(path)  # mark as recently used
+                return path, True
+            except FileNotFoundError:
+                pass
+
+            atomic_write_bytes(path, render_card(card.key, card.template, self.font_file))
+            self._evict()
+        return path, False
+
+    def _evict(self):
+        """Delete the least recently used cards until the cache fits max_bytes."""
+        cards = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.png') and entry.is_file():
+                stat = entry.stat()
+                cards.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in cards)
+        grace_start = time.time() - EVICTION_GRACE_SECONDS
+        evicted = []
+        for mtime, size, path in sorted(cards):
+            if total <= self.max_bytes or mtime >= grace_start:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted.append(os.path.basename(path)[:-len('.png')])
+
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} cached card(s) to stay under {self.max_bytes} bytes")
+            with self._lock:
+                index = read_json(self.media_index) or {}
+                if [digest for digest in evicted if index.pop(digest, None) is not None]:
+                    self._write_media_index(index)
+
+    def media_id(self, key: CardKey, account: str, now: Optional[datetime] = None) -> Optional[str]:
+        """Return a still-valid media ID of this card uploaded by an account."""
+        entry = ((read_json(self.media_index) or {}).get(key.digest) or {}).get(account)
+        if not entry:
+            return None
+        try:
+            uploaded_at = datetime.fromisoformat(entry['uploaded_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if (now or datetime.now(timezone.utc)) - uploaded_at > MEDIA_ID_TTL:
+            return None
+        return entry.get('media_id')
+
+    def record_media_id(self, key: CardKey, account: str, media_id: str):
+        """Remember an uploaded card's media ID, dropping expired ones."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            index = read_json(self.media_index) or {}
+            index.setdefault(key.digest, {})[account] = {
+                'media_id': str(media_id), 'uploaded_at': now.isoformat()
+            }
+            for digest in list(index):
+                index[digest] = {
+                    name: entry for name, entry in index[digest].items()
+                    if self._fresh(entry, now)
+                }
+                if not index[digest]:
+                    del index[digest]
+            self._write_media_index(index)
+
+    @staticmethod
+    def _fresh(entry: dict, now: datetime) -> bool:
+        """Return True if a media index entry has not expired."""
+        try:
+            return now - datetime.fromisoformat(entry['uploaded_at']) <= MEDIA_ID_TTL
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def _write_media_index(self, index: dict):
+        """Write the media index, logging (not raising) on failure."""
+        try:
+            atomic_write_json(self.media_index, index)
+        except OSError as e:
+            logger.warning(f"Could not write card media index: {e}")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3.13
+"""
+Load driver for F1 Countdown Bot.
+
+Starts the fakes from fake_services.py and runs many cron-style bot
+invocations (``f1_countdown_bot.py --test``) against them, each in its own
+working directory with ``--accounts`` accounts. Reports invocation latency
+percentiles, throughput, run outcomes and per-phase timings (from each run's
+metrics line), plus what the fake services saw:
+
+    python load_test.py --invocations 50 --concurrency 8 --accounts 3 \\
+        --latency-ms 40 --jitter-ms 20 --error-rate 0.02 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fake_services import FakeServices, add_behavior_arguments, behaviors_from_args, percentiles
+
+PROJECT_DIR = Path(__file__).resolve().parent
+BOT_SCRIPT = PROJECT_DIR / 'f1_countdown_bot.py'
+METRICS_FILE = 'metrics.jsonl'
+FAKE_CREDENTIAL = 'load-test'
+
+
+@dataclass
+class Invocation:
+    """Result of one bot run."""
+
+    index: int
+    returncode: int
+    elapsed: float
+    metrics: Optional[dict]
+
+
+def write_workdir(workdir: str, accounts: int, timezone: str) -> Dict[str, str]:
+    """Write the config for one invocation and return its credential variables."""
+    env = {}
+    sections = []
+    for n in range(accounts if accounts > 1 else 0):
+        prefix = f"TWITTER_LOAD{n}"
+        sections.append(f"[account:load{n}]\ncredentials_prefix = {prefix}\n")
+        env.update({f"{prefix}_{suffix}": FAKE_CREDENTIAL for suffix in
+                    ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET')})
+    if accounts <= 1:
+        env.update({f"TWITTER_{suffix}": FAKE_CREDENTIAL for suffix in
+                    ('CONSUMER_KEY', 'CONSUMER_SECRET', 'ACCESS_TOKEN', 'ACCESS_TOKEN_SECRET')})
+
+    with open(os.path.join(workdir, 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write(
+            "[settings]\n"
+            "cache_location = ./cache/\n"
+            f"timezone = {timezone}\n"
+            "\n[metrics]\n"
+            f"json_file = {METRICS_FILE}\n"
+            # Retry injected faults quickly, within the run
+            "\n[outbox]\n"
+            "retry_delay_seconds = 1\n"
+            "wait_seconds = 30\n\n"
+            + "\n".join(sections)
+        )
+    return env
+
+
+def run_invocation(index: int, base_env: Dict[str, str], accounts: int, timezone: str,
+                   timeout: float) -> Invocation:
+    """Run the bot once in a fresh working directory."""
+    with tempfile.TemporaryDirectory(prefix='f1bot-load-') as workdir:
+        env = dict(base_env, **write_workdir(workdir, accounts, timezone))
+        start = time.perf_counter()
+        try:
+            returncode = subprocess.run(
+                [sys.executable, str(BOT_SCRIPT), '--test'], cwd=workdir, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout
+            ).returncode
+        except subprocess.TimeoutExpired:
+            returncode = -1
+        elapsed = time.perf_counter() - start
+
+        metrics = None
+        try:
+            with open(os.path.join(workdir, METRICS_FILE), 'r', encoding='utf-8') as f:
+                metrics = json.loads(f.readline())
+        except (OSError, ValueError):
+            pass
+    return Invocation(index, returncode, elapsed, metrics)
+
+
+def summarize(invocations: List[Invocation], wall: float, services: FakeServices) -> dict:
+    """Aggregate invocation results and fake service statistics."""
+    outcomes = Counter(
+        (inv.metrics or {}).get('outcome') or ('timeout' if inv.returncode == -1 else 'no metrics')
+        for inv in invocations
+    )
+    phases: Dict[str, List[float]] = defaultdict(list)
+    for inv in invocations:
+        for name, total in ((inv.metrics or {}).get('phases') or {}).items():
+            phases[name].append(total['wall_seconds'])
+
+    tweets = sum(1 for r in services.records()
+                 if r.service == 'twitter' and r.method == 'POST' and r.status == 201)
+    return {
+        "invocations": len(invocations),
+        "wall_seconds": wall,
+        "throughput_per_second": len(invocations) / wall if wall else 0.0,
+        "tweets_posted": tweets,
+        "tweets_per_second": tweets / wall if wall else 0.0,
+        "exit_codes": dict(Counter(str(inv.returncode) for inv in invocations)),
+        "outcomes": dict(outcomes),
+        "latency": percentiles([inv.elapsed for inv in invocations]),
+        "phases": {name: percentiles(samples) for name, samples in phases.items()},
+        "services": services.stats(),
+    }
+
+
+def print_report(report: dict):
+    """Print a human-readable summary."""
+    latency = report["latency"]
+    print(f"\n📊 {report['invocations']} invocations in {report['wall_seconds']:.2f}s "
+          f"({report['throughput_per_second']:.2f}/s), "
+          f"{report['tweets_posted']} tweets ({report['tweets_per_second']:.2f}/s)")
+    print(f"Outcomes: {report['outcomes']}  Exit codes: {report['exit_codes']}")
+    if latency["count"]:
+        print(f"Invocation latency: p50 {latency['p50'] * 1e3:.0f} ms, p90 {latency['p90'] * 1e3:.0f} ms, "
+              f"p99 {latency['p99'] * 1e3:.0f} ms, max {latency['max'] * 1e3:.0f} ms")
+
+    print("\nPhases (wall, per run):")
+    for name, stats in report["phases"].items():
+        print(f"  {name:<24} p50 {stats['p50'] * 1e3:9.2f} ms   p95 {stats['p95'] * 1e3:9.2f} ms")
+
+    print("\nFake services:")
+    for service, stats in report["services"].items():
+        print(f"  {service:<9} {stats['requests']:5d} requests  status {stats['status']}  "
+              f"p50 {stats['latency']['p50'] * 1e3:.1f} ms  p99 {stats['latency']['p99'] * 1e3:.1f} ms")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Load test F1 Countdown Bot against local fake services")
+    parser.add_argument('--invocations', type=int, default=20, help="Number of bot runs")
+    parser.add_argument('--concurrency', type=int, default=4, help="Bot runs in parallel")
+    parser.add_argument('--accounts', type=int, default=1, help="Accounts per bot run")
+    parser.add_argument('--timezone', default='Asia/Kolkata')
+    parser.add_argument('--timeout', type=float, default=120.0, help="Seconds before a run is killed")
+    parser.add_argument('--output', help="Write the report as JSON to this file")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        behaviors = behaviors_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("🏁 F1 Countdown Bot - Load Test")
+    print("=" * 50)
+    with FakeServices(behaviors, published_through=args.published_through, seed=args.seed) as services:
+        base_env = dict(os.environ, **services.env())
+        print(f"Fake services at {services.url}; {args.invocations} runs, "
+              f"concurrency {args.concurrency}, {args.accounts} account(s) each")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            invocations = list(pool.map(
+                lambda n: run_invocation(n, base_env, args.accounts, args.timezone, args.timeout),
+                range(args.invocations)
+            ))
+        report = summarize(invocations, time.perf_counter() - start, services)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
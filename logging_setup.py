@@ -0,0 +1,186 @@
+"""
+Logging for F1 Countdown Bot.
+
+Log calls only put the record on a queue (``QueueHandler``); a listener
+thread (``QueueListener``) writes it to the console and the log file, so a
+slow or stalled disk never delays posting. The ``[logging]`` section of
+config.ini controls the handlers:
+
+    [logging]
+    log_level = INFO
+    log_file = f1_countdown_bot.log   # empty: console only
+    log_format = text                 # or json: one JSON object per line
+    max_size_mb = 10                  # rotate the file at this size...
+    rotate_when =                     # ...or by time instead (e.g. midnight)
+    backup_count = 5                  # rotated files to keep
+
+The queue handler is installed before config.ini is read, and the listener
+starts once it is, so nothing logged during startup is lost. Every record
+carries the ID of the current run (the ``run_id`` of its RunMetrics), which
+JSON lines include to correlate a run's log lines with its metrics.
+"""
+
+import atexit
+import configparser
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_FORMATS = ('text', 'json')
+
+_lock = threading.Lock()
+_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_run_id: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LoggingOptions:
+    """Where and how log records are written."""
+
+    level: int = logging.INFO
+    log_file: Optional[str] = 'f1_countdown_bot.log'
+    log_format: str = 'text'
+    max_bytes: int = 10 * 1024 * 1024
+    rotate_when: Optional[str] = None
+    backup_count: int = 5
+
+
+class _RunIdFilter(logging.Filter):
+    """Stamp each record with the current run's ID."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id
+        return True
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are.
+
+    The queue never leaves the process, so the formatting and copying the
+    base class does in prepare() is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "run_id": getattr(record, 'run_id', None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def logging_options(config: configparser.ConfigParser) -> LoggingOptions:
+    """Read the [logging] section (ValueError on bad values)."""
+    level_name = config.get('logging', 'log_level', fallback='INFO').strip().upper()
+    level = logging.getLevelNamesMapping().get(level_name)
+    if level is None:
+        raise ValueError(f"[logging] log_level must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL, "
+                         f"got {level_name!r}")
+    log_format = config.get('logging', 'log_format', fallback='text').strip().lower()
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"[logging] log_format must be text or json, got {log_format!r}")
+    return LoggingOptions(
+        level=level,
+        log_file=config.get('logging', 'log_file', fallback='f1_countdown_bot.log').strip() or None,
+        log_format=log_format,
+        max_bytes=int(config.getfloat('logging', 'max_size_mb', fallback=10) * 1024 * 1024),
+        rotate_when=config.get('logging', 'rotate_when', fallback='').strip() or None,
+        backup_count=config.getint('logging', 'backup_count', fallback=5),
+    )
+
+
+def set_run_id(run_id: Optional[str]):
+    """Set the run ID stamped on records logged from now on."""
+    global _run_id
+    _run_id = run_id
+
+
+def install_queue_handler():
+    """Route all logging through the queue (idempotent).
+
+    Records are buffered until configure_logging() starts the listener.
+    """
+    global _queue_handler
+    with _lock:
+        if _queue_handler is not None:
+            return
+        _queue_handler = _LocalQueueHandler(_queue)
+        _queue_handler.addFilter(_RunIdFilter())
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        if root.level == logging.WARNING:  # untouched default
+            root.setLevel(logging.INFO)
+        atexit.register(shutdown_logging)
+
+
+def _build_handlers(options: LoggingOptions) -> List[logging.Handler]:
+    """Create the console and (rotating) file handlers."""
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers: List[logging.Handler] = [console]
+
+    if options.log_file:
+        if options.rotate_when:
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                options.log_file, when=options.rotate_when, backupCount=options.backup_count,
+                encoding='utf-8', delay=True
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                options.log_file, maxBytes=options.max_bytes, backupCount=options.backup_count,
+                encoding='utf-8', delay=True
+            )
+        file_handler.setFormatter(
+            JsonFormatter() if options.log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+        )
+        handlers.append(file_handler)
+    return handlers
+
+
+def configure_logging(options: LoggingOptions = LoggingOptions()):
+    """Start (or restart with new options) the listener writing queued records."""
+    global _listener
+    install_queue_handler()
+    handlers = _build_handlers(options)  # before stopping the old listener, so bad options change nothing
+    with _lock:
+        logging.getLogger().setLevel(options.level)
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    """Write every queued record and stop the listener (registered with atexit)."""
+    global _listener
+    if _listener is None:
+        # Exiting before config.ini was read: write startup records with the defaults
+        configure_logging()
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
@@ -0,0 +1,187 @@
+"""
+Background Discord notifications for F1 Countdown Bot.
+
+Webhook messages are put on an in-process queue and delivered by a worker
+thread over one pooled HTTP session, so posting a tweet never waits on
+Discord. Rate-limited messages (HTTP 429) are retried after Discord's
+``retry_after``. Pending messages are flushed at process exit, bounded by
+``flush_timeout``. The dispatcher counts delivered and failed messages, so
+a caller can tell whether the webhook accepted what it flushed.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from run_metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_TIMEOUT = 10.0
+DEFAULT_REQUEST_TIMEOUT = 10.0
+DEFAULT_MAX_RETRIES = 3
+MAX_RETRY_AFTER = 30.0
+
+
+@dataclass
+class Notification:
+    """One queued webhook message."""
+
+    webhook_url: str
+    payload: dict
+    description: str
+    metrics: Optional["RunMetrics"] = None
+
+
+class NotificationDispatcher:
+    """Queue drained by a background thread that posts to Discord webhooks."""
+
+    def __init__(self, flush_timeout: float = DEFAULT_FLUSH_TIMEOUT,
+                 request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        """Create the dispatcher; the worker thread starts on the first message."""
+        self.flush_timeout = flush_timeout
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self._queue: "queue.Queue[Notification]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._session = None
+        # Messages the webhook accepted / rejected (or that raised) so far
+        self.delivered = 0
+        self.failed = 0
+        atexit.register(self.flush)
+
+    def send(self, webhook_url: str, payload: dict, description: str = "notification",
+             metrics: Optional["RunMetrics"] = None) -> bool:
+        """Queue a webhook message for delivery and return immediately.
+
+        With ``metrics``, the delivery is timed as a phase of that run and
+        its HTTP status codes are counted.
+        """
+        self._queue.put(Notification(webhook_url, payload, description, metrics))
+        self._ensure_worker()
+        return True
+
+    def pending(self) -> int:
+        """Return the number of messages not yet delivered."""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued messages are delivered, at most ``timeout`` seconds."""
+        timeout = self.flush_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(
+                        f"Gave up on {self._queue.unfinished_tasks} pending Discord notification(s) "
+                        f"after {timeout:.0f}s"
+                    )
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='discord-notifications', daemon=True
+                )
+                self._thread.start()
+
+    def _get_session(self):
+        """Return the pooled HTTP session, creating it on first use."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _run(self):
+        """Deliver queued messages forever."""
+        while True:
+            notification = self._queue.get()
+            metrics = notification.metrics
+            phase = (metrics.phase(notification.description.replace(' ', '_'))
+                     if metrics is not None else nullcontext())
+            delivered = False
+            try:
+                with phase:
+                    delivered = self._deliver(notification)
+            except Exception as e:
+                logger.error(f"Exception sending Discord {notification.description}: {e}")
+            finally:
+                with self._lock:
+                    if delivered:
+                        self.delivered += 1
+                    else:
+                        self.failed += 1
+                self._queue.task_done()
+
+    def _deliver(self, notification: Notification) -> bool:
+        """Post one message, retrying on 429 after Discord's retry_after."""
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            logger.info(
+                f"[API REQUEST] POST {notification.webhook_url} (Sending {notification.description} to Discord)"
+            )
+            response = session.post(
+                notification.webhook_url, json=notification.payload, timeout=self.request_timeout
+            )
+            if notification.metrics is not None:
+                notification.metrics.http_status('discord', response.status_code)
+            if response.status_code in (200, 204):
+                logger.info(f"Discord {notification.description} sent successfully.")
+                return True
+
+            if response.status_code == 429 and attempt < self.max_retries:
+                if notification.metrics is not None:
+                    notification.metrics.incr('discord_retries')
+                retry_after = _retry_after(response)
+                logger.warning(
+                    f"Discord rate limited {notification.description}, retrying in {retry_after:.2f}s"
+                )
+                time.sleep(retry_after)
+                continue
+
+            logger.error(
+                f"Failed to send Discord {notification.description}: {response.status_code} {response.text}"
+            )
+            return False
+        return False
+
+
+def _retry_after(response) -> float:
+    """Read the retry delay in seconds from a Discord 429 response."""
+    retry_after = None
+    try:
+        retry_after = float(response.json().get('retry_after'))
+    except (ValueError, TypeError, AttributeError):
+        pass
+    if retry_after is None:
+        try:
+            retry_after = float(response.headers.get('Retry-After', 1))
+        except (TypeError, ValueError):
+            retry_after = 1.0
+    return min(max(retry_after, 0.0), MAX_RETRY_AFTER)
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Return the process-wide notification dispatcher."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+        return _dispatcher
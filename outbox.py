@@ -0,0 +1,480 @@
+"""
+Durable tweet outbox for F1 Countdown Bot.
+
+Composed tweets are written to an SQLite database in the cache directory
+(``outbox.db``, WAL journal) before anything is sent, and a DeliveryWorker
+sends them in the background:
+
+    pending --claim--> sending --> sent
+       ^                  |------> failed   (permanent error, out of attempts or time)
+       |--- retry --------|
+    deferred <-- defer ---|
+    pending/deferred/sending ----> expired  (deadline passed before delivery)
+
+A transient error (network, HTTP 429 or 5xx) puts the item back to pending
+with an exponential delay, until ``max_attempts`` or the item's deadline.
+A sender that knows the item can't go out before some time (an exhausted
+rate limit) raises DeliveryDeferred instead: the item waits until then
+without using up an attempt.
+Every state change is committed before the next step, so a crash loses
+nothing: pending items are picked up by the next run (or the daemon), and an
+item left in ``sending`` by a killed process is claimed again once
+``SENDING_TIMEOUT`` has passed. The post ledger makes a retried post
+idempotent once it has recorded the tweet, so delivery is at least once:
+only a process killed after Twitter accepted a tweet and before the ledger
+recorded it can make the reclaimed item post it again. Callers stop the
+worker (DeliveryWorker.stop) before exiting so a normal exit never does.
+
+Items are keyed by (account, local date, content hash), like the ledger:
+enqueueing the same tweet again returns the existing item.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_FILE = 'outbox.db'
+
+PENDING = 'pending'
+DEFERRED = 'deferred'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+EXPIRED = 'expired'
+FINAL_STATUSES = frozenset({SENT, FAILED, EXPIRED})
+
+# A claim older than this belongs to a process that died mid-post
+SENDING_TIMEOUT = 10 * 60.0
+# Finished items are kept this long for --outbox-status, then pruned
+KEEP_FINISHED_SECONDS = 30 * 24 * 3600.0
+# Idle workers look for due items (e.g. enqueued by another process) this often
+IDLE_POLL_SECONDS = 30.0
+# wait() re-reads the database this often, for items delivered by another process
+WAIT_POLL_SECONDS = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    local_date TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    info TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    deadline REAL NOT NULL,
+    last_error TEXT,
+    tweet_id TEXT,
+    UNIQUE (account, local_date, content_hash)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class DeliveryDeferred(Exception):
+    """Raised by a sender: the item can't be delivered before ``until`` (epoch seconds)."""
+
+    def __init__(self, message: str, until: float):
+        super().__init__(message)
+        self.until = until
+
+
+@dataclasses.dataclass(frozen=True)
+class OutboxItem:
+    """One tweet in the outbox."""
+
+    id: int
+    account: str
+    local_date: str
+    text: str
+    info: dict  # race info and image card, as given to enqueue()
+    status: str
+    attempts: int
+    created_at: float
+    next_attempt_at: float
+    deadline: float
+    last_error: Optional[str] = None
+    tweet_id: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        """True once the item is sent, failed or expired."""
+        return self.status in FINAL_STATUSES
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> 'OutboxItem':
+        return cls(
+            id=row['id'], account=row['account'], local_date=row['local_date'], text=row['text'],
+            info=json.loads(row['info']), status=row['status'], attempts=row['attempts'],
+            created_at=row['created_at'], next_attempt_at=row['next_attempt_at'], deadline=row['deadline'],
+            last_error=row['last_error'], tweet_id=row['tweet_id'],
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long a failing item is retried."""
+
+    max_attempts: int = 5
+    retry_delay: float = 30.0  # seconds before the first retry, doubled for each one after it
+    max_delay: float = 3600.0
+
+    def delay(self, attempts: int) -> float:
+        """Return the delay before the next attempt, after ``attempts`` failed ones."""
+        return min(self.retry_delay * 2 ** max(0, attempts - 1), self.max_delay)
+
+
+def content_hash(text: str) -> str:
+    """Hash tweet text the way the post ledger does."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class Outbox:
+    """The outbox database of one cache directory.
+
+    Each thread uses its own connection, so an Outbox can be used from any
+    thread; several processes can share the file.
+    """
+
+    def __init__(self, cache_dir: str, busy_timeout: float = 10.0):
+        """Use <cache_dir>/outbox.db (created on first use)."""
+        self.path = os.path.join(cache_dir, OUTBOX_FILE)
+        self.busy_timeout = busy_timeout
+        self._initialized = False
+        self._pruned = False
+        self._init_lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction (taken up front, so claims can't race)."""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the database on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+        with self._init_lock:
+            if not self._initialized:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            # WAL: readers don't block the writer. NORMAL sync is durable across
+            # process crashes; only a power loss can drop the last commits.
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            if not self._initialized:
+                connection.executescript(SCHEMA)
+                self._initialized = True
+        self._local.connection = connection
+        return connection
+
+    def enqueue(self, account: str, local_date: str, text: str, info: dict,
+                deadline: float, now: float) -> OutboxItem:
+        """Add a tweet to deliver by ``deadline`` (epoch seconds) and return its item.
+
+        The same tweet already in the outbox is returned as it is, unless it
+        failed or expired: then it is queued again (e.g. by a manual rerun).
+        """
+        digest = content_hash(text)
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT * FROM outbox WHERE account = ? AND local_date = ? AND content_hash = ?',
+                (account, local_date, digest)
+            ).fetchone()
+            if row is None:
+                cursor = db.execute(
+                    'INSERT INTO outbox (account, local_date, content_hash, text, info, status, '
+                    'created_at, updated_at, next_attempt_at, deadline) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (account, local_date, digest, text, json.dumps(info, ensure_ascii=False), PENDING,
+                     now, now, now, deadline)
+                )
+                item_id = cursor.lastrowid
+            elif row['status'] in (FAILED, EXPIRED):
+                item_id = row['id']
+                db.execute(
+                    'UPDATE outbox SET status = ?, attempts = 0, info = ?, updated_at = ?, '
+                    'next_attempt_at = ?, deadline = ? WHERE id = ?',
+                    (PENDING, json.dumps(info, ensure_ascii=False), now, now, deadline, item_id)
+                )
+            else:
+                return OutboxItem.from_row(row)
+            return OutboxItem.from_row(db.execute('SELECT * FROM outbox WHERE id = ?', (item_id,)).fetchone())
+
+    def claim(self, now: float) -> Optional[OutboxItem]:
+        """Mark the most overdue deliverable item as sending and return it (None if none is due).
+
+        Claiming counts as an attempt, so an item that keeps crashing the
+        process still runs out of attempts.
+        """
+        with self._transaction() as db:
+            row = db.execute(
+                'SELECT * FROM outbox WHERE ((status IN (?, ?) AND next_attempt_at <= ?) '
+                'OR (status = ? AND updated_at <= ?)) AND deadline > ? '
+                'ORDER BY next_attempt_at, id LIMIT 1',
+                (PENDING, DEFERRED, now, SENDING, now - SENDING_TIMEOUT, now)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['status'] == SENDING:
+                logger.warning(f"Reclaiming outbox item {row['id']} ('{row['account']}'), "
+                               f"abandoned mid-post by an earlier process")
+            db.execute('UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?',
+                       (SENDING, now, row['id']))
+            return OutboxItem.from_row(db.execute('SELECT * FROM outbox WHERE id = ?', (row['id'],)).fetchone())
+
+    def mark_sent(self, item_id: int, tweet_id: str, now: float):
+        """Record a delivered item."""
+        self._update(item_id, now, status=SENT, tweet_id=str(tweet_id), last_error=None)
+
+    def mark_retry(self, item_id: int, error: str, next_attempt_at: float, now: float):
+        """Put an item back to pending after a transient error."""
+        self._update(item_id, now, status=PENDING, last_error=error, next_attempt_at=next_attempt_at)
+
+    def mark_deferred(self, item_id: int, reason: str, until: float, now: float):
+        """Put an item aside until ``until``, giving back the attempt its claim used."""
+        with self._transaction() as db:
+            db.execute(
+                'UPDATE outbox SET status = ?, attempts = MAX(attempts - 1, 0), last_error = ?, '
+                'next_attempt_at = ?, updated_at = ? WHERE id = ?',
+                (DEFERRED, reason, until, now, item_id)
+            )
+
+    def mark_failed(self, item_id: int, error: str, now: float):
+        """Give up on an item."""
+        self._update(item_id, now, status=FAILED, last_error=error)
+
+    def _update(self, item_id: int, now: float, **columns):
+        """Set some columns of an item."""
+        assignments = ', '.join(f"{name} = ?" for name in columns)
+        with self._transaction() as db:
+            db.execute(f"UPDATE outbox SET {assignments}, updated_at = ? WHERE id = ?",
+                       (*columns.values(), now, item_id))
+
+    def expire(self, now: float) -> List[OutboxItem]:
+        """Mark undelivered items past their deadline as expired and return them."""
+        with self._transaction() as db:
+            rows = db.execute(
+                'SELECT * FROM outbox WHERE deadline <= ? '
+                'AND (status IN (?, ?) OR (status = ? AND updated_at <= ?))',
+                (now, PENDING, DEFERRED, SENDING, now - SENDING_TIMEOUT)
+            ).fetchall()
+            db.executemany(
+                'UPDATE outbox SET status = ?, updated_at = ? WHERE id = ?',
+                [(EXPIRED, now, row['id']) for row in rows]
+            )
+            if not self._pruned:
+                db.execute('DELETE FROM outbox WHERE status IN (?, ?, ?) AND updated_at < ?',
+                           (*sorted(FINAL_STATUSES), now - KEEP_FINISHED_SECONDS))
+                self._pruned = True
+        return [dataclasses.replace(OutboxItem.from_row(row), status=EXPIRED) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        """Return when the next pending or deferred item is due (None if there is none)."""
+        row = self._connection().execute(
+            'SELECT MIN(next_attempt_at) FROM outbox WHERE status IN (?, ?)', (PENDING, DEFERRED)
+        ).fetchone()
+        return row[0]
+
+    def items(self, item_ids: Sequence[int]) -> Dict[int, OutboxItem]:
+        """Return the current state of some items, by ID."""
+        if not item_ids:
+            return {}
+        rows = self._connection().execute(
+            f"SELECT * FROM outbox WHERE id IN ({', '.join('?' * len(item_ids))})", tuple(item_ids)
+        ).fetchall()
+        return {row['id']: OutboxItem.from_row(row) for row in rows}
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of items in each status."""
+        return dict(self._connection().execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall())
+
+    def recent(self, limit: int = 10) -> List[OutboxItem]:
+        """Return the most recently created items, newest first."""
+        rows = self._connection().execute(
+            'SELECT * FROM outbox ORDER BY created_at DESC, id DESC LIMIT ?', (limit,)
+        ).fetchall()
+        return [OutboxItem.from_row(row) for row in rows]
+
+
+class DeliveryWorker:
+    """Background threads sending due outbox items.
+
+    ``send`` posts an item and returns its tweet ID, or raises;
+    ``retryable`` decides whether an error is worth another attempt.
+    ``on_finished`` is called with every item that failed or expired, in a
+    worker thread. ``clock`` returns the current epoch time (the bot's
+    clock, so replays see their simulated time).
+    """
+
+    def __init__(self, outbox: Outbox, send: Callable[[OutboxItem], str],
+                 retryable: Callable[[Exception], bool],
+                 on_finished: Callable[[OutboxItem], None],
+                 policy: RetryPolicy = RetryPolicy(), threads: int = 1,
+                 clock: Callable[[], float] = time.time):
+        self.outbox = outbox
+        self.policy = policy
+        self.threads = threads
+        self._send = send
+        self._retryable = retryable
+        self._on_finished = on_finished
+        self._clock = clock
+        self._changed = threading.Condition()
+        self._generation = 0
+        self._stopping = False
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (if not running) and have them look for due items now."""
+        with self._lock:
+            self._stopping = False
+            self._workers = [thread for thread in self._workers if thread.is_alive()]
+            for n in range(len(self._workers), self.threads):
+                thread = threading.Thread(target=self._run, name=f"outbox-{n + 1}", daemon=True)
+                thread.start()
+                self._workers.append(thread)
+        self._notify()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker threads once their current delivery is done (waiting at most ``timeout``)."""
+        with self._lock:
+            self._stopping = True
+            workers, self._workers = self._workers, []
+        self._notify()
+        for thread in workers:
+            thread.join(timeout)
+
+    def wait(self, item_ids: Sequence[int], timeout: float,
+             finished_at: Optional[Dict[int, float]] = None) -> Dict[int, OutboxItem]:
+        """Wait until the items are finished, at most ``timeout`` seconds, and return their state.
+
+        Returns early once every unfinished item's next attempt is beyond the
+        timeout, e.g. deferred until a rate limit resets. ``finished_at``, if
+        given, receives the ``time.monotonic()`` at which each item was first
+        seen finished (for items left unfinished: when the wait returned).
+        """
+        finished_at = {} if finished_at is None else finished_at
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._changed:
+                generation = self._generation
+            items = self.outbox.items(item_ids)
+            seen = time.monotonic()
+            for item in items.values():
+                if item.finished:
+                    finished_at.setdefault(item.id, seen)
+            remaining = deadline - seen
+            horizon = self._clock() + remaining
+            if remaining <= 0 or all(
+                item.finished or (item.status != SENDING and item.next_attempt_at > horizon)
+                for item in items.values()
+            ):
+                for item_id in items:
+                    finished_at.setdefault(item_id, seen)
+                return items
+            with self._changed:
+                if self._generation == generation:
+                    self._changed.wait(min(remaining, WAIT_POLL_SECONDS))
+
+    def _notify(self):
+        """Wake waiting callers and idle workers."""
+        with self._changed:
+            self._generation += 1
+            self._changed.notify_all()
+
+    def _run(self):
+        """Deliver due items until stopped."""
+        while not self._stopping:
+            with self._changed:
+                generation = self._generation
+            try:
+                delivered = self._deliver_next()
+            except Exception as e:  # the database itself failed; try again later
+                logger.error(f"Outbox delivery error: {e}")
+                delivered = False
+            if delivered or self._stopping:
+                continue
+            try:
+                next_due = self.outbox.next_due()
+            except Exception:
+                next_due = None
+            delay = IDLE_POLL_SECONDS if next_due is None else next_due - self._clock()
+            with self._changed:
+                if self._generation == generation and delay > 0 and not self._stopping:
+                    self._changed.wait(min(delay, IDLE_POLL_SECONDS))
+
+    def _deliver_next(self) -> bool:
+        """Expire overdue items, then send the next due one. Returns False if none was due."""
+        now = self._clock()
+        for item in self.outbox.expire(now):
+            self._finished(item)
+        item = self.outbox.claim(now)
+        if item is None:
+            return False
+
+        try:
+            tweet_id = self._send(item)
+        except DeliveryDeferred as e:
+            now = self._clock()
+            if e.until >= item.deadline:
+                self.outbox.mark_failed(item.id, str(e), now)
+                logger.error(f"Giving up on tweet for '{item.account}': deferred past its deadline ({e})")
+                self._finished(self.outbox.items([item.id])[item.id])
+            else:
+                self.outbox.mark_deferred(item.id, str(e), e.until, now)
+                logger.warning(f"Tweet for '{item.account}' deferred for {e.until - now:.0f}s: {e}")
+        except Exception as e:
+            now = self._clock()
+            next_attempt_at = now + self.policy.delay(item.attempts)
+            if not self._retryable(e):
+                reason = "permanent error"
+            elif item.attempts >= self.policy.max_attempts:
+                reason = "out of attempts"
+            elif next_attempt_at >= item.deadline:
+                reason = "no retry possible before its deadline"
+            else:
+                reason = None
+            if reason is not None:
+                self.outbox.mark_failed(item.id, str(e), now)
+                logger.error(f"Giving up on tweet for '{item.account}' after {item.attempts} "
+                             f"attempt(s) ({reason}): {e}")
+                self._finished(self.outbox.items([item.id])[item.id])
+            else:
+                self.outbox.mark_retry(item.id, str(e), next_attempt_at, now)
+                logger.warning(f"Tweet for '{item.account}' failed (attempt {item.attempts}), "
+                               f"retrying in {next_attempt_at - now:.0f}s: {e}")
+        else:
+            self.outbox.mark_sent(item.id, tweet_id, self._clock())
+        self._notify()
+        return True
+
+    def _finished(self, item: OutboxItem):
+        """Report a failed or expired item."""
+        if item.status == EXPIRED:
+            logger.error(f"Tweet for '{item.account}' on {item.local_date} expired undelivered "
+                         f"after {item.attempts} attempt(s): {item.last_error}")
+        try:
+            self._on_finished(item)
+        except Exception as e:
+            logger.error(f"Exception reporting outbox item {item.id}: {e}")
@@ -0,0 +1,128 @@
+"""
+Idempotent post ledger for F1 Countdown Bot.
+
+Every posted tweet is appended to a per-account JSON-lines ledger, keyed by
+(account, local date, content hash). Posting holds an exclusive file lock
+while it checks the ledger, calls Twitter and records the tweet ID, so
+overlapping runs (a cron retry plus a manual --test, or a slow run plus the
+next one) can never post the same countdown twice.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+LEDGER_DIR = 'ledger'
+
+
+@dataclass(frozen=True)
+class PostKey:
+    """Identity of a post for duplicate detection."""
+
+    account: str
+    local_date: str
+    content_hash: str
+
+    @classmethod
+    def for_tweet(cls, account: str, local_date: date, content: str) -> 'PostKey':
+        """Build the key for a tweet posted on a local date."""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return cls(account, local_date.isoformat(), digest)
+
+
+def _lock(f):
+    """Take an exclusive lock on an open file (blocking)."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock(f):
+    """Release a lock taken by _lock."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class PostLedger:
+    """Append-only ledger of one account's posts."""
+
+    def __init__(self, cache_dir: str, account: str):
+        """Open (lazily) <cache_dir>/ledger/<account>.jsonl."""
+        directory = os.path.join(cache_dir, LEDGER_DIR)
+        self.path = os.path.join(directory, f"{account}.jsonl")
+        self.lock_path = os.path.join(directory, f"{account}.lock")
+        self._entries: Dict[PostKey, dict] = {}
+        self._offset = 0
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def locked(self) -> Iterator['PostLedger']:
+        """Hold the ledger lock across processes, with the index up to date."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._thread_lock, open(self.lock_path, 'a+') as lock_file:
+            _lock(lock_file)
+            try:
+                self._refresh()
+                yield self
+            finally:
+                _unlock(lock_file)
+
+    def get(self, key: PostKey) -> Optional[dict]:
+        """Return the ledger entry for a key, if that post was already made."""
+        return self._entries.get(key)
+
+    def record(self, key: PostKey, tweet_id: str) -> dict:
+        """Append a posted tweet to the ledger (call while holding the lock)."""
+        entry = {
+            "account": key.account,
+            "local_date": key.local_date,
+            "content_hash": key.content_hash,
+            "tweet_id": str(tweet_id),
+            "posted_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries[key] = entry
+        return entry
+
+    def _refresh(self):
+        """Index lines appended since the last read (by this or another process)."""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Only consume complete lines; a torn last line is re-read next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                key = PostKey(entry['account'], entry['local_date'], entry['content_hash'])
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping malformed line in post ledger {self.path}")
+                continue
+            self._entries[key] = entry
+        self._offset += end
@@ -0,0 +1,116 @@
+"""
+Posting profiles for F1 Countdown Bot.
+
+A profile is one audience: the account it posts to, the timezone that
+decides "today", its daily tweet time and an optional tweet template.
+Profiles are configured as ``[profile:<name>]`` sections in config.ini:
+
+    [profile:europe]
+    account = en
+    timezone = Europe/London
+    tweet_time = 09:00
+    template = en
+
+``template`` names a ``[template:<name>]`` section or is inline template
+text (see tweet_templates.py). Without it the profile uses its account's
+template, and otherwise the default one.
+
+Without profile sections every account is its own profile, using the
+account's timezone and the global ``tweet_time``. All profiles are served by
+one process and share the same read-only schedule index, so a profile only
+costs the composition of its tweet.
+"""
+
+import configparser
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from accounts import TwitterAccount
+from tweet_templates import TweetTemplate, resolve_template
+
+PROFILE_SECTION_PREFIX = 'profile:'
+
+
+@dataclass(frozen=True)
+class Profile:
+    """One audience the bot posts a daily countdown for."""
+
+    name: str
+    account: TwitterAccount
+    timezone: str
+    tweet_time: str
+    template: Optional[TweetTemplate] = None
+
+    @property
+    def timeout(self) -> float:
+        """Posting timeout, taken from the profile's account."""
+        return self.account.timeout
+
+
+def validate_tweet_time(value: str, section: str) -> str:
+    """Check an HH:MM tweet time."""
+    try:
+        hour, minute = (int(part) for part in value.split(':'))
+    except ValueError:
+        raise ValueError(f"[{section}] tweet_time must be HH:MM, got {value!r}") from None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"[{section}] tweet_time must be HH:MM, got {value!r}")
+    return value
+
+
+def _account_template(templates: Dict[str, TweetTemplate], account: TwitterAccount,
+                      value: Optional[str], where: str) -> Optional[TweetTemplate]:
+    """Resolve a profile's template, falling back to its account's."""
+    if value is None:
+        value, where = account.template, f"account:{account.name}"
+    return resolve_template(templates, value, where) if value is not None else None
+
+
+def load_profiles(config: configparser.ConfigParser, accounts: List[TwitterAccount],
+                  default_tweet_time: str, templates: Dict[str, TweetTemplate]) -> List[Profile]:
+    """Load the configured profiles, or one profile per account."""
+    by_name = {account.name: account for account in accounts}
+    profiles = []
+    for section in config.sections():
+        if not section.startswith(PROFILE_SECTION_PREFIX):
+            continue
+        name = section[len(PROFILE_SECTION_PREFIX):].strip()
+
+        account_name = config.get(section, 'account', fallback=None)
+        if account_name is None:
+            if len(accounts) != 1:
+                raise ValueError(f"[{section}] must name its account (one of: {', '.join(by_name)})")
+            account = accounts[0]
+        elif account_name in by_name:
+            account = by_name[account_name]
+        else:
+            raise ValueError(f"[{section}] uses unknown account '{account_name}'")
+
+        timezone = config.get(section, 'timezone', fallback=account.timezone)
+        ZoneInfo(timezone)  # fail fast on unknown timezones
+        profiles.append(Profile(
+            name=name,
+            account=account,
+            timezone=timezone,
+            tweet_time=validate_tweet_time(
+                config.get(section, 'tweet_time', fallback=default_tweet_time), section
+            ),
+            template=_account_template(
+                templates, account, config.get(section, 'template', raw=True, fallback=None), section
+            ),
+        ))
+
+    if not profiles:
+        profiles = [
+            Profile(name=account.name, account=account, timezone=account.timezone,
+                    tweet_time=default_tweet_time,
+                    template=_account_template(templates, account, None, f"account:{account.name}"))
+            for account in accounts
+        ]
+    return profiles
+
+
+def has_profile_sections(config: configparser.ConfigParser) -> bool:
+    """Return True if config.ini defines any [profile:<name>] sections."""
+    return any(section.startswith(PROFILE_SECTION_PREFIX) for section in config.sections())
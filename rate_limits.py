@@ -0,0 +1,176 @@
+"""
+Twitter rate-limit budgets for F1 Countdown Bot.
+
+Twitter reports the request budget of an endpoint on every response:
+``x-rate-limit-limit``, ``-remaining`` and ``-reset`` (epoch seconds) for its
+short window, and ``x-user-limit-24hour-*`` / ``x-app-limit-24hour-*`` for
+the daily posting caps. A response hook on each Twitter client's session
+records them per account and endpoint in <cache_dir>/rate_limits.json, so
+the budget is known across cron runs and processes.
+
+Clients are created with ``wait_on_rate_limit=False``: instead of letting
+tweepy sleep until a reset, the bot checks the budget before a request and
+defers a post whose endpoint is exhausted until the reset time (see
+outbox.DeliveryDeferred).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+from state_files import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITS_FILE = 'rate_limits.json'
+
+# Header prefix -> name of the window it describes
+HEADER_WINDOWS = {
+    'x-rate-limit-': 'window',
+    'x-user-limit-24hour-': 'user_24h',
+    'x-app-limit-24hour-': 'app_24h',
+}
+# A 429 without a reset header is assumed to lift after this many seconds
+DEFAULT_RETRY_AFTER = 60.0
+
+TWEET_ENDPOINT = 'POST /2/tweets'
+ME_ENDPOINT = 'GET /2/users/me'
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """The budget of one rate-limit window, as last reported by Twitter."""
+
+    remaining: int
+    reset: float  # epoch seconds
+    limit: Optional[int] = None
+    observed_at: float = 0.0
+
+    def exhausted(self, now: float) -> bool:
+        """True if no request is left before the reset."""
+        return self.remaining <= 0 and self.reset > now
+
+
+def endpoint_of(method: str, url: str) -> str:
+    """Name a request's endpoint, e.g. 'POST /2/tweets' (numeric IDs, not the version, become ':id')."""
+    path = re.sub(r'(?<=.)/\d+(?=/|$)', '/:id', urlsplit(url).path)
+    return f"{method.upper()} {path}"
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def limits_from_response(status_code: int, headers: Mapping[str, str], now: float) -> Dict[str, RateLimit]:
+    """Read the rate-limit windows a response reports, by window name."""
+    limits = {}
+    for prefix, window in HEADER_WINDOWS.items():
+        remaining = _int(headers.get(prefix + 'remaining'))
+        reset = _int(headers.get(prefix + 'reset'))
+        if remaining is None or reset is None:
+            continue
+        limits[window] = RateLimit(remaining, float(reset), _int(headers.get(prefix + 'limit')), now)
+
+    if status_code == 429 and not any(limit.exhausted(now) for limit in limits.values()):
+        # Limited without saying which window ran out: honour Retry-After, or a default pause
+        reset = _int(headers.get('x-rate-limit-reset'))
+        if reset is None:
+            retry_after = _int(headers.get('Retry-After'))
+            reset = now + (retry_after if retry_after is not None else DEFAULT_RETRY_AFTER)
+        limit = limits['window'].limit if 'window' in limits else None
+        limits['window'] = RateLimit(0, float(reset), limit, now)
+    return limits
+
+
+class RateLimitTracker:
+    """Per-account, per-endpoint rate-limit budgets, persisted in the cache directory."""
+
+    def __init__(self, cache_dir: str):
+        """Load <cache_dir>/rate_limits.json (missing or unreadable: no budgets known)."""
+        self.path = os.path.join(cache_dir, RATE_LIMITS_FILE)
+        self._lock = threading.Lock()
+        # account -> endpoint -> window -> RateLimit
+        self._limits: Dict[str, Dict[str, Dict[str, RateLimit]]] = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, RateLimit]]]:
+        """Read the budgets file."""
+        data = read_json(self.path)
+        limits: Dict[str, Dict[str, Dict[str, RateLimit]]] = {}
+        if not isinstance(data, dict):
+            return limits
+        for account, endpoints in data.items():
+            try:
+                limits[account] = {
+                    endpoint: {window: RateLimit(**limit) for window, limit in windows.items()}
+                    for endpoint, windows in endpoints.items()
+                }
+            except (AttributeError, TypeError):
+                logger.warning(f"Ignoring malformed rate limits for '{account}' in {self.path}")
+        return limits
+
+    def record(self, account: str, endpoint: str, status_code: int, headers: Mapping[str, str]):
+        """Store the budget a response reports and persist it."""
+        now = time.time()
+        limits = limits_from_response(status_code, headers, now)
+        if not limits:
+            return
+        with self._lock:
+            # Another process may have recorded other endpoints since we read the file
+            merged = self._read()
+            for name, endpoints in self._limits.items():
+                for other, windows in endpoints.items():
+                    current = merged.setdefault(name, {}).setdefault(other, {})
+                    for window, limit in windows.items():
+                        if window not in current or current[window].observed_at < limit.observed_at:
+                            current[window] = limit
+            merged.setdefault(account, {}).setdefault(endpoint, {}).update(limits)
+            self._limits = merged
+            try:
+                atomic_write_json(self.path, {
+                    name: {other: {window: asdict(limit) for window, limit in windows.items()}
+                           for other, windows in endpoints.items()}
+                    for name, endpoints in merged.items()
+                })
+            except OSError as e:
+                logger.warning(f"Could not save rate limits: {e}")
+
+        for window, limit in limits.items():
+            if limit.remaining <= 0:
+                logger.warning(f"Rate limit of {endpoint} ({window}) for '{account}' exhausted until "
+                               f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(limit.reset))}")
+
+    def exhausted_until(self, account: str, endpoint: str, now: float) -> Optional[float]:
+        """Return when an exhausted endpoint can be called again (None if it has budget left)."""
+        with self._lock:
+            windows = dict(self._limits.get(account, {}).get(endpoint, {}))
+        resets = [limit.reset for limit in windows.values() if limit.exhausted(now)]
+        return max(resets) if resets else None
+
+    def budgets(self, account: str) -> Dict[str, Dict[str, RateLimit]]:
+        """Return the known budgets of an account, by endpoint and window."""
+        with self._lock:
+            return {endpoint: dict(windows) for endpoint, windows in self._limits.get(account, {}).items()}
+
+    def response_hook(self, account: str) -> Callable:
+        """Return a requests response hook recording an account's budgets."""
+        def hook(response, *args, **kwargs):
+            try:
+                self.record(account, endpoint_of(response.request.method, response.url),
+                            response.status_code, response.headers)
+            except Exception as e:  # never break the request over bookkeeping
+                logger.warning(f"Could not record rate limits: {e}")
+            return response
+        return hook
+
+    def attach(self, client, account: str):
+        """Record the budgets of every response a tweepy.Client (or tweepy.API) receives."""
+        client.session.hooks['response'].append(self.response_hook(account))
+        return client
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3.13
+"""
+Season replay for F1 Countdown Bot.
+
+Runs the real daily pipeline (daily_tweet_generation -> _compose_tweet ->
+_post_tweet) for every day of a date range, with the bot's clock set to
+that day's tweet_time. Twitter and Discord are replaced by recorders and
+the schedule comes from the season snapshots in the cache (or, with
+--synthetic, the fake services' 22-race schedule), so a replay makes no
+network requests. Days are independent, so the range is split into
+contiguous chunks run by a process pool:
+
+    python replay.py 2024-01-01 2026-12-31 --output before.jsonl
+    # ...make changes...
+    python replay.py 2024-01-01 2026-12-31 --output after.jsonl
+    diff before.jsonl after.jsonl
+
+The output has one JSON line per simulated run, in date order: the run's
+local time, profile, outcome, the tweets posted and the Discord
+notifications sent. Race day, the day after a race and the season change
+are simply dates in the range. Image cards are not rendered in a replay.
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import glob
+import io
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing import get_context
+from typing import List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from bot_config import BotConfig, load_config
+from logging_setup import LoggingOptions
+
+DEFAULT_OUTPUT = 'replay.jsonl'
+ERROR_WEBHOOK = 'replay://discord/errors'
+SUCCESS_WEBHOOK = 'replay://discord/success'
+
+# Worker bots only log errors; everything else a run does is in the output
+WORKER_LOGGING = LoggingOptions(level=logging.ERROR, log_file=None)
+
+
+class ReplayClock:
+    """Clock injected into the bot, set to each simulated run's time."""
+
+    def __init__(self):
+        self.now: Optional[datetime] = None
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class Recorder:
+    """Collects the tweets and Discord notifications of one run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tweet_ids = itertools.count(1)
+        self.tweets: List[dict] = []
+        self.discord: List[dict] = []
+
+    def tweet(self, account: str, text: str) -> str:
+        """Record a tweet and return a fake tweet ID."""
+        with self._lock:
+            self.tweets.append({"account": account, "text": text})
+            return str(next(self._tweet_ids))
+
+    def notification(self, webhook_url: str, payload: dict):
+        """Record a Discord notification."""
+        embed = payload["embeds"][0]
+        with self._lock:
+            self.discord.append({
+                "webhook": "error" if webhook_url == ERROR_WEBHOOK else "success",
+                "title": embed["title"],
+                "description": embed["description"],
+            })
+
+    def take(self) -> dict:
+        """Return and clear what was recorded, sorted so concurrent posts don't reorder it."""
+        with self._lock:
+            recorded = {
+                "tweets": sorted(self.tweets, key=lambda tweet: tweet["account"]),
+                "discord": sorted(self.discord, key=lambda entry: (entry["webhook"], entry["title"])),
+            }
+            self.tweets, self.discord = [], []
+        return recorded
+
+
+class RecordingTwitterClient:
+    """Stands in for tweepy.Client, recording tweets instead of posting them."""
+
+    def __init__(self, account: str, recorder: Recorder):
+        self.account = account
+        self.recorder = recorder
+
+    def create_tweet(self, text: str, media_ids=None):
+        """Record the tweet."""
+        return type('Response', (), {'data': {'id': self.recorder.tweet(self.account, text)}})()
+
+
+class RecordingNotifier:
+    """Stands in for the Discord NotificationDispatcher, recording payloads."""
+
+    flush_timeout: Optional[float] = None
+
+    def __init__(self, recorder: Recorder):
+        self.recorder = recorder
+
+    def send(self, webhook_url: str, payload: dict, description: str = "notification",
+             metrics=None) -> bool:
+        """Record the notification."""
+        self.recorder.notification(webhook_url, payload)
+        return True
+
+    def pending(self) -> int:
+        return 0
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+
+def _bot_class():
+    """Return the replay subclass of the bot (imported in the worker)."""
+    from f1_countdown_bot import F1CountdownBot
+
+    class ReplayBot(F1CountdownBot):
+        """The bot with recorders for Twitter and Discord, and no schedule fetching."""
+
+        def __init__(self, config: BotConfig, clock: ReplayClock, recorder: Recorder):
+            self.recorder = recorder
+            super().__init__(config=config, clock=clock)
+            self.notifications = RecordingNotifier(recorder)
+
+        def _create_twitter_client(self, account):
+            return RecordingTwitterClient(account.name, self.recorder)
+
+        def _fetch_season(self, year: int):
+            # Replays only use the seeded snapshots
+            return None
+
+    return ReplayBot
+
+
+def replay_config(config: BotConfig, cache_dir: str) -> BotConfig:
+    """Return a copy of the configuration for a replay worker."""
+    return dataclasses.replace(
+        config,
+        cache_location=cache_dir,
+        metrics_file='',
+        prometheus_file='',
+        logging=WORKER_LOGGING,
+        cards=dataclasses.replace(config.cards, enabled=False),
+        config_reload_seconds=0,
+        error_webhook_url=ERROR_WEBHOOK,
+        success_webhook_url=SUCCESS_WEBHOOK,
+        twitter_api_url=None,
+        schedule_url=None,
+    )
+
+
+def run_times(bot, day: date) -> List[tuple]:
+    """Return the (profiles, local time, profile name) of each run on a day, in time order."""
+    if not bot.multi_profile:
+        hour, minute = (int(part) for part in bot.tweet_time.split(':'))
+        return [(None, datetime(day.year, day.month, day.day, hour, minute, tzinfo=bot.timezone), None)]
+    runs = []
+    for profile in bot.profiles:
+        hour, minute = (int(part) for part in profile.tweet_time.split(':'))
+        moment = datetime(day.year, day.month, day.day, hour, minute, tzinfo=ZoneInfo(profile.timezone))
+        runs.append(([profile], moment, profile.name))
+    return sorted(runs, key=lambda run: run[1])
+
+
+def replay_days(config_path: str, seed_dir: str, days: Sequence[str]) -> List[dict]:
+    """Replay a chunk of days in a fresh bot with its own cache directory (worker)."""
+    with tempfile.TemporaryDirectory(prefix='f1-replay-') as cache_dir:
+        for path in glob.glob(os.path.join(seed_dir, 'season_*.json')):
+            shutil.copy(path, cache_dir)
+
+        clock, recorder = ReplayClock(), Recorder()
+        clock.now = datetime.fromisoformat(days[0]).replace(tzinfo=timezone.utc)
+        config = replay_config(load_config(config_path), cache_dir)
+        records = []
+        # The pipeline prints its progress; the output file is the result
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            bot = _bot_class()(config, clock, recorder)
+            for day in map(date.fromisoformat, days):
+                for profiles, moment, name in run_times(bot, day):
+                    clock.now = moment
+                    bot.daily_tweet_generation(profiles)
+                    records.append({
+                        "time": moment.isoformat(),
+                        "profile": name,
+                        "outcome": bot.metrics.outcome,
+                        **recorder.take(),
+                    })
+                stdout.seek(0)
+                stdout.truncate()
+            bot.close()
+        return records
+
+
+def seed_snapshots(config: BotConfig, years: Sequence[int], synthetic: bool, seed_dir: str) -> str:
+    """Make sure every season snapshot a replay needs exists, returning their directory."""
+    if synthetic:
+        from fake_services import synthetic_schedule
+        from season_snapshot import snapshot_from_events, write_snapshot
+
+        for year in years:
+            write_snapshot(seed_dir, snapshot_from_events(year, synthetic_schedule(year)))
+        return seed_dir
+
+    # Load (and fetch if missing or stale) with the real bot, as --warm-cache would
+    from f1_countdown_bot import F1CountdownBot
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bot = F1CountdownBot(config=config, debug_mode=True)
+        for year in years:
+            if bot._load_season(year) is None:
+                print(f"⚠️  No schedule for {year}, replayed days will see it as unpublished")
+    return config.cache_location
+
+
+def chunked(days: List[str], chunks: int) -> List[List[str]]:
+    """Split days into at most ``chunks`` contiguous, nearly equal chunks."""
+    size = -(-len(days) // max(1, chunks))
+    return [days[start:start + size] for start in range(0, len(days), size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay F1 Countdown Bot over a date range")
+    parser.add_argument('start', type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument('end', type=date.fromisoformat, help="Last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--config', default='config.ini', help="Bot configuration (default config.ini)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"JSON lines output (default {DEFAULT_OUTPUT})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--synthetic', action='store_true',
+                        help="Use the fake services' synthetic schedule instead of the real one")
+    args = parser.parse_args()
+    if args.end < args.start:
+        parser.error("end is before start")
+
+    days = [(args.start + timedelta(days=n)).isoformat() for n in range((args.end - args.start).days + 1)]
+    years = list(range(args.start.year, args.end.year + 2))
+    config = load_config(args.config)
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='f1-replay-seed-') as seed_dir:
+        seed_dir = seed_snapshots(config, years, args.synthetic, seed_dir)
+        # A few chunks per worker keeps them all busy to the end
+        chunks = chunked(days, args.workers * 4)
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=get_context('spawn')) as pool:
+            results = pool.map(replay_days, [args.config] * len(chunks), [seed_dir] * len(chunks), chunks)
+            records = [record for chunk in results for record in chunk]
+    elapsed = time.perf_counter() - started
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, sort_keys=True) + "\n")
+
+    outcomes = Counter(record["outcome"] for record in records)
+    print(f"🔁 Replayed {len(days)} days ({len(records)} runs) in {elapsed:.2f}s with {args.workers} workers")
+    print(f"   Outcomes: {', '.join(f'{outcome} {count}' for outcome, count in sorted(outcomes.items()))}")
+    print(f"   Tweets: {sum(len(record['tweets']) for record in records)}, "
+          f"Discord notifications: {sum(len(record['discord']) for record in records)}")
+    print(f"📝 Written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
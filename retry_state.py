@@ -0,0 +1,90 @@
+"""
+Persistent Fibonacci retry state for F1 Countdown Bot.
+
+The retry index, the next allowed attempt and the last successful fetch are
+kept in a small state file, so the backoff survives across cron invocations.
+A run that starts inside the backoff window exits early instead of hitting
+FastF1 or Twitter again.
+"""
+
+import logging
+import os
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Optional
+
+from state_files import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATE_FILE = 'retry_state.json'
+
+
+@dataclass
+class RetryState:
+    """Backoff state shared by consecutive runs."""
+
+    fibonacci_index: int = 0
+    next_attempt_at: Optional[str] = None        # ISO timestamp
+    last_successful_fetch: Optional[str] = None  # ISO timestamp
+
+    def backoff_until(self, now: datetime) -> Optional[datetime]:
+        """Return the end of the backoff window if ``now`` is inside it."""
+        if not self.next_attempt_at:
+            return None
+        next_attempt = datetime.fromisoformat(self.next_attempt_at)
+        return next_attempt if now < next_attempt else None
+
+
+class RetryStateStore:
+    """Reads and writes the retry state file in the cache directory."""
+
+    def __init__(self, cache_dir: str):
+        """Create a store at <cache_dir>/retry_state.json."""
+        self.path = os.path.join(cache_dir, RETRY_STATE_FILE)
+
+    def load(self) -> RetryState:
+        """Load the state, starting fresh if the file is missing or invalid."""
+        data = read_json(self.path)
+        if not isinstance(data, dict):
+            return RetryState()
+        try:
+            state = RetryState(**data)
+            # Validate every field up front so a corrupt file can't break a run
+            index = state.fibonacci_index
+            if not isinstance(index, int) or isinstance(index, bool) or index < 0:
+                raise ValueError(f"invalid fibonacci_index {index!r}")
+            for name in ('next_attempt_at', 'last_successful_fetch'):
+                value = getattr(state, name)
+                if value is not None and parse_timestamp(value) is None:
+                    raise ValueError(f"invalid {name} {value!r}")
+            return state
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed retry state in {self.path}: {e}")
+            return RetryState()
+
+    def save(self, state: RetryState):
+        """Write the state atomically."""
+        atomic_write_json(self.path, asdict(state))
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse a timezone-aware ISO timestamp (None if it is not one)."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else None
+
+
+def backoff_delay_minutes(base_minutes: float, max_minutes: float, jitter: float,
+                          rng: Optional[random.Random] = None) -> float:
+    """Cap the Fibonacci delay and spread it by +/- ``jitter`` (a fraction)."""
+    rng = rng or random
+    delay = min(base_minutes, max_minutes)
+    if jitter > 0:
+        delay *= 1 + rng.uniform(-jitter, jitter)
+    return max(0.0, min(delay, max_minutes))
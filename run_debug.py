@@ -1,8 +1,15 @@
 #!/usr/bin/env python3.13
 """Debug script for F1 Countdown Bot."""
 
+import sys
+
+from bot_config import ConfigError
 from f1_countdown_bot import F1CountdownBot
 
 if __name__ == "__main__":
-    bot = F1CountdownBot(debug_mode=True)
+    try:
+        bot = F1CountdownBot(debug_mode=True)
+    except ConfigError as e:
+        print(f"❌ Configuration error: {e}")
+        sys.exit(1)
     bot.daily_tweet_generation()
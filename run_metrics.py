@@ -0,0 +1,183 @@
+"""
+Per-run timing and counters for F1 Countdown Bot.
+
+Each run records the wall-clock and CPU time of its phases (config load,
+Twitter setup, schedule fetch, compose, post, notifications...) together
+with counters such as retries, cache hits and HTTP status codes. At the end
+of the run the metrics are appended as one JSON line to a metrics log and/or
+written as a Prometheus textfile-collector file for node_exporter.
+
+Phases may nest (schedule_fetch runs inside race_resolution) and may repeat
+(one notification phase per Discord message); repeated phases are summed.
+CPU time is the calling thread's, so phases running on worker threads are
+measured correctly.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+from state_files import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = 'f1bot'
+
+
+class RunMetrics:
+    """Phase timings and counters for one bot run (thread-safe)."""
+
+    def __init__(self, run_id: Optional[str] = None):
+        """Start a new run."""
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = datetime.now(timezone.utc)
+        self.outcome: Optional[str] = None
+        self.exported = False
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._lock = threading.Lock()
+        self._phases: List[dict] = []
+        self._counters: Counter = Counter()
+        self._http: Counter = Counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            record = {
+                "phase": name,
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.thread_time() - cpu_start,
+            }
+            with self._lock:
+                self._phases.append(record)
+
+    def incr(self, name: str, amount: int = 1):
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] += amount
+
+    def http_status(self, service: str, status_code: Optional[int]):
+        """Count an HTTP response from a service ('twitter', 'discord', ...)."""
+        if status_code is None:
+            return
+        with self._lock:
+            self._http[(service, int(status_code))] += 1
+
+    def phase_totals(self) -> Dict[str, dict]:
+        """Return wall/CPU time and call count per phase name, in first-seen order."""
+        totals: Dict[str, dict] = {}
+        with self._lock:
+            phases = list(self._phases)
+        for record in phases:
+            total = totals.setdefault(
+                record["phase"], {"wall_seconds": 0.0, "cpu_seconds": 0.0, "count": 0}
+            )
+            total["wall_seconds"] += record["wall_seconds"]
+            total["cpu_seconds"] += record["cpu_seconds"]
+            total["count"] += 1
+        return totals
+
+    def to_dict(self) -> dict:
+        """Return the run's metrics as a JSON-serializable dict."""
+        with self._lock:
+            counters = dict(self._counters)
+            http = [
+                {"service": service, "status": status, "count": count}
+                for (service, status), count in sorted(self._http.items())
+            ]
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": (self._end or time.perf_counter()) - self._start,
+            "outcome": self.outcome,
+            "phases": self.phase_totals(),
+            "counters": counters,
+            "http_responses": http,
+        }
+
+    def append_json_line(self, path: str):
+        """Append the run's metrics to a JSON-lines file."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_dict(), separators=(',', ':')) + '\n')
+
+    def to_prometheus(self) -> str:
+        """Render the run's metrics in the Prometheus text exposition format."""
+        data = self.to_dict()
+        p = PROMETHEUS_PREFIX
+        lines = [
+            f"# HELP {p}_run_duration_seconds Wall-clock duration of the last run.",
+            f"# TYPE {p}_run_duration_seconds gauge",
+            f"{p}_run_duration_seconds {data['duration_seconds']:.6f}",
+            f"# HELP {p}_run_timestamp_seconds Start time of the last run.",
+            f"# TYPE {p}_run_timestamp_seconds gauge",
+            f"{p}_run_timestamp_seconds {self.started_at.timestamp():.3f}",
+            f"# HELP {p}_run_success Whether the last run succeeded (1) or failed (0).",
+            f"# TYPE {p}_run_success gauge",
+            f"{p}_run_success {0 if data['outcome'] == 'failed' else 1}",
+            f"# HELP {p}_phase_wall_seconds Wall-clock time spent in each phase of the last run.",
+            f"# TYPE {p}_phase_wall_seconds gauge",
+        ]
+        phases = data["phases"]
+        lines += [
+            f'{p}_phase_wall_seconds{{phase="{name}"}} {total["wall_seconds"]:.6f}'
+            for name, total in phases.items()
+        ]
+        lines += [
+            f"# HELP {p}_phase_cpu_seconds CPU time spent in each phase of the last run.",
+            f"# TYPE {p}_phase_cpu_seconds gauge",
+        ]
+        lines += [
+            f'{p}_phase_cpu_seconds{{phase="{name}"}} {total["cpu_seconds"]:.6f}'
+            for name, total in phases.items()
+        ]
+        lines += [
+            f"# HELP {p}_run_events Events counted during the last run (retries, cache hits...).",
+            f"# TYPE {p}_run_events gauge",
+        ]
+        lines += [
+            f'{p}_run_events{{event="{name}"}} {count}'
+            for name, count in sorted(data["counters"].items())
+        ]
+        lines += [
+            f"# HELP {p}_http_responses HTTP responses received during the last run.",
+            f"# TYPE {p}_http_responses gauge",
+        ]
+        lines += [
+            f'{p}_http_responses{{service="{entry["service"]}",code="{entry["status"]}"}} {entry["count"]}'
+            for entry in data["http_responses"]
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the textfile-collector file atomically (node_exporter may read it anytime)."""
+        atomic_write_text(path, self.to_prometheus())
+
+    def export(self, json_path: Optional[str], prometheus_path: Optional[str]):
+        """End the run and write the configured exports, logging (not raising) on failure."""
+        self._end = time.perf_counter()
+        self.exported = True
+        for path, write in ((json_path, self.append_json_line),
+                            (prometheus_path, self.write_prometheus)):
+            if not path:
+                continue
+            try:
+                write(path)
+            except OSError as e:
+                logger.warning(f"Could not write run metrics to {path}: {e}")
+
+
+def status_code_of(error: Exception) -> Optional[int]:
+    """Return the HTTP status code carried by a requests/tweepy exception, if any."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
@@ -0,0 +1,115 @@
+"""
+Sorted schedule index for F1 Countdown Bot.
+
+Holds the races of one or more consecutive seasons as a sorted array of date
+ordinals, so resolving the next and last race for a date is a single bisect
+instead of filtering a DataFrame.
+
+Session times are kept in the flat typed arrays of the season snapshots
+(``session_kinds``/``session_starts``, SESSIONS_PER_EVENT slots per event).
+For each countdown target (see ``COUNTDOWN_SESSIONS``) the index derives, on
+first use, a sorted tuple of start times (epoch seconds) and the matching
+sessions, so resolving the next and last session for a moment is one bisect
+too, at hour (in fact second) precision. Lookup tables are tuples rather
+than arrays because bisect reads tuple items without boxing them.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from season_snapshot import (NO_SESSION, SESSION_NAMES, SESSIONS_PER_EVENT, RaceEvent, SeasonSnapshot,
+                             Session)
+
+# countdown_session setting -> the session names it counts down to
+COUNTDOWN_SESSIONS = {
+    'race': ('Race',),
+    'qualifying': ('Qualifying',),
+    'sprint': ('Sprint',),
+    'sprint_qualifying': ('Sprint Qualifying', 'Sprint Shootout'),
+}
+
+
+class ScheduleIndex:
+    """Immutable index of races across consecutive seasons."""
+
+    def __init__(self, seasons: Iterable[SeasonSnapshot]):
+        """Build the index from season snapshots."""
+        seasons = sorted(seasons, key=lambda season: season.year)
+        rows = []
+        season_of: Dict[RaceEvent, int] = {}
+        for season in seasons:
+            for position, event in enumerate(season.events):
+                first = position * SESSIONS_PER_EVENT
+                rows.append((event, season, first))
+                season_of[event] = season.year
+        rows.sort(key=lambda row: row[0].date)
+
+        self.seasons: Tuple[SeasonSnapshot, ...] = tuple(seasons)
+        self.years: Tuple[int, ...] = tuple(season.year for season in seasons)
+        self.events: Tuple[RaceEvent, ...] = tuple(event for event, _, _ in rows)
+        self.ordinals: Tuple[int, ...] = tuple(event.date.toordinal() for event in self.events)
+        self._season_of = season_of
+
+        # Session slots of every event, in index order
+        self.session_kinds = array('b')
+        self.session_starts = array('q')
+        for _, season, first in rows:
+            kinds = season.session_kinds[first:first + SESSIONS_PER_EVENT]
+            starts = season.session_starts[first:first + SESSIONS_PER_EVENT]
+            if len(kinds) < SESSIONS_PER_EVENT:  # snapshot without sessions
+                kinds = array('b', [NO_SESSION]) * SESSIONS_PER_EVENT
+                starts = array('q', [0]) * SESSIONS_PER_EVENT
+            self.session_kinds.extend(kinds)
+            self.session_starts.extend(starts)
+        # Session names -> (sorted start times, sessions)
+        self._session_tables: Dict[Tuple[str, ...], Tuple[Tuple[int, ...], Tuple[Session, ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def with_season(self, season: SeasonSnapshot) -> 'ScheduleIndex':
+        """Return a new index that also covers the given season."""
+        others = [s for s in self.seasons if s.year != season.year]
+        return ScheduleIndex(others + [season])
+
+    def season_of(self, event: RaceEvent) -> int:
+        """Return the season year an indexed race belongs to."""
+        return self._season_of[event]
+
+    def next_and_last(self, day: date) -> Tuple[Optional[RaceEvent], Optional[RaceEvent]]:
+        """Return the next race on or after ``day`` and the last race before it."""
+        position = bisect_left(self.ordinals, day.toordinal())
+        next_race = self.events[position] if position < len(self.events) else None
+        last_race = self.events[position - 1] if position > 0 else None
+        return next_race, last_race
+
+    def _session_table(self, names: Tuple[str, ...]) -> Tuple[Tuple[int, ...], Tuple[Session, ...]]:
+        """Return the sorted start times of the named sessions, and the sessions."""
+        table = self._session_tables.get(names)
+        if table is None:
+            codes = {SESSION_NAMES.index(name) for name in names}
+            slots = sorted(
+                (start, slot) for slot, (kind, start) in enumerate(zip(self.session_kinds, self.session_starts))
+                if kind in codes
+            )
+            table = (
+                tuple(start for start, _ in slots),
+                tuple(
+                    Session(self.events[slot // SESSIONS_PER_EVENT], SESSION_NAMES[self.session_kinds[slot]],
+                            datetime.fromtimestamp(start, timezone.utc))
+                    for start, slot in slots
+                ),
+            )
+            self._session_tables[names] = table  # immutable index: a racing rebuild is harmless
+        return table
+
+    def next_and_last_session(self, names: Tuple[str, ...],
+                              moment: datetime) -> Tuple[Optional[Session], Optional[Session]]:
+        """Return the next of the named sessions starting after ``moment`` and the last one before it."""
+        starts, sessions = self._session_table(names)
+        position = bisect_right(starts, int(moment.timestamp()))
+        next_session = sessions[position] if position < len(sessions) else None
+        last_session = sessions[position - 1] if position > 0 else None
+        return next_session, last_session
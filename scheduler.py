@@ -0,0 +1,110 @@
+"""
+Heap-based job scheduler for F1 Countdown Bot's --schedule mode.
+
+Jobs are kept in a heap ordered by due time (wall clock, epoch seconds), and
+the loop sleeps until the earliest one is due instead of polling. Scheduling
+a job or calling stop() wakes the loop immediately.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Re-check the wall clock at least this often, so suspend/resume or clock
+# adjustments can't make the scheduler oversleep by more than this.
+MAX_SLEEP_SECONDS = 300.0
+
+
+@dataclass(order=True)
+class Job:
+    """A scheduled call."""
+
+    when: float
+    seq: int
+    name: str = field(compare=False)
+    func: Callable[[], None] = field(compare=False, repr=False)
+    tag: Optional[str] = field(default=None, compare=False)
+    cancelled: bool = field(default=False, compare=False)
+    quiet: bool = field(default=False, compare=False)  # frequent housekeeping: log at DEBUG
+
+
+class JobScheduler:
+    """Runs jobs at precise wall-clock times on the calling thread."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """Create an empty scheduler."""
+        self._clock = clock
+        self._heap: List[Job] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def schedule_at(self, when: float, func: Callable[[], None], name: str,
+                    tag: Optional[str] = None, quiet: bool = False) -> Job:
+        """Schedule ``func`` to run at epoch time ``when``."""
+        job = Job(when, next(self._counter), name, func, tag, quiet=quiet)
+        with self._lock:
+            heapq.heappush(self._heap, job)
+        self._wakeup.set()
+        return job
+
+    def cancel(self, tag: str) -> int:
+        """Cancel all pending jobs with the given tag, returning how many."""
+        cancelled = 0
+        with self._lock:
+            for job in self._heap:
+                if job.tag == tag and not job.cancelled:
+                    job.cancelled = True
+                    cancelled += 1
+        return cancelled
+
+    def next_job(self, include_quiet: bool = True) -> Optional[Job]:
+        """Return the next pending job (optionally skipping housekeeping jobs), if any."""
+        with self._lock:
+            for job in sorted(self._heap):
+                if not job.cancelled and (include_quiet or not job.quiet):
+                    return job
+        return None
+
+    def stop(self):
+        """Stop run_forever() after the current job (safe from signal handlers)."""
+        self._stopped.set()
+        self._wakeup.set()
+
+    @property
+    def stopped(self) -> bool:
+        """Return True once stop() has been called."""
+        return self._stopped.is_set()
+
+    def run_forever(self):
+        """Run jobs as they become due until stop() is called."""
+        while not self._stopped.is_set():
+            job = self._pop_due_job()
+            if job is None:
+                continue
+
+            logger.log(logging.DEBUG if job.quiet else logging.INFO, f"Running scheduled job '{job.name}'")
+            try:
+                job.func()
+            except Exception as e:
+                logger.error(f"Scheduled job '{job.name}' failed: {e}")
+
+    def _pop_due_job(self) -> Optional[Job]:
+        """Sleep until the earliest job is due and pop it, or return None if woken early."""
+        with self._lock:
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+            delay = self._heap[0].when - self._clock() if self._heap else MAX_SLEEP_SECONDS
+            if self._heap and delay <= 0:
+                return heapq.heappop(self._heap)
+            self._wakeup.clear()
+
+        self._wakeup.wait(min(delay, MAX_SLEEP_SECONDS))
+        return None
@@ -0,0 +1,329 @@
+"""
+Compiled season snapshots for F1 Countdown Bot.
+
+A snapshot is a small versioned JSON file holding only the schedule fields the
+bot uses, so a daily run can resolve the next race without importing FastF1 or
+pandas. Every race weekend is kept, whatever its format (conventional or
+sprint); only pre-season testing is dropped. Besides the event name, race day
+and format, a snapshot keeps the start time (UTC) of each of the weekend's
+Session1-Session5. In memory the sessions are two flat typed arrays with
+``SESSIONS_PER_EVENT`` slots per event: session kind codes (indexes into
+``SESSION_NAMES``, ``NO_SESSION`` for an empty slot) and start times in epoch
+seconds.
+
+Staleness policy:
+- A snapshot whose season has finished (last race in the past) is final and
+  never goes stale.
+- Otherwise it is stale once it is older than ``max_age`` (the
+  ``snapshot_max_age_hours`` setting), and the bot rebuilds it from FastF1.
+- If a rebuild fails, the stale snapshot is still used.
+- Snapshots written by an older version (without sessions) are always
+  stale, so they are rebuilt once but still used if that fails.
+- ``--refresh-snapshot`` forces a rebuild regardless of age.
+
+A future season whose calendar is not published yet (the fetch fails or
+returns no races) is remembered in a small ``season_<year>.missing.json``
+marker, and is only fetched again once the marker is older than the
+``missing_season_recheck_hours`` setting.
+"""
+
+import logging
+import os
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from state_files import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+
+# Event formats without a race
+NON_RACE_FORMATS = frozenset({'testing'})
+
+# FastF1 session names; a session's kind is its index in this tuple
+SESSION_NAMES = (
+    'Practice 1', 'Practice 2', 'Practice 3', 'Sprint Shootout', 'Sprint Qualifying',
+    'Sprint', 'Qualifying', 'Race',
+)
+SESSIONS_PER_EVENT = 5
+NO_SESSION = -1
+
+
+@dataclass(frozen=True)
+class RaceEvent:
+    """A single race weekend as used by the countdown."""
+
+    name: str
+    date: date
+    format: str = 'conventional'
+
+
+@dataclass(frozen=True)
+class Session:
+    """One session of a race weekend."""
+
+    event: RaceEvent
+    kind: str        # one of SESSION_NAMES
+    start: datetime  # UTC
+
+    @property
+    def name(self) -> str:
+        """Name used in tweets: the event's for the race, e.g. 'Miami Grand Prix Sprint' otherwise."""
+        return self.event.name if self.kind == 'Race' else f"{self.event.name} {self.kind}"
+
+    @property
+    def date(self) -> date:
+        """Start date (UTC)."""
+        return self.start.date()
+
+
+def _session_arrays(count: int = 0) -> Tuple[array, array]:
+    """Return empty (kinds, starts) session arrays for ``count`` events."""
+    slots = count * SESSIONS_PER_EVENT
+    return array('b', [NO_SESSION]) * slots, array('q', [0]) * slots
+
+
+def _utc_seconds(value) -> Optional[int]:
+    """Convert a session start (datetime, Timestamp or ISO string; naive means UTC) to epoch seconds."""
+    if value is None or value != value:  # None, NaN or NaT
+        return None
+    if isinstance(value, str):
+        if not value.strip():
+            return None
+        value = datetime.fromisoformat(value)
+    elif hasattr(value, 'to_pydatetime'):
+        value = value.to_pydatetime()
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass(frozen=True)
+class SeasonSnapshot:
+    """Compiled schedule for one season."""
+
+    year: int
+    built_at: datetime
+    events: Tuple[RaceEvent, ...]
+    # SESSIONS_PER_EVENT slots per event, see the module docstring
+    session_kinds: array = field(default_factory=lambda: array('b'), repr=False, hash=False)
+    session_starts: array = field(default_factory=lambda: array('q'), repr=False, hash=False)
+    version: int = SNAPSHOT_VERSION
+
+    def sessions(self, position: int) -> List[Session]:
+        """Return the sessions of the event at ``position``, in slot order."""
+        event = self.events[position]
+        first = position * SESSIONS_PER_EVENT
+        return [
+            Session(event, SESSION_NAMES[kind], datetime.fromtimestamp(start, timezone.utc))
+            for kind, start in zip(self.session_kinds[first:first + SESSIONS_PER_EVENT],
+                                   self.session_starts[first:first + SESSIONS_PER_EVENT])
+            if kind != NO_SESSION
+        ]
+
+    def is_final(self, today: date) -> bool:
+        """Return True if every race of the season is in the past."""
+        return bool(self.events) and self.events[-1].date < today
+
+    def is_stale(self, max_age: timedelta, now: Optional[datetime] = None) -> bool:
+        """Apply the staleness policy described in the module docstring."""
+        now = now or datetime.now(timezone.utc)
+        if self.version < SNAPSHOT_VERSION:
+            return True
+        if self.is_final(now.date()):
+            return False
+        return now - self.built_at > max_age
+
+    def to_dict(self) -> dict:
+        """Serialize to the on-disk format."""
+        return {
+            "version": SNAPSHOT_VERSION,
+            "year": self.year,
+            "built_at": self.built_at.isoformat(),
+            "events": [
+                [event.name, event.date.isoformat(), event.format,
+                 [[session.kind, session.start.isoformat()] for session in self.sessions(position)]]
+                for position, event in enumerate(self.events)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SeasonSnapshot':
+        """Deserialize from the on-disk format."""
+        version = data.get("version")
+        if version not in (1, SNAPSHOT_VERSION):
+            raise ValueError(f"unsupported snapshot version {version!r}")
+        if version == 1:
+            # name and date only: conventional races, no sessions
+            rows = [(name, event_date, 'conventional', ()) for name, event_date in data["events"]]
+        else:
+            rows = data["events"]
+
+        events = []
+        kinds, starts = _session_arrays(len(rows))
+        for position, (name, event_date, event_format, sessions) in enumerate(rows):
+            events.append(RaceEvent(name, date.fromisoformat(event_date), event_format))
+            for slot, (kind, start) in enumerate(sessions[:SESSIONS_PER_EVENT]):
+                kinds[position * SESSIONS_PER_EVENT + slot] = SESSION_NAMES.index(kind)
+                starts[position * SESSIONS_PER_EVENT + slot] = _utc_seconds(start)
+        return cls(
+            year=int(data["year"]),
+            built_at=datetime.fromisoformat(data["built_at"]),
+            events=tuple(events),
+            session_kinds=kinds,
+            session_starts=starts,
+            version=version,
+        )
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """Changes between two snapshots of the same season."""
+
+    added: Tuple[RaceEvent, ...] = ()
+    removed: Tuple[RaceEvent, ...] = ()
+    moved: Tuple[Tuple[RaceEvent, RaceEvent], ...] = ()  # (old, new)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved)
+
+
+def validate_snapshot(snapshot: SeasonSnapshot) -> List[str]:
+    """Return the problems found in a snapshot (empty if it is usable)."""
+    problems = []
+    if not snapshot.events:
+        problems.append("no races")
+    for event in snapshot.events:
+        if not event.name.strip():
+            problems.append(f"race on {event.date} has no name")
+        if event.date.year != snapshot.year:
+            problems.append(f"{event.name} on {event.date} is outside {snapshot.year}")
+    names = [event.name for event in snapshot.events]
+    for name in sorted({name for name in names if names.count(name) > 1}):
+        problems.append(f"{name} appears more than once")
+    dates = [event.date for event in snapshot.events]
+    if dates != sorted(dates):
+        problems.append("races are not in date order")
+    for position, event in enumerate(snapshot.events):
+        starts = [session.start for session in snapshot.sessions(position)]
+        if starts != sorted(starts):
+            problems.append(f"sessions of {event.name} are not in time order")
+    return problems
+
+
+def diff_snapshots(old: Optional[SeasonSnapshot], new: SeasonSnapshot) -> SnapshotDiff:
+    """Compare two snapshots of a season by race name."""
+    old_events = {event.name: event for event in (old.events if old is not None else ())}
+    new_events = {event.name: event for event in new.events}
+    return SnapshotDiff(
+        added=tuple(event for name, event in new_events.items() if name not in old_events),
+        removed=tuple(event for name, event in old_events.items() if name not in new_events),
+        moved=tuple(
+            (old_events[name], event) for name, event in new_events.items()
+            if name in old_events and old_events[name].date != event.date
+        ),
+    )
+
+
+def snapshot_path(cache_dir: str, year: int) -> str:
+    """Return the snapshot file path for a season."""
+    return os.path.join(cache_dir, f"season_{year}.json")
+
+
+def load_snapshot(cache_dir: str, year: int) -> Optional[SeasonSnapshot]:
+    """Load a season snapshot, returning None if missing or unusable."""
+    path = snapshot_path(cache_dir, year)
+    data = read_json(path)
+    if data is None:
+        return None
+    try:
+        return SeasonSnapshot.from_dict(data)
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Ignoring unusable season snapshot {path}: {e}")
+        return None
+
+
+def write_snapshot(cache_dir: str, snapshot: SeasonSnapshot):
+    """Write a season snapshot atomically."""
+    atomic_write_json(snapshot_path(cache_dir, snapshot.year), snapshot.to_dict())
+
+
+def missing_path(cache_dir: str, year: int) -> str:
+    """Return the path of the marker for a season that is not published yet."""
+    return os.path.join(cache_dir, f"season_{year}.missing.json")
+
+
+def load_missing(cache_dir: str, year: int) -> Optional[datetime]:
+    """Return when a season was last found to be unpublished, if recorded."""
+    data = read_json(missing_path(cache_dir, year))
+    try:
+        return datetime.fromisoformat(data["checked_at"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def record_missing(cache_dir: str, year: int, checked_at: datetime):
+    """Remember that a season's calendar was not available at ``checked_at``."""
+    atomic_write_json(missing_path(cache_dir, year), {"year": year, "checked_at": checked_at.isoformat()})
+
+
+def _compile(year: int, rows) -> SeasonSnapshot:
+    """Compile a snapshot from (name, race day, format, sessions) rows, sorted by race day.
+
+    ``sessions`` holds a (session name, start) pair per Session1-Session5
+    column; empty slots, unknown session names and missing times are skipped.
+    """
+    rows = sorted(rows, key=lambda row: row[1])
+    kinds, starts = _session_arrays(len(rows))
+    events = []
+    for position, (name, race_day, event_format, sessions) in enumerate(rows):
+        events.append(RaceEvent(name, race_day, event_format))
+        for slot, (session_name, start) in enumerate(sessions):
+            seconds = _utc_seconds(start)
+            if session_name in SESSION_NAMES and seconds is not None:
+                kinds[position * SESSIONS_PER_EVENT + slot] = SESSION_NAMES.index(session_name)
+                starts[position * SESSIONS_PER_EVENT + slot] = seconds
+    return SeasonSnapshot(
+        year=year,
+        built_at=datetime.now(timezone.utc),
+        events=tuple(events),
+        session_kinds=kinds,
+        session_starts=starts,
+    )
+
+
+SESSION_COLUMNS = tuple(
+    (f"Session{n}", f"Session{n}DateUtc") for n in range(1, SESSIONS_PER_EVENT + 1)
+)
+
+
+def snapshot_from_schedule(year: int, races_df) -> SeasonSnapshot:
+    """Compile a snapshot from the DataFrame returned by _get_race_schedule."""
+    columns = ['EventName', 'EventDate', 'EventFormat'] + [
+        column for pair in SESSION_COLUMNS for column in pair if column in races_df.columns
+    ]
+    rows = []
+    for row in races_df[columns].to_dict('records'):
+        sessions = [(row.get(name), row.get(start)) for name, start in SESSION_COLUMNS]
+        rows.append((str(row['EventName']), row['EventDate'].date(), str(row['EventFormat']), sessions))
+    return _compile(year, rows)
+
+
+def snapshot_from_events(year: int, events) -> SeasonSnapshot:
+    """Compile a snapshot from schedule rows shaped like FastF1's event schedule.
+
+    Each row is a mapping with ``EventName``, ``EventDate`` (ISO date or
+    datetime), ``EventFormat`` and optionally ``Session1``-``Session5`` with
+    ``Session1DateUtc``-``Session5DateUtc``; like _get_race_schedule, every
+    format except testing is kept.
+    """
+    return _compile(year, [
+        (str(row['EventName']), date.fromisoformat(str(row['EventDate'])[:10]), str(row.get('EventFormat')),
+         [(row.get(name), row.get(start)) for name, start in SESSION_COLUMNS])
+        for row in events if row.get('EventFormat') not in NON_RACE_FORMATS
+    ])
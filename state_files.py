@@ -0,0 +1,50 @@
+"""
+Small on-disk state files for F1 Countdown Bot.
+
+All bot state files are written atomically (temp file + rename), so a crash
+or an overlapping run never leaves a half-written file behind.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+
+def read_json(path: str) -> Optional[Any]:
+    """Read a JSON state file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def atomic_write_json(path: str, data: Any):
+    """Write a JSON state file atomically."""
+    atomic_write_text(path, json.dumps(data, separators=(',', ':'), ensure_ascii=False))
+
+
+def atomic_write_text(path: str, text: str):
+    """Write a text file atomically (temp file in the same directory + rename)."""
+    atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def atomic_write_bytes(path: str, data: bytes):
+    """Write a binary file atomically (temp file in the same directory + rename)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,260 @@
+"""
+Tweet templates for F1 Countdown Bot.
+
+A template sets the tweet text, the progress bar (width and glyphs) and the
+hashtags. Templates are configured as ``[template:<name>]`` sections:
+
+    [template:es]
+    text = Cuenta atrás F1: {race_name}
+      {progress_bar} {progress:.2f}%
+      {hashtags}
+    hashtags = #F1 #Formula1 #CuentaAtrás
+    bar_width = 20
+    filled = █
+    empty = ░
+
+``text`` may use ``{race_name}``, ``{progress_bar}``, ``{progress}`` (percent
+of the gap between races elapsed), ``{race_left}`` and ``{hashtags}``;
+``waiting_text`` (the off-season tweet) may use ``{year}``, ``{next_year}``
+and ``{hashtags}``. Continuation lines become new lines in the tweet.
+
+Templates are parsed and validated once, when the config is loaded: unknown
+placeholders, bad format specs and tweets that can't fit Twitter's
+280-character weighted limit are rejected up front. The text is compiled to
+literal and placeholder segments and every progress bar a template can
+produce is precomputed, so rendering is a table lookup and one join.
+"""
+
+import configparser
+import re
+import string
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+TEMPLATE_SECTION_PREFIX = 'template:'
+DEFAULT_TEMPLATE = 'default'
+
+DEFAULT_TEXT = "F1 Race Countdown: {race_name}\n{progress_bar} {progress:.2f}%\n{hashtags}"
+DEFAULT_WAITING_TEXT = (
+    "The {year} F1 season has concluded! Waiting for the {next_year} calendar to be announced. #F1"
+)
+DEFAULT_HASHTAGS = "#F1 #Formula1 #Countdown"
+DEFAULT_BAR_WIDTH = 15
+DEFAULT_FILLED = '▓'
+DEFAULT_EMPTY = '░'
+
+# Placeholders of ``text``, in the order render_filled passes their values
+# (``hashtags`` is fixed per template and compiled into the text)
+TEXT_VALUES = ('race_name', 'progress_bar', 'progress', 'race_left')
+TEXT_FIELDS = frozenset(TEXT_VALUES + ('hashtags',))
+WAITING_FIELDS = frozenset({'year', 'next_year', 'hashtags'})
+
+# Twitter's weighted length (twitter-text v3): code points in these ranges
+# count 1, everything else counts 2, URLs count 23, max 280.
+MAX_TWEET_WEIGHT = 280
+URL_WEIGHT = 23
+LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+URL_PATTERN = re.compile(r'https?://\S+')
+
+# Race names are unknown when a template is loaded; it must leave at least
+# this much weighted room for them.
+MIN_RACE_NAME_WEIGHT = 60
+
+
+def weighted_length(text: str) -> int:
+    """Return the length Twitter counts against the 280 limit (emoji may be overcounted)."""
+    text = unicodedata.normalize('NFC', text)
+    length = URL_WEIGHT * len(URL_PATTERN.findall(text))
+    text = URL_PATTERN.sub('', text)
+    for char in text:
+        code = ord(char)
+        if code <= 0x10FF or any(low <= code <= high for low, high in LIGHT_RANGES[1:]):
+            length += 1
+        else:
+            length += 2
+    return length
+
+
+def _check_fields(text: str, allowed: frozenset, what: str) -> List[tuple]:
+    """Parse a template, rejecting placeholders it can't use."""
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise ValueError(f"{what}: {e}") from None
+    for _, field_name, _, conversion in parsed:
+        if field_name is None:
+            continue
+        if field_name not in allowed:
+            raise ValueError(
+                f"{what}: unknown placeholder {{{field_name}}} (use {', '.join(sorted(allowed))})"
+            )
+        if conversion is not None:
+            raise ValueError(f"{what}: conversions like {{{field_name}!{conversion}}} are not supported")
+    return parsed
+
+
+@dataclass(frozen=True)
+class TweetTemplate:
+    """A validated tweet template with its precomputed progress bars."""
+
+    name: str = DEFAULT_TEMPLATE
+    text: str = DEFAULT_TEXT
+    waiting_text: str = DEFAULT_WAITING_TEXT
+    hashtags: str = DEFAULT_HASHTAGS
+    bar_width: int = DEFAULT_BAR_WIDTH
+    filled: str = DEFAULT_FILLED
+    empty: str = DEFAULT_EMPTY
+    # bars[n] is the bar with n filled cells
+    bars: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    # Weighted length of the longest possible tweet without the race name
+    fixed_weight: int = field(init=False, repr=False, compare=False)
+    # Compiled text: (literal, None, None) or (None, index into TEXT_VALUES, format spec)
+    _segments: Tuple[Tuple[Optional[str], Optional[int], Optional[str]], ...] = field(
+        init=False, repr=False, compare=False
+    )
+    # Race name -> name that fits (race names repeat for weeks)
+    _fitted_names: Dict[str, str] = field(init=False, repr=False, compare=False, default_factory=dict)
+
+    def __post_init__(self):
+        what = f"template '{self.name}'"
+        if self.bar_width < 1:
+            raise ValueError(f"{what}: bar_width must be at least 1")
+        if len(self.filled) != 1 or len(self.empty) != 1:
+            raise ValueError(f"{what}: filled and empty must be single characters")
+        parsed = _check_fields(self.text, TEXT_FIELDS, what)
+        _check_fields(self.waiting_text, WAITING_FIELDS, f"{what} waiting_text")
+
+        segments = []
+        for literal, field_name, format_spec, _ in parsed:
+            if field_name == 'hashtags':
+                literal += format(self.hashtags, format_spec)
+            if literal:
+                if segments and segments[-1][0] is not None:
+                    literal = segments.pop()[0] + literal
+                segments.append((literal, None, None))
+            if field_name is not None and field_name != 'hashtags':
+                segments.append((None, TEXT_VALUES.index(field_name), format_spec))
+        object.__setattr__(self, '_segments', tuple(segments))
+
+        bars = tuple(
+            self.filled * filled + self.empty * (self.bar_width - filled)
+            for filled in range(self.bar_width + 1)
+        )
+        object.__setattr__(self, 'bars', bars)
+
+        try:
+            fixed_weight = max(
+                weighted_length(self.render_filled('', progress, filled))
+                for filled in (0, self.bar_width) for progress in (0.0, 100.0)
+            )
+            waiting_weight = weighted_length(self.render_waiting(9999))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"{what}: {e}") from None
+        object.__setattr__(self, 'fixed_weight', fixed_weight)
+
+        if fixed_weight > MAX_TWEET_WEIGHT - MIN_RACE_NAME_WEIGHT:
+            raise ValueError(
+                f"{what}: tweets weigh up to {fixed_weight} before the race name, leaving less "
+                f"than {MIN_RACE_NAME_WEIGHT} of Twitter's {MAX_TWEET_WEIGHT} for it"
+            )
+        if waiting_weight > MAX_TWEET_WEIGHT:
+            raise ValueError(f"{what}: waiting_text is over Twitter's {MAX_TWEET_WEIGHT} limit")
+
+    def filled_cells(self, progress_made: float) -> int:
+        """Return the number of filled bar cells for a progress percentage."""
+        return int((progress_made / 100) * self.bar_width)
+
+    def progress_bar(self, progress_made: float) -> str:
+        """Return the progress bar for a progress percentage."""
+        return self.bars[self.filled_cells(progress_made)]
+
+    def render(self, race_name: str, progress_made: float) -> str:
+        """Render the countdown tweet."""
+        return self.render_filled(race_name, progress_made, self.filled_cells(progress_made))
+
+    def render_filled(self, race_name: str, progress_made: float, filled: int) -> str:
+        """Render the countdown tweet with a precomputed filled-cell count."""
+        values = (race_name, self.bars[filled], progress_made, 100 - progress_made)
+        return ''.join([
+            literal if literal is not None else format(values[index], format_spec)
+            for literal, index, format_spec in self._segments
+        ])
+
+    def render_waiting(self, year: int) -> str:
+        """Render the off-season tweet."""
+        return self.waiting_text.format(year=year, next_year=year + 1, hashtags=self.hashtags)
+
+    def fits(self, race_name: str) -> bool:
+        """Return True if every countdown tweet for this race fits Twitter's limit."""
+        return self.fixed_weight + weighted_length(race_name) <= MAX_TWEET_WEIGHT
+
+    def fit_race_name(self, race_name: str) -> str:
+        """Return the race name, shortened with '…' if the tweet would be too long."""
+        fitted = self._fitted_names.get(race_name)
+        if fitted is None:
+            fitted = race_name
+            if not self.fits(fitted):
+                while fitted and not self.fits(fitted + '…'):
+                    fitted = fitted[:-1]
+                fitted = fitted.rstrip() + '…'
+            self._fitted_names[race_name] = fitted
+        return fitted
+
+
+def _template_from_section(config: configparser.ConfigParser, section: str, name: str,
+                           base: TweetTemplate) -> TweetTemplate:
+    """Build a template from a config section, defaulting to ``base``'s settings."""
+    def option(key: str, default: str) -> str:
+        return config.get(section, key, raw=True, fallback=default)
+
+    try:
+        bar_width = config.getint(section, 'bar_width', fallback=base.bar_width)
+    except ValueError:
+        raise ValueError(f"[{section}] bar_width must be a whole number") from None
+    return TweetTemplate(
+        name=name,
+        text=option('text', base.text),
+        waiting_text=option('waiting_text', base.waiting_text),
+        hashtags=option('hashtags', base.hashtags),
+        bar_width=bar_width,
+        filled=option('filled', base.filled),
+        empty=option('empty', base.empty),
+    )
+
+
+def load_templates(config: configparser.ConfigParser) -> Dict[str, TweetTemplate]:
+    """Load the built-in default template and every [template:<name>] section.
+
+    A ``[template:default]`` section overrides the built-in default; other
+    templates inherit the default's settings for options they don't set.
+    """
+    default_section = TEMPLATE_SECTION_PREFIX + DEFAULT_TEMPLATE
+    default = TweetTemplate()
+    if config.has_section(default_section):
+        default = _template_from_section(config, default_section, DEFAULT_TEMPLATE, default)
+
+    templates = {DEFAULT_TEMPLATE: default}
+    for section in config.sections():
+        if not section.startswith(TEMPLATE_SECTION_PREFIX) or section == default_section:
+            continue
+        name = section[len(TEMPLATE_SECTION_PREFIX):].strip()
+        templates[name] = _template_from_section(config, section, name, default)
+    return templates
+
+
+def resolve_template(templates: Dict[str, TweetTemplate], value: str, where: str) -> TweetTemplate:
+    """Resolve a ``template`` option: a [template:<name>] name, or inline text."""
+    if value in templates:
+        return templates[value]
+    if '{' not in value:
+        raise ValueError(f"[{where}] uses unknown template '{value}'")
+    # Inline text, with the default template's bar and hashtags
+    default = templates[DEFAULT_TEMPLATE]
+    try:
+        return TweetTemplate(
+            name=where, text=value, waiting_text=default.waiting_text, hashtags=default.hashtags,
+            bar_width=default.bar_width, filled=default.filled, empty=default.empty,
+        )
+    except ValueError as e:
+        raise ValueError(f"[{where}] {e}") from None